@@ -27,7 +27,7 @@ class AdaptiveParameters:
         self.min_momentum_score = 1.5
         self.max_momentum_score = 5.0
     
-    def update_statistics(self, trading_history, market_condition):
+    def update_statistics(self, trading_history, market_condition, performance=None):
         """Update internal statistics based on recent performance"""
         now = datetime.datetime.now(datetime.timezone.utc)
         
@@ -39,6 +39,16 @@ class AdaptiveParameters:
         recent_trades = []
         cutoff_time = now - datetime.timedelta(hours=24)
         
+        if performance is not None:
+            # Rolling aggregates shared with the cooldown logic: no scan of the history
+            trades, wins = performance.counts('1d', now)
+            if trades:
+                self.recent_win_rate = wins / trades
+                self.consecutive_losses = performance.consecutive_losses(cutoff_time)
+            self.market_volatility = market_condition
+            self.last_adjustment_time = now
+            return
+        
         for trade in trading_history.get('trades', []):
             if 'close_time' in trade:
                 close_time = datetime.datetime.fromisoformat(trade['close_time']) if isinstance(trade['close_time'], str) else trade['close_time']
@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import ccxt
+import numpy as np
+from candle_archive import CandleArchive
+from coingecko_api import CoinGeckoAPI
+from scanner import RateLimiter, exchange_rate_limiter
+from config import CANDLE_ARCHIVE_DIR, CANDLE_ARCHIVE_ROWS
+
+DAY_MS = 86400000
+COINGECKO_DAYS = (1, 7, 14, 30, 90, 180, 365)
+COINGECKO_TIMEFRAMES = {30 * 60000: '30m', 4 * 3600000: '4h', 4 * DAY_MS: '4d'}
+
+
+class Checkpoint:
+    """Backfill progress per series in a JSON file, rewritten atomically after every page."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.series = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.series = json.load(f)
+
+    def get(self, key):
+        with self._lock:
+            return dict(self.series.get(key, {}))
+
+    def update(self, key, **fields):
+        with self._lock:
+            self.series.setdefault(key, {}).update(fields)
+            if not self.path:
+                return
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self.series, f, indent=1)
+            os.replace(tmp, self.path)
+
+
+class Backfill:
+    """
+    Bulk-load closed candles into a CandleArchive (the same files CandleStore restores from).
+    Each series is paged backwards from now with fetch_ohlcv(since=...) until the requested
+    start or until the exchange has nothing older (Kraken only serves the newest 720 candles).
+    Symbols run in parallel while a shared RateLimiter keeps request starts apart. Progress is
+    checkpointed after every page, so an interrupted run resumes where it stopped.
+    With `coingecko`, series the exchange could not cover are completed from CoinGecko OHLC,
+    stored as their own coarser timeframe (30m / 4h / 4d) with zero volume since CoinGecko has none.
+    Run it while the bot is stopped: both write the same archive files.
+    """
+
+    def __init__(self, exchange, archive, checkpoint, timeframe='1m', days=7, page_limit=720,
+                 max_workers=4, rate_limiter=None, coingecko=None, coingecko_interval=6.0):
+        self.exchange = exchange
+        self.archive = archive
+        self.checkpoint = checkpoint
+        self.timeframe = timeframe
+        self.tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        self.days = days
+        self.page_limit = page_limit
+        self.max_workers = max(1, int(max_workers))
+        self.rate_limiter = rate_limiter or exchange_rate_limiter(exchange)
+        self.coingecko = coingecko
+        self.coingecko_limiter = RateLimiter(coingecko_interval)
+        self._coin_ids = None
+        self._lock = threading.Lock()
+        self.stats = {'pages': 0, 'rows': 0, 'done': 0, 'partial': 0, 'failed': 0, 'coingecko': 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def run(self, symbols):
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='backfill') as pool:
+            futures = {pool.submit(self.backfill_symbol, symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    self._count('failed')
+                    print(f"[ERROR] {symbol} backfill: {e}")
+                    continue
+                self._count(status)
+                print(f"[BACKFILL] {symbol}: {status}")
+        s = self.stats
+        print(f"[BACKFILL] {len(symbols)} symbols in {time.time() - started:.0f}s | pages: {s['pages']} | "
+              f"rows: {s['rows']} | complete: {s['done']} | partial: {s['partial']} | failed: {s['failed']} | "
+              f"coingecko: {s['coingecko']}")
+
+    def backfill_symbol(self, symbol):
+        """
+        Page one series backwards to its start. Returns 'done', or 'partial' when neither the exchange
+        nor the CoinGecko fallback reached the start; partial series are retried on the next run.
+        """
+        key = f"{symbol}|{self.timeframe}"
+        state = self.checkpoint.get(key)
+        if state.get('status') == 'done':
+            return 'done'
+        now_ms = int(time.time() * 1000)
+        if 'start' not in state:
+            # Pin the window on the first run so a resumed run aims for the same start
+            state = {'start': int(now_ms - self.days * DAY_MS) // self.tf_ms * self.tf_ms,
+                     'oldest': now_ms // self.tf_ms * self.tf_ms}
+            self.checkpoint.update(key, **state)
+        start, end = state['start'], state['oldest']
+        while end > start:
+            since = max(start, end - self.page_limit * self.tf_ms)
+            self.rate_limiter.wait()
+            data = self.exchange.fetch_ohlcv(symbol, timeframe=self.timeframe, since=since, limit=self.page_limit)
+            self._count('pages')
+            rows = np.asarray(data or [], dtype=np.float64).reshape(-1, 6)
+            # Closed candles older than what is already stored
+            rows = rows[(rows[:, 0] < end) & (rows[:, 0] + self.tf_ms <= now_ms)]
+            if not len(rows):
+                break
+            self.archive.merge(symbol, self.timeframe, rows)
+            self._count('rows', len(rows))
+            end = int(rows[0, 0])
+            self.checkpoint.update(key, oldest=end)
+        covered = end <= start or (self.coingecko is not None and self._coingecko_fill(symbol, start))
+        # A partial series is retried on the next run (the exchange part resumes from `oldest`)
+        status = 'done' if covered else 'partial'
+        self.checkpoint.update(key, status=status)
+        return status
+
+    def _coin_id(self, symbol):
+        """CoinGecko id for the symbol's base currency; None if unknown or ambiguous."""
+        with self._lock:
+            if self._coin_ids is None:
+                self.coingecko_limiter.wait()
+                ids = {}
+                for coin in self.coingecko.get_coins_list():
+                    ids.setdefault(coin['symbol'].upper(), []).append(coin['id'])
+                self._coin_ids = ids
+        base = symbol.split('/')[0]
+        market = self.exchange.markets.get(symbol) if getattr(self.exchange, 'markets', None) else None
+        base = (market or {}).get('base', base)
+        ids = self._coin_ids.get(base.upper(), [])
+        return ids[0] if len(ids) == 1 else None
+
+    def _coingecko_fill(self, symbol, start):
+        """Store CoinGecko OHLC reaching back to `start`. Returns True if it covered the gap."""
+        coin_id = self._coin_id(symbol)
+        if coin_id is None:
+            print(f"[WARNING] {symbol}: no unambiguous CoinGecko id, skipping the fallback")
+            return False
+        wanted = -(-(int(time.time() * 1000) - start) // DAY_MS)
+        days = next((d for d in COINGECKO_DAYS if d >= wanted), 'max')
+        self.coingecko_limiter.wait()
+        ohlc = np.asarray(self.coingecko.get_ohlc(coin_id, days=days), dtype=np.float64).reshape(-1, 5)
+        if len(ohlc) < 2:
+            return False
+        tf_ms = int(np.median(np.diff(ohlc[:, 0])))
+        timeframe = COINGECKO_TIMEFRAMES.get(tf_ms)
+        if timeframe is None:
+            print(f"[WARNING] {symbol}: unexpected CoinGecko candle spacing {tf_ms}ms")
+            return False
+        rows = np.zeros((len(ohlc), 6))
+        # CoinGecko stamps candles with their close time; the archive uses open times like ccxt
+        rows[:, 0] = ohlc[:, 0] - tf_ms
+        rows[:, 1:5] = ohlc[:, 1:5]
+        rows = rows[rows[:, 0] + tf_ms <= time.time() * 1000]
+        if not len(rows):
+            return False
+        self.archive.merge(symbol, timeframe, rows)
+        self._count('coingecko')
+        print(f"[BACKFILL] {symbol}: {len(rows)} {timeframe} candles from CoinGecko ({coin_id})")
+        # The first candle containing `start` is enough
+        return rows[0, 0] < start + tf_ms
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill historical candles into the local candle archive.')
+    parser.add_argument('--symbols', nargs='+', help='symbols to backfill (default: every Kraken USD pair)')
+    parser.add_argument('--timeframe', default='1m')
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--archive', default=CANDLE_ARCHIVE_DIR or 'candles')
+    parser.add_argument('--checkpoint', default='backfill_checkpoint.json')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and start over')
+    parser.add_argument('--coingecko', action='store_true', help='fill what the exchange cannot serve from CoinGecko')
+    args = parser.parse_args()
+
+    exchange = ccxt.kraken({'enableRateLimit': True})
+    exchange.load_markets()
+    symbols = args.symbols or [s for s in exchange.symbols if s.endswith('/USD') and s != 'USDC/USD']
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    rows = int(args.days * DAY_MS // (ccxt.Exchange.parse_timeframe(args.timeframe) * 1000))
+    backfill = Backfill(
+        exchange,
+        # The bot compacts files back to CANDLE_ARCHIVE_ROWS once it appends past twice that
+        CandleArchive(args.archive, capacity=max(CANDLE_ARCHIVE_ROWS, rows)),
+        Checkpoint(args.checkpoint),
+        timeframe=args.timeframe,
+        days=args.days,
+        max_workers=args.workers,
+        coingecko=CoinGeckoAPI() if args.coingecko else None
+    )
+    backfill.run(symbols)
@@ -0,0 +1,168 @@
+import os
+import struct
+import threading
+import numpy as np
+
+MAGIC = b'CANDLES1'
+HEADER = struct.Struct('<8sI80s16s20x')   # magic, row width, symbol, timeframe -> 128 bytes
+ROW_WIDTH = 6
+ROW_BYTES = ROW_WIDTH * 8
+
+
+def _name(symbol, timeframe):
+    return f"{symbol.replace('/', '-').replace(':', '_')}_{timeframe}.candles"
+
+
+class CandleArchive:
+    """
+    Closed candles on disk, one append-only file per (symbol, timeframe): a 128 byte header
+    followed by raw float64 rows [timestamp, open, high, low, close, volume]. Files are memory
+    mapped on load. Appends are not fsynced; instead every load checks the file and truncates
+    it back to its longest valid prefix (whole rows, finite values, increasing timestamps),
+    so a crash mid-write costs at most the rows of the interrupted append.
+    Files are compacted to the newest `capacity` rows once they hold twice that many.
+    Candles older than the archive can be merged in (backfill.py); `capacity` is therefore the
+    on-disk retention and may be much larger than the window kept in memory.
+    """
+
+    def __init__(self, root, capacity=1000):
+        self.root = root
+        self.capacity = capacity
+        os.makedirs(root, exist_ok=True)
+        self._last = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.stats = {'appended': 0, 'compactions': 0, 'repairs': 0}
+
+    def _path(self, symbol, timeframe):
+        return os.path.join(self.root, _name(symbol, timeframe))
+
+    def series(self):
+        """(symbol, timeframe) of every archived series, read from the file headers."""
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            if not name.endswith('.candles'):
+                continue
+            try:
+                with open(os.path.join(self.root, name), 'rb') as f:
+                    magic, width, symbol, timeframe = HEADER.unpack(f.read(HEADER.size))
+            except (OSError, struct.error):
+                continue
+            if magic == MAGIC and width == ROW_WIDTH:
+                found.append((symbol.rstrip(b'\0').decode(), timeframe.rstrip(b'\0').decode()))
+        return found
+
+    def last_timestamp(self, symbol, timeframe):
+        with self._lock:
+            return self._last.get((symbol, timeframe))
+
+    def load(self, symbol, timeframe, limit=None):
+        """
+        Check and memory-map the file; returns a copy of the newest `limit` rows as an (n, 6) array,
+        or None if there is no usable file. A damaged tail is truncated away.
+        """
+        path = self._path(symbol, timeframe)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header)[:2] != (MAGIC, ROW_WIDTH):
+            print(f"[WARNING] {symbol} {timeframe} candle archive has a bad header, discarding it")
+            os.remove(path)
+            return None
+        count = (size - HEADER.size) // ROW_BYTES
+        rows = np.empty((0, ROW_WIDTH))
+        if count:
+            mapped = np.memmap(path, dtype=np.float64, mode='r', offset=HEADER.size, shape=(count, ROW_WIDTH))
+            valid = self._valid_prefix(mapped)
+            rows = np.array(mapped[max(0, valid - (limit or valid)):valid])
+            del mapped
+            count = valid
+        if size != HEADER.size + count * ROW_BYTES:
+            print(f"[WARNING] {symbol} {timeframe} candle archive damaged: keeping {count} rows")
+            os.truncate(path, HEADER.size + count * ROW_BYTES)
+            self.stats['repairs'] += 1
+        with self._lock:
+            self._sizes[(symbol, timeframe)] = count
+            self._last[(symbol, timeframe)] = int(rows[-1, 0]) if len(rows) else None
+        return rows
+
+    @staticmethod
+    def _valid_prefix(rows):
+        """Number of leading rows that are finite and strictly increasing in time."""
+        finite = np.isfinite(rows).all(axis=1)
+        ordered = np.r_[True, np.diff(rows[:, 0]) > 0]
+        bad = np.flatnonzero(~(finite & ordered))
+        return int(bad[0]) if len(bad) else len(rows)
+
+    def _write(self, path, symbol, timeframe, rows):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, ROW_WIDTH, symbol.encode(), timeframe.encode()))
+            f.write(np.ascontiguousarray(rows, dtype=np.float64).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def replace(self, symbol, timeframe, rows):
+        """Rewrite the series with `rows` (closed candles, timestamp ordered)."""
+        key = (symbol, timeframe)
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, ROW_WIDTH)[-self.capacity:]
+        self._write(self._path(symbol, timeframe), symbol, timeframe, rows)
+        with self._lock:
+            self._sizes[key] = len(rows)
+            self._last[key] = int(rows[-1, 0]) if len(rows) else None
+
+    def merge(self, symbol, timeframe, rows):
+        """Merge closed candles of any age into the series; archived candles win on equal timestamps."""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, ROW_WIDTH)
+        existing = self.load(symbol, timeframe)
+        if existing is not None and len(existing):
+            rows = np.concatenate((existing, rows[~np.isin(rows[:, 0], existing[:, 0])]))
+        rows = rows[np.argsort(rows[:, 0], kind='stable')]
+        self.replace(symbol, timeframe, rows)
+        return len(rows)
+
+    def append(self, symbol, timeframe, rows):
+        """Append closed candles newer than the last archived one. Returns the number written."""
+        key = (symbol, timeframe)
+        path = self._path(symbol, timeframe)
+        if key not in self._sizes and os.path.exists(path):
+            # First write since start-up: check the file and learn where it ends
+            self.load(symbol, timeframe, limit=1)
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, ROW_WIDTH)
+        last = self.last_timestamp(symbol, timeframe)
+        if last is not None:
+            rows = rows[rows[:, 0] > last]
+        if not len(rows):
+            return 0
+        if key not in self._sizes:
+            self.replace(symbol, timeframe, rows)
+            self.stats['appended'] += len(rows)
+            return len(rows)
+        size = self._sizes.get(key, 0) + len(rows)
+        if size >= 2 * self.capacity:
+            existing = self.load(symbol, timeframe, limit=self.capacity)
+            self.replace(symbol, timeframe, np.concatenate((existing, rows)) if existing is not None else rows)
+            self.stats['compactions'] += 1
+        else:
+            with open(path, 'ab') as f:
+                f.write(np.ascontiguousarray(rows).tobytes())
+            with self._lock:
+                self._sizes[key] = size
+                self._last[key] = int(rows[-1, 0])
+        self.stats['appended'] += len(rows)
+        return len(rows)
+
+    def nbytes(self):
+        """Bytes on disk."""
+        with self._lock:
+            return sum(HEADER.size + n * ROW_BYTES for n in self._sizes.values())
+
+    def print_stats(self):
+        s = self.stats
+        print(f"[ARCHIVE] series: {len(self._sizes)} | appended: {s['appended']} | "
+              f"compactions: {s['compactions']} | repairs: {s['repairs']} | on disk: {self.nbytes() / 2**20:.1f} MB")
+        self.stats = {'appended': 0, 'compactions': 0, 'repairs': 0}
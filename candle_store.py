@@ -0,0 +1,371 @@
+import contextlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import ccxt
+from candles import Candles
+
+
+class CandleBuffer:
+    """
+    Ring buffer of OHLCV rows [timestamp, open, high, low, close, volume] ordered by timestamp,
+    holding at most `capacity` rows. Storage starts small and doubles as rows arrive, so symbols
+    with little history do not reserve the full window.
+    """
+
+    INITIAL_ROWS = 64
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._rows = np.zeros((min(self.capacity, self.INITIAL_ROWS), 6), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return self._rows.nbytes
+
+    def _slot(self, i):
+        return (self._start + i) % len(self._rows)
+
+    @property
+    def first_timestamp(self):
+        return int(self._rows[self._start, 0]) if self._size else None
+
+    @property
+    def last_timestamp(self):
+        return int(self._rows[self._slot(self._size - 1), 0]) if self._size else None
+
+    def _grow(self, rows):
+        """Reallocate storage for at least `rows` rows (up to capacity), keeping the contents in order."""
+        allocated = len(self._rows)
+        while allocated < rows:
+            allocated *= 2
+        ordered = self.to_array()
+        self._rows = np.zeros((min(self.capacity, allocated), 6), dtype=np.float64)
+        self._rows[:self._size] = ordered
+        self._start = 0
+
+    def _append(self, row):
+        if self._size == len(self._rows) < self.capacity:
+            self._grow(self._size + 1)
+        if self._size < len(self._rows):
+            self._rows[self._slot(self._size)] = row
+            self._size += 1
+        else:
+            # Full: overwrite the oldest row and advance the start of the ring.
+            self._rows[self._start] = row
+            self._start = (self._start + 1) % self.capacity
+
+    def merge(self, rows):
+        """
+        Merge OHLCV rows into the buffer. Rows newer than the last stored candle are appended,
+        a row with the last timestamp overwrites the still-forming candle, and older rows
+        replace their stored counterparts (or are dropped if they fall outside the window).
+        Returns the number of rows appended.
+        """
+        appended = 0
+        for row in rows:
+            ts = row[0]
+            last = self.last_timestamp
+            if last is None or ts > last:
+                self._append(row)
+                appended += 1
+            elif ts == last:
+                self._rows[self._slot(self._size - 1)] = row
+            elif ts >= self.first_timestamp:
+                ordered = self.to_array()
+                idx = int(np.searchsorted(ordered[:, 0], ts))
+                if ordered[idx, 0] == ts:
+                    self._rows[self._slot(idx)] = row
+                else:
+                    ordered = np.insert(ordered, idx, row, axis=0)[-self.capacity:]
+                    self.reset(ordered)
+        return appended
+
+    def reset(self, rows):
+        """Replace the buffer contents with `rows` (oldest rows are dropped beyond capacity)."""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)[-self.capacity:]
+        if len(rows) > len(self._rows):
+            self._size = 0
+            self._grow(len(rows))
+        self._start = 0
+        self._size = len(rows)
+        if self._size:
+            self._rows[:self._size] = rows
+
+    def to_array(self):
+        """Return the stored rows in timestamp order as an (n, 6) array."""
+        if self._start + self._size <= len(self._rows):
+            return self._rows[self._start:self._start + self._size].copy()
+        return np.concatenate((self._rows[self._start:], self._rows[:self._slot(self._size)]))
+
+    def tail(self, n):
+        """Return the newest `n` rows in timestamp order."""
+        n = min(n, self._size)
+        return self._rows[(self._start + self._size - n + np.arange(n)) % len(self._rows)]
+
+
+class CandleStore:
+    """
+    Per-symbol candle cache that only downloads candles newer than what it already holds.
+    The first refresh of a symbol backfills as much history as one request returns (up to
+    `capacity`); every later refresh asks for candles from the last stored timestamp onwards,
+    which overwrites the still-forming candle and, after a failed fetch, fills in whatever was
+    missed. History therefore keeps growing to `capacity` bars without extra per-cycle cost.
+
+    The store is bounded: series not read for `ttl` seconds are dropped, and while the buffers
+    exceed `max_bytes` the least recently read series are dropped first. Streamed updates do not
+    count as reads and are ignored for a dropped series until it is read (and backfilled) again.
+
+    With a CandleArchive, closed candles of backfilled series are also written to disk as they
+    arrive, and a series missing from memory (after a restart or an eviction) is restored from
+    disk and then only needs a delta fetch.
+    """
+
+    def __init__(self, capacity=144, page_limit=720, max_bytes=None, ttl=None, archive=None):
+        self.capacity = capacity
+        self.archive = archive
+        self.page_limit = page_limit
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._buffers = {}
+        self._locks = {}
+        self._backfilled = set()
+        self._used = OrderedDict()
+        self._evicted = set()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {'full_fetches': 0, 'delta_fetches': 0, 'rows_fetched': 0, 'failures': 0, 'evicted': 0,
+                      'restored': 0}
+
+    def _entry(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._buffers:
+                self._buffers[key] = CandleBuffer(self.capacity)
+                self._locks[key] = threading.Lock()
+                if key not in self._used:
+                    # Created by the stream (or a restore) before any read: ages from its creation.
+                    # Appending keeps _used in time order, which evict() relies on.
+                    self._used[key] = time.monotonic()
+            return self._buffers[key], self._locks[key]
+
+    def _touch(self, key):
+        """Mark (symbol, timeframe) as read now, for LRU/TTL eviction."""
+        with self._lock:
+            self._used[key] = time.monotonic()
+            self._used.move_to_end(key)
+            self._evicted.discard(key)
+
+    @contextlib.contextmanager
+    def locked(self, symbol, timeframe='1m'):
+        """
+        Yield the CandleBuffer for (symbol, timeframe) with its entry lock held, or None if nothing
+        is cached. Refreshes and streamed updates merge under the same lock, so keep the block short.
+        """
+        key = (symbol, timeframe)
+        lock = self._locks.get(key)
+        if lock is None:
+            yield None
+            return
+        self._touch(key)
+        with lock:
+            yield self._buffers.get(key)
+
+    def rows(self, symbol, timeframe='1m'):
+        """Consistent (n, 6) copy of the cached rows taken under the entry lock, or None if nothing is cached."""
+        key = (symbol, timeframe)
+        lock = self._locks.get(key)
+        if lock is None:
+            return None
+        self._touch(key)
+        with lock:
+            buf = self._buffers.get(key)
+            return buf.to_array() if buf is not None else None
+
+    def nbytes(self):
+        """Bytes held by the candle buffers."""
+        with self._lock:
+            return sum(buf.nbytes for buf in self._buffers.values())
+
+    def evict(self, now=None):
+        """
+        Drop series idle for longer than `ttl`, then the least recently read ones until the buffers
+        fit in `max_bytes`. Series being refreshed right now are skipped. Returns the evicted keys.
+        """
+        now = now or time.monotonic()
+        evicted = []
+        with self._lock:
+            total = sum(buf.nbytes for buf in self._buffers.values())
+            # _used is ordered oldest first, so the first series that is neither expired nor needed
+            # to get under the budget ends the scan
+            for key, used in list(self._used.items()):
+                expired = self.ttl is not None and now - used > self.ttl
+                if not expired and (self.max_bytes is None or total <= self.max_bytes):
+                    break
+                lock = self._locks.get(key)
+                if lock is not None and not lock.acquire(blocking=False):
+                    continue
+                try:
+                    buf = self._buffers.pop(key, None)
+                    self._locks.pop(key, None)
+                    self._backfilled.discard(key)
+                    del self._used[key]
+                    if buf is not None:
+                        self._evicted.add(key)
+                        total -= buf.nbytes
+                        evicted.append(key)
+                finally:
+                    if lock is not None:
+                        lock.release()
+            self.stats['evicted'] += len(evicted)
+        return evicted
+
+    def is_backfilled(self, symbol, timeframe='1m'):
+        """True once (symbol, timeframe) holds the exchange history, so refreshes only need deltas."""
+        return (symbol, timeframe) in self._backfilled
+
+    def _restore(self, key, buf):
+        """Load (symbol, timeframe) from the archive into `buf`, keeping newer streamed candles. Call under the entry lock."""
+        try:
+            rows = self.archive.load(*key, limit=self.capacity)
+        except OSError as e:
+            print(f"[ERROR] {key[0]} {key[1]} candle archive load: {e}")
+            return False
+        if rows is None or not len(rows):
+            return False
+        newer = buf.to_array()
+        newer = newer[newer[:, 0] > rows[-1, 0]]
+        buf.reset(rows)
+        buf.merge(newer)
+        self._backfilled.add(key)
+        self._count('restored')
+        return True
+
+    def _persist(self, key, buf, full=False):
+        """Write the closed candles of a backfilled series to the archive. Call under the entry lock."""
+        if self.archive is None or key not in self._backfilled or len(buf) < 2:
+            return
+        try:
+            if full:
+                # After a full refetch: merge, so older (backfilled) history on disk is kept
+                self.archive.merge(*key, buf.to_array()[:-1])
+                return
+            archived = self.archive.last_timestamp(*key)
+            # Only touch the buffer once a candle newer than the archive has closed
+            if archived is None or buf.tail(2)[0, 0] > archived:
+                self.archive.append(*key, buf.to_array()[:-1])
+        except OSError as e:
+            print(f"[ERROR] {key[0]} {key[1]} candle archive write: {e}")
+
+    def warm_start(self):
+        """Restore every archived series (up to the memory budget) so first refreshes are deltas. Returns the count."""
+        if self.archive is None:
+            return 0
+        restored = 0
+        for symbol, timeframe in self.archive.series():
+            if self.max_bytes is not None and self.nbytes() >= self.max_bytes:
+                break
+            buf, lock = self._entry(symbol, timeframe)
+            with lock:
+                restored += self._restore((symbol, timeframe), buf)
+        return restored
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def refresh(self, exchange, symbol, timeframe='1m', limit=None, pace=None):
+        """
+        Bring the buffer for (symbol, timeframe) up to date. Returns True on success.
+        `limit` is accepted for fetch_ohlc_data compatibility; a backfill always asks for `capacity`
+        bars, and the exchange may return fewer (Kraken serves at most 720).
+        `pace`, if given, is called before each fetch_ohlcv request (e.g. a RateLimiter's wait).
+        """
+        key = (symbol, timeframe)
+        self._touch(key)
+        buf, lock = self._entry(symbol, timeframe)
+        tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        with lock:
+            if key not in self._backfilled and self.archive is not None:
+                self._restore(key, buf)
+            try:
+                last = buf.last_timestamp
+                now_ms = int(time.time() * 1000)
+                if last is None or key not in self._backfilled or (now_ms - last) // tf_ms >= self.page_limit:
+                    # Cold start, or the gap since the last stored candle is too big to patch.
+                    if pace is not None:
+                        pace()
+                    data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=self.capacity)
+                    self._count('full_fetches')
+                    if not data:
+                        return False
+                    # Keep streamed candles that are newer than the backfilled history.
+                    newer = buf.to_array()
+                    newer = newer[newer[:, 0] > data[-1][0]]
+                    buf.reset(data)
+                    buf.merge(newer)
+                    self._backfilled.add(key)
+                    self._count('rows_fetched', len(data))
+                    self._persist(key, buf, full=True)
+                    return True
+                while True:
+                    if pace is not None:
+                        pace()
+                    data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=last, limit=self.page_limit)
+                    self._count('delta_fetches')
+                    if not data:
+                        break
+                    buf.merge(data)
+                    self._count('rows_fetched', len(data))
+                    newest = buf.last_timestamp
+                    # Keep paging only while the exchange returns full pages and we are still behind.
+                    if len(data) < self.page_limit or newest <= last or now_ms - newest < tf_ms:
+                        break
+                    last = newest
+                self._persist(key, buf)
+                return True
+            except Exception as e:
+                self._count('failures')
+                print(f"[ERROR] {symbol} {timeframe} candle refresh: {e}")
+                return False
+
+    def ingest(self, symbol, timeframe, rows):
+        """Merge rows pushed from a streaming source into the buffer (ignored for evicted series)."""
+        if (symbol, timeframe) in self._evicted:
+            return
+        buf, lock = self._entry(symbol, timeframe)
+        with lock:
+            buf.merge(rows)
+            self._persist((symbol, timeframe), buf)
+
+    def fetch(self, exchange, symbol, timeframe='1m', limit=144, pace=None):
+        """Drop-in replacement for utils.fetch_ohlc_data backed by the cache. Returns Candles or None."""
+        if not self.refresh(exchange, symbol, timeframe=timeframe, limit=limit, pace=pace):
+            return None
+        return self.read(symbol, timeframe=timeframe, limit=limit)
+
+    def read(self, symbol, timeframe='1m', limit=144):
+        """Return the newest `limit` cached candles as Candles without touching the network, or None."""
+        with self.locked(symbol, timeframe) as buf:
+            rows = buf.tail(limit) if buf is not None else None
+        if rows is None or not len(rows):
+            print(f"[WARNING] No OHLCV data for {symbol}")
+            return None
+        return Candles.from_rows(rows)
+
+    def print_stats(self):
+        """Print and reset the per-cycle fetch counters."""
+        s = self.stats
+        budget = f" / {self.max_bytes / 2**20:.0f}" if self.max_bytes else ""
+        print(f"[CANDLES] full: {s['full_fetches']} | delta: {s['delta_fetches']} | "
+              f"rows: {s['rows_fetched']} | failures: {s['failures']} | symbols cached: {len(self._buffers)} | "
+              f"resident: {self.nbytes() / 2**20:.1f}{budget} MB | evicted: {s['evicted']} | restored: {s['restored']}")
+        self.reset_stats()
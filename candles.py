@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+class Candles:
+    """
+    Read-only OHLCV candles held as one column-major float64 block (6 x n, timestamps in ms).
+    Supports the subset of the DataFrame interface the strategy code uses (len, `col in candles`,
+    candles['col'] -> Series, .index, .columns); every column Series is a zero-copy view of the block,
+    and tail()/slices are views too.
+    """
+
+    columns = COLUMNS
+
+    def __init__(self, block):
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[0] != len(COLUMNS):
+            raise ValueError(f"Candle block must have shape (6, n), got {block.shape}")
+        block = block.view()
+        block.flags.writeable = False
+        self.values = block
+        self.index = pd.RangeIndex(block.shape[1])
+        self._series = {}
+
+    @classmethod
+    def from_ohlcv(cls, data):
+        """Build from a CCXT list of [timestamp, open, high, low, close, volume] rows in one allocation."""
+        # Fortran order stores each field contiguously, so the transpose is the (6, n) block itself
+        rows = np.array(data, dtype=np.float64, order='F').reshape(-1, len(COLUMNS))
+        return cls(rows.T)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from an (n, 6) row array such as CandleBuffer.tail()."""
+        return cls(np.asfortranarray(rows, dtype=np.float64).T)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a candle DataFrame (datetime or millisecond timestamps; a missing column becomes NaN)."""
+        block = np.full((len(COLUMNS), len(df)), np.nan)
+        for i, col in enumerate(COLUMNS):
+            if col not in df.columns:
+                continue
+            values = df[col]
+            if col == 'timestamp' and pd.api.types.is_datetime64_any_dtype(values):
+                values = values.astype('datetime64[ms]').astype('int64')
+            block[i] = values.to_numpy(dtype=np.float64)
+        return cls(block)
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    def __contains__(self, column):
+        return column in COLUMNS
+
+    def __getitem__(self, column):
+        series = self._series.get(column)
+        if series is None:
+            series = pd.Series(self.values[COLUMNS.index(column)], index=self.index, name=column, copy=False)
+            self._series[column] = series
+        return series
+
+    @property
+    def last_timestamp(self):
+        return int(self.values[0, -1]) if len(self) else None
+
+    def tail(self, n):
+        """The newest `n` candles as a view."""
+        return Candles(self.values[:, len(self) - n:]) if n < len(self) else self
+
+    def rows(self):
+        """(n, 6) row view in CCXT column order."""
+        return self.values.T
+
+    def to_frame(self):
+        """Copy into a DataFrame with COLUMNS and datetime timestamps, for code that needs a real DataFrame."""
+        df = pd.DataFrame(self.rows(), columns=list(COLUMNS))
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
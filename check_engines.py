@@ -0,0 +1,313 @@
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+from indicator_panel import IndicatorPanel
+from indicator_state import IndicatorStateBook
+from indicators import IndicatorFrame
+from market_condition import RegimeState, batch_signals, series_signals
+from strategy import (
+    evaluate_coin, evaluate_panel, evaluate_state, check_momentum_signal, check_volume_spike,
+    check_breakout, check_mean_reversion, ALL_STRATEGIES, MOMENTUM_COLUMNS, RANGE_WINDOW
+)
+
+TIMEFRAME_MS = 60000
+
+
+# === Reference: the original per-frame pandas evaluation ===
+# Kept verbatim apart from the pump filter, which looks at the last RANGE_WINDOW candles since
+# sources started holding deeper history for the golden cross. The engines must agree with it.
+
+def reference_rsi(series, period=14):
+    delta = series.ffill().diff().fillna(0)
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.rolling(window=period).mean()
+    avg_loss = loss.rolling(window=period).mean().replace(0, 0.00001)
+    return (100 - (100 / (1 + avg_gain / avg_loss))).fillna(50)
+
+
+def reference_indicators(df):
+    ema_12 = df['close'].ewm(span=12, adjust=False).mean()
+    ema_26 = df['close'].ewm(span=26, adjust=False).mean()
+    df['macd'] = ema_12 - ema_26
+    df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+    df['macd_hist'] = df['macd'] - df['macd_signal']
+    df['roc_5'] = df['close'].pct_change(periods=5) * 100
+    for w in (10, 20, 50, 200):
+        df[f'sma_{w}'] = df['close'].rolling(window=w).mean()
+    df['golden_cross'] = 0.0
+    df['death_cross'] = 0.0
+    if len(df) > 201:
+        for i in range(-20, 0):
+            if i + 1 < 0:
+                if (df['sma_50'].iloc[i - 1] <= df['sma_200'].iloc[i - 1] and
+                        df['sma_50'].iloc[i] > df['sma_200'].iloc[i]):
+                    df.loc[df.index[i], 'golden_cross'] = 1.0
+                elif (df['sma_50'].iloc[i - 1] >= df['sma_200'].iloc[i - 1] and
+                      df['sma_50'].iloc[i] < df['sma_200'].iloc[i]):
+                    df.loc[df.index[i], 'death_cross'] = 1.0
+        df['post_golden_cross'] = (df['sma_50'] > df['sma_200']).astype(float)
+        df['golden_cross_age'] = 0
+        last_golden_cross_idx = None
+        for i in range(len(df) - 1, max(0, len(df) - 100), -1):
+            if df['golden_cross'].iloc[i] == 1.0:
+                last_golden_cross_idx = i
+                break
+        if last_golden_cross_idx is not None:
+            for i in range(last_golden_cross_idx, len(df)):
+                df.loc[df.index[i], 'golden_cross_age'] = i - last_golden_cross_idx
+    else:
+        df['post_golden_cross'] = 0
+        df['golden_cross_age'] = 99
+    sma = df['close'].rolling(window=20).mean()
+    std = df['close'].rolling(window=20).std()
+    df['upper_band'] = sma + 2 * std
+    df['lower_band'] = sma - 2 * std
+    df['bb_position'] = (df['close'] - df['lower_band']) / (df['upper_band'] - df['lower_band'])
+    df['volume_trend'] = df['volume'] / df['volume'].rolling(window=5).mean()
+    df['macd_crossover'] = ((df['macd'].shift(1) <= df['macd_signal'].shift(1)) &
+                            (df['macd'] > df['macd_signal'])).astype(float)
+    df['macd_hist_growing'] = ((df['macd_hist'] > 0) &
+                               (df['macd_hist'] > df['macd_hist'].shift(1))).astype(float)
+    df['sma_crossover'] = ((df['sma_10'].shift(1) <= df['sma_20'].shift(1)) &
+                           (df['sma_10'] > df['sma_20'])).astype(float)
+    age = df['golden_cross_age']
+    df['golden_cross_factor'] = np.where(age <= 0, 0, np.where(age <= 5, 5.0, np.where(
+        age <= 15, 3.0, np.where(age <= 30, 1.5, np.where(age <= 50, 0.5, 0.2)))))
+    df['momentum_score'] = (
+        df['macd_crossover'] * 2.0 + df['macd_hist_growing'] * 1.5 + df['sma_crossover'] * 2.0 +
+        df['roc_5'] * 0.3 + df['volume_trend'] * 1.0 + df['golden_cross'] * 6.0 +
+        df['golden_cross_factor'] + df['post_golden_cross'] * 1.5
+    ) - df['death_cross'] * 4.0
+    return df
+
+
+def reference_evaluate(df, coin):
+    """The original evaluate_coin with default parameters; returns the result without its timestamp."""
+    if len(df) < 50:
+        return None
+    df = df.copy()
+    current_price = df['close'].iloc[-1]
+    previous_price = df['close'].iloc[-16]
+    recent = df.iloc[-RANGE_WINDOW:]
+    if (recent['high'].max() - recent['low'].min()) / recent['low'].min() * 100 > 40:
+        return None
+    current_rsi = reference_rsi(df['close'], 14).iloc[-1]
+    if current_rsi > 75:
+        return None
+    df = reference_indicators(df)
+    results = []
+    if check_momentum_signal(df, threshold=3.0):
+        results.append({
+            'strategy': 'MOMENTUM',
+            'momentum_score': df['momentum_score'].iloc[-1],
+            'rank_factor': df['momentum_score'].iloc[-1],
+            'golden_cross_active': df['post_golden_cross'].iloc[-1] > 0
+        })
+    results += [check_volume_spike(df, multiplier=3.0), check_breakout(df), check_mean_reversion(df)]
+    results = [r for r in results if r is not None]
+    if not results:
+        return None
+    best = sorted(results, key=lambda r: r['rank_factor'], reverse=True)[0]
+    avg_volume = df['volume'].rolling(20).mean().iloc[-1]
+    current_volume = df['volume'].iloc[-1]
+    result = {
+        'symbol': coin,
+        'rsi': round(current_rsi, 2),
+        'drop': round((current_price - previous_price) / previous_price * 100, 2),
+        'volume_ratio': round(current_volume / avg_volume if avg_volume > 0 else 0, 2),
+        'vol': current_volume,
+        'price': current_price,
+        'strategy': best['strategy'],
+        'rank_factor': best['rank_factor']
+    }
+    result.update({k: v for k, v in best.items() if k not in result})
+    return result
+
+
+# === Synthetic candles ===
+
+def random_walk(rng, n, spike=False):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    volume = rng.random(n) * 100 + 1
+    if spike:
+        volume[-1] *= 6
+    return candles(close * (1 + rng.normal(0, 0.003, n)), close * 1.003, close * 0.997, close, volume)
+
+
+def golden_cross(n, turn, slope=0.0015):
+    """A slow decline that turns up at `turn`, so SMA 50 crosses above SMA 200 some candles later."""
+    x = np.arange(n)
+    close = 100 * np.where(x < turn, 1 - 0.0005 * x, 1 - 0.0005 * turn + slope * (x - turn)) + np.sin(x) * 0.05
+    volume = 10 + x % 7.0
+    return candles(close * 0.999, close * 1.002, close * 0.998, close, volume)
+
+
+def breakout(rng, n, jump=0.05, fall=0.05, volume_mult=2.8):
+    """A range that sags over the last 14 candles, then a last candle closing `jump` above its resistance."""
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    close[-14:-1] = close[-15] * np.exp(np.cumsum(rng.normal(-fall / 13, 0.001, 13)))
+    # Resistance near the far end of check_breakout's 48 candle lookback
+    close[-46] = close[-48:-3].max() * 1.01
+    close[-1] = close[-48:-3].max() * 1.002 * (1 + jump)
+    volume = rng.random(n) * 20 + 40
+    volume[-1] = volume[-11:-1].mean() * volume_mult
+    return candles(close * 0.999, close * 1.002, close * 0.998, close, volume)
+
+
+def mean_reversion(rng, n, step=0.05, drop=0.04):
+    """A flat series that steps up 21 candles before the end (so the SMA 20 still rises), then drops and bounces."""
+    close = 100 * np.exp(rng.normal(0, 0.0005, n))
+    close[-21:] *= 1 + step
+    close[-2] *= 1 - drop
+    close[-1] = close[-2] * 1.002
+    volume = rng.random(n) * 20 + 40
+    return candles(close * 0.999, close * 1.002, close * 0.998, close, volume)
+
+
+def candles(open_, high, low, close, volume):
+    n = len(close)
+    return pd.DataFrame({'timestamp': np.arange(n) * float(TIMEFRAME_MS), 'open': open_, 'high': high,
+                         'low': low, 'close': close, 'volume': volume})
+
+
+def synthetic_frames(seed=7, count=120):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        # Window-sized frames and deeper ones (> RANGE_WINDOW and > 201 for the golden cross checks)
+        n = (RANGE_WINDOW, 260, 400)[i % 3]
+        frames[f'RW{i}'] = random_walk(rng, n, spike=i % 4 == 0)
+    # Breakouts and mean reversion setups, including weaker ones that lose to other strategies or miss
+    for i, (jump, drop) in enumerate(((0.02, 0.01), (0.04, 0.03), (0.05, 0.04), (0.06, 0.05))):
+        for n in (RANGE_WINDOW, 260, 400):
+            frames[f'BO{i}/{n}'] = breakout(rng, n, jump=jump)
+            frames[f'MR{i}/{n}'] = mean_reversion(rng, n, drop=drop)
+    # Turns that put the SMA 50 / SMA 200 cross inside the last 20 candles
+    for slope, turns in ((0.0015, range(330, 348, 2)), (0.003, range(345, 361, 3))):
+        for turn in turns:
+            frames[f'GC{turn}@{slope}'] = golden_cross(400, turn, slope)
+    return frames
+
+
+# === Comparisons ===
+
+def same(a, b, rtol=1e-9):
+    if a is None or b is None:
+        return a is b
+    if isinstance(a, (float, np.floating)) or isinstance(b, (float, np.floating)):
+        return bool(np.isclose(a, b, rtol=rtol, atol=1e-12, equal_nan=True))
+    return a == b
+
+
+def compare_results(engine, coin, want, got, failures):
+    if (want is None) != (got is None):
+        failures.append(f"{engine} {coin}: reference {want and want['strategy']} vs {got and got['strategy']}")
+        return
+    if want is None:
+        return
+    for key, value in want.items():
+        if not same(value, got.get(key)):
+            failures.append(f"{engine} {coin}: {key} reference {value} vs {got.get(key)}")
+
+
+def compare_columns(engine, coin, want, got, failures):
+    for column in MOMENTUM_COLUMNS:
+        a = np.asarray(want[column], dtype=float)
+        b = np.asarray(got[column], dtype=float)[-len(a):]
+        if not np.allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True):
+            failures.append(f"{engine} {coin}: column {column} differs")
+
+
+def check_strategies(frames):
+    failures = []
+    counts = {}
+    reference = {coin: reference_evaluate(df, coin) for coin, df in frames.items()}
+    for coin, result in reference.items():
+        if result:
+            counts[result['strategy']] = counts.get(result['strategy'], 0) + 1
+
+    # Frame engine (indicator graph) and the panel, column by column and signal by signal
+    panel = IndicatorPanel(frames)
+    panel_results = evaluate_panel(panel)
+    crosses = 0
+    for coin, df in frames.items():
+        want = reference_indicators(df.copy())
+        crosses += coin.startswith('GC') and want['golden_cross'].iloc[-20:].any()
+        compare_columns('frame', coin, want, IndicatorFrame(df.copy()), failures)
+        compare_columns('panel', coin, want, panel.view(coin), failures)
+        compare_results('frame', coin, reference[coin], evaluate_coin(df.copy(), coin), failures)
+        compare_results('panel', coin, reference[coin], panel_results[coin], failures)
+
+        # State engine fed the same closed candles (its window holds the whole frame)
+        book = IndicatorStateBook(window=len(df), timeframe_ms=TIMEFRAME_MS, range_window=RANGE_WINDOW)
+        state = book.sync(coin, df.to_numpy(dtype=float), len(df) * TIMEFRAME_MS)
+        compare_results('state', coin, reference[coin], evaluate_state(state, coin), failures)
+
+    if not crosses:
+        failures.append("no synthetic frame has a golden cross in its last 20 candles")
+    for strategy in ALL_STRATEGIES:
+        if strategy not in counts:
+            failures.append(f"no synthetic frame produced a {strategy} signal")
+    return failures, counts, crosses
+
+
+def same_signals(want, got):
+    if want is None or got is None:
+        return want is got
+    return all(same(value, got[key]) for key, value in want.items())
+
+
+def check_regime(seed=3, count=10, step=7):
+    failures = []
+    rng = np.random.default_rng(seed)
+    for window in (60, RANGE_WINDOW, 250):
+        length = 2 * window + 30
+        series = []
+        for i in range(count):
+            closes = 100 * np.exp(np.cumsum(rng.normal((i % 3 - 1) * 0.003, 0.01, length)))
+            spread = rng.random(length) * 0.01
+            series.append((closes, closes * (1 + spread), closes * (1 - spread), rng.random(length) * 10))
+        head = [tuple(a[:window] for a in s) for s in series]
+        if batch_signals(head) != [series_signals(*s) for s in head]:
+            failures.append(f"regime batch_signals differs from series_signals ({window} candles)")
+
+        # RegimeState fed candle by candle, checked before and after its window starts sliding,
+        # with and without a forming candle
+        for closes, highs, lows, volumes in series:
+            state = RegimeState(window=window)
+            for k in range(length - 1):
+                state.update(highs[k], lows[k], closes[k], volumes[k])
+                if k < 49 or k % step and k != window - 1:
+                    continue
+                start = max(0, k + 1 - window)
+                stored = series_signals(closes[start:k + 1], highs[start:k + 1], lows[start:k + 1], volumes[start:k + 1])
+                forming = series_signals(closes[start:k + 2], highs[start:k + 2], lows[start:k + 2], volumes[start:k + 2])
+                got = state.signals()
+                got_forming = state.signals((highs[k + 1], lows[k + 1], closes[k + 1], volumes[k + 1]))
+                if not same_signals(stored, got) or not same_signals(forming, got_forming):
+                    failures.append(f"regime RegimeState differs from series_signals "
+                                    f"(window {window}, candle {k + 1}{', sliding' if k >= window else ''})")
+                    break
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Check that the frame, panel and state engines and the regime kernels match the per-frame reference.')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--frames', type=int, default=120)
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.seed, args.frames)
+    failures, counts, crosses = check_strategies(frames)
+    failures += check_regime(args.seed)
+    signals = ', '.join(f"{s}: {n}" for s, n in sorted(counts.items()))
+    print(f"[CHECK] {len(frames)} frames ({crosses} with a golden cross) | reference signals - {signals}")
+    for failure in failures[:50]:
+        print(f"[CHECK] FAIL {failure}")
+    if failures:
+        print(f"[CHECK] {len(failures)} differences")
+        sys.exit(1)
+    print("[CHECK] frame, panel, state and regime engines match the reference")
@@ -72,4 +72,13 @@ class CoinGeckoAPI:
         url = f"{self.BASE_URL}/simple/supported_vs_currencies"
         resp = requests.get(url)
         resp.raise_for_status()
-        return resp.json()
\ No newline at end of file
+        return resp.json()
+
+    def get_coins_list(self) -> List[Dict[str, Any]]:
+        """
+        Get every listed coin as {id, symbol, name} (used to map exchange tickers to coin ids).
+        """
+        url = f"{self.BASE_URL}/coins/list"
+        resp = requests.get(url)
+        resp.raise_for_status()
+        return resp.json()
@@ -1,3 +1,79 @@
 # Config file to store API keys
 API_KEY = 'your_api_key_here'
 API_SECRET = 'your_api_secret_here'
+
+# Concurrent OHLCV scanner
+SCAN_MAX_WORKERS = 8          # parallel OHLCV requests in flight
+SCAN_SYMBOL_TIMEOUT = 15.0    # seconds before a single symbol's fetch is abandoned for the cycle
+SCAN_RATE_LIMIT_MS = None     # spacing between request starts; None uses exchange.rateLimit
+
+# Incremental candle cache
+CANDLE_CACHE_SIZE = 1000      # 1m candles kept per symbol; backfilled once, then refreshes only fetch newer candles
+SCAN_CANDLE_LIMIT = 1000      # candles handed to the strategies (> 201 enables the golden/death cross checks)
+CANDLE_STORE_MAX_MB = 256     # memory budget for cached candles; least recently scanned symbols are dropped beyond it
+CANDLE_STORE_TTL = 3600       # seconds a symbol's candles are kept without being scanned
+CANDLE_ARCHIVE_DIR = 'candles'   # closed candles persisted here and restored on start-up; None keeps them in memory only
+CANDLE_ARCHIVE_ROWS = 10080   # candles kept on disk per series (7 days of 1m); backfill.py fills it from older history
+
+# WebSocket market data
+STREAM_ENABLED = True         # stream ohlc/ticker/trade from Kraken and read candles/prices from memory
+STREAM_URL = "wss://ws.kraken.com/v2"   # point at ws_replay.py for offline runs
+
+# Tiered scan scheduler
+SCHED_HOT_SIZE = 40           # most active symbols, rescanned every cycle
+SCHED_WARM_SIZE = 80          # next tier, rescanned every SCHED_WARM_EVERY cycles
+SCHED_WARM_EVERY = 3
+SCHED_COLD_EVERY = 10         # everything else
+SCHED_MOVE_PCT = 1.5          # streamed price move (%) since last scan that promotes a symbol to hot
+
+# Bulk-ticker pre-filter (one fetch_tickers call before any candle download; None disables a rule)
+PREFILTER_ENABLED = True
+PREFILTER_MIN_QUOTE_VOLUME = 10000   # minimum 24h volume in USD
+PREFILTER_MAX_SPREAD_PCT = 1.0       # maximum bid/ask spread in %
+PREFILTER_MAX_RANGE_PCT = 80.0       # maximum 24h high/low range in % (looser than evaluate_coin's 40% window rule)
+PREFILTER_MAX_AGE = 120              # seconds without a ticker/trade update before a symbol is considered stale;
+                                     # Kraken REST tickers have no timestamp, so this needs STREAM_ENABLED
+
+# Indicator engine: 'panel' computes all scanned symbols in one vectorized pass, 'frame' runs evaluate_coin per symbol,
+# 'state' updates per-symbol IndicatorState in O(1) per closed candle and evaluates closed candles only
+INDICATOR_ENGINE = 'panel'
+
+# Strategies to evaluate; indicators only needed by disabled strategies are never computed
+ENABLED_STRATEGIES = ('MOMENTUM', 'VOLUME_SPIKE', 'BREAKOUT', 'MEAN_REVERSION')
+
+# Evaluation backend for INDICATOR_ENGINE = 'frame': 'serial' evaluates each symbol as it arrives,
+# 'thread' / 'process' evaluate the whole scan in batches ('process' shares candles through shared memory)
+EVAL_BACKEND = 'serial'
+EVAL_MAX_WORKERS = None       # None uses os.cpu_count()
+EVAL_BATCH_SIZE = 16          # symbols per task
+EVAL_CACHE_SIZE = 2048        # cached evaluations (LRU); a coin is re-evaluated only when its candles or the parameters change
+
+# Market regime service (reference series are refreshed in the background only after their candle closes)
+REGIME_POLL_SECONDS = 5.0     # how often the background thread looks for closed candles
+REGIME_CLOSE_GRACE = 2.0      # seconds after a close before asking the exchange for the new candle
+REGIME_STREAMING = False      # keep per-series RegimeState (O(1) per closed bar, same signals as recomputing the window)
+
+# Exchange request cache: seconds a response is reused per ccxt method (0 only merges identical in-flight calls).
+# Order calls drop cached private responses such as the balance.
+EXCHANGE_CACHE_TTLS = {
+    'fetch_balance': 5.0,
+    'fetch_ticker': 2.0,
+    'fetch_tickers': 2.0,
+    'fetch_ohlcv': 2.0,
+    'fetch_order_book': 1.0
+}
+
+# Trade history queries: None indexes trades in memory, a path keeps them in SQLite (WAL, indexed;
+# trading_history.json is migrated into it on start-up, or run trade_store.py)
+TRADE_STORE_PATH = None
+
+# Open positions checkpoint: snapshot plus a journal of changes, reconciled against the balance and
+# recent fills on start-up so the bot resumes managing them; None keeps positions in memory only
+PORTFOLIO_PATH = 'portfolio.json'
+
+# Order execution: private calls run in submission order on one queue (Kraken nonces must increase);
+# spacing between their starts in ms. ccxt gives AddOrder/CancelOrder a cost of 0, so it never delays
+# them and this is the real order pacing (10 queued buys start within ~1.8s). Balance and TradesHistory
+# are still throttled inside ccxt: 3x and 6x exchange.rateLimit (3s and 6s) after the previous request.
+# None uses exchange.rateLimit (1000ms on Kraken)
+ORDER_RATE_LIMIT_MS = 200
@@ -0,0 +1,194 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from candles import Candles, COLUMNS
+from strategy import evaluate_coin, cascade_stats, ALL_STRATEGIES
+
+BACKENDS = ('serial', 'thread', 'process')
+
+
+def pack_frames(frames):
+    """
+    Copy many coins' candles into one shared memory block laid out like Candles (6 x total),
+    coins side by side. Returns (shm, shape, entries) where entries are (coin, start, stop)
+    column ranges; the caller closes and unlinks `shm`.
+    """
+    entries = []
+    total = 0
+    for coin, df in frames.items():
+        if df is None or not len(df):
+            continue
+        entries.append((coin, total, total + len(df)))
+        total += len(df)
+    shape = (len(COLUMNS), total)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total * len(COLUMNS) * 8))
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    for coin, start, stop in entries:
+        candles = frames[coin]
+        if not isinstance(candles, Candles):
+            candles = Candles.from_frame(candles)
+        block[:, start:stop] = candles.values
+    del block
+    return shm, shape, entries
+
+
+def _evaluate_batch(shm_name, shape, entries, params, strategies):
+    """Worker: evaluate coins whose candles are rows of a shared memory block. Returns (results, cascade stages)."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    cascade_stats.reset()
+    results = {}
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for coin, start, stop in entries:
+            candles = Candles(block[:, start:stop])
+            results[coin] = evaluate_coin(candles, coin, params, strategies)
+            del candles
+        del block
+    finally:
+        shm.close()
+    return results, cascade_stats.stages
+
+
+def _noop():
+    return os.getpid()
+
+
+class EvaluationPool:
+    """
+    Run evaluate_coin over many symbols on one of three backends:
+      - serial:  in the calling thread
+      - thread:  symbol batches on a thread pool (shares the GIL; useful as a baseline)
+      - process: symbol batches on a process pool; candles travel through one shared memory
+                 block per call instead of being pickled, workers read Candles views of it
+                 and only results come back
+    Create it before starting other threads: the process backend forks its workers up front.
+    """
+
+    def __init__(self, backend='serial', max_workers=None, batch_size=16):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown evaluation backend {backend!r}, expected one of {BACKENDS}")
+        self.backend = backend
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+        self.batch_size = max(1, int(batch_size))
+        self._executor = None
+        self.last_stats = {}
+        if backend == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='evaluate')
+        elif backend == 'process':
+            # fork: main.py is a script without a __main__ guard, spawned workers would re-run it
+            context = multiprocessing.get_context('fork')
+            # Workers inherit the parent's tracker, so shared blocks are not reported as leaked by each worker
+            resource_tracker.ensure_running()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            for future in [self._executor.submit(_noop) for _ in range(self.max_workers)]:
+                future.result()
+
+    def _batches(self, items):
+        return [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+
+    def evaluate(self, frames, params=None, strategies=ALL_STRATEGIES):
+        """Evaluate {coin: Candles or candle DataFrame}; returns {coin: result or None}."""
+        started = time.perf_counter()
+        results = {}
+        batches = 0
+        if self.backend == 'serial':
+            for coin, df in frames.items():
+                results[coin] = evaluate_coin(df, coin, params, strategies)
+        elif self.backend == 'thread':
+            def run(batch):
+                return {coin: evaluate_coin(frames[coin], coin, params, strategies) for coin in batch}
+            batches = self._batches(list(frames))
+            for batch_results in self._executor.map(run, batches):
+                results.update(batch_results)
+            batches = len(batches)
+        else:
+            results, batches = self._evaluate_shared(frames, params, strategies)
+        self.last_stats = {'coins': len(frames), 'batches': batches, 'seconds': time.perf_counter() - started}
+        return results
+
+    def _evaluate_shared(self, frames, params, strategies):
+        results = {coin: None for coin in frames}
+        if not frames:
+            return results, 0
+        shm, shape, entries = pack_frames(frames)
+        try:
+            batches = self._batches(entries)
+            futures = [self._executor.submit(_evaluate_batch, shm.name, shape, batch, params, tuple(strategies))
+                       for batch in batches]
+            for future, batch in zip(futures, batches):
+                try:
+                    batch_results, stages = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Evaluation batch of {len(batch)} coins failed: {e}")
+                    continue
+                results.update(batch_results)
+                cascade_stats.merge(stages)
+        finally:
+            shm.close()
+            shm.unlink()
+        return results, len(batches)
+
+    def print_stats(self):
+        s = self.last_stats
+        if not s:
+            return
+        print(f"[EVAL] {self.backend}: {s['coins']} coins in {s['seconds']:.2f}s "
+              f"({s['batches']} batches, {self.max_workers if self.backend != 'serial' else 1} workers)")
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _synthetic_frames(count, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(count):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, rows)))
+        volume = rng.random(rows) * 100
+        volume[-1] *= rng.choice([1, 5])
+        timestamps = np.arange(rows) * 60000.0
+        frames[f'SYN{i}/USD'] = Candles(np.vstack((
+            timestamps, close * (1 + rng.normal(0, 0.003, rows)), close * 1.003, close * 0.997, close, volume
+        )))
+    return frames
+
+
+def benchmark(backends=BACKENDS, coins=400, rows=144, max_workers=None, batch_size=16, rounds=3):
+    """Time each backend on the same synthetic frames and check they agree."""
+    frames = _synthetic_frames(coins, rows)
+    reference = None
+    for backend in backends:
+        pool = EvaluationPool(backend, max_workers=max_workers, batch_size=batch_size)
+        try:
+            timings = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                results = pool.evaluate(frames)
+                timings.append(time.perf_counter() - started)
+        finally:
+            pool.shutdown()
+        signals = {c: r['strategy'] for c, r in results.items() if r}
+        if reference is None:
+            reference = signals
+        agree = 'ok' if signals == reference else 'MISMATCH'
+        print(f"[BENCH] {backend:7s} best {min(timings):.3f}s / {coins} coins "
+              f"({len(signals)} signals, {agree})")
+    cascade_stats.reset()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the evaluation backends on synthetic candles.')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--coins', type=int, default=400)
+    parser.add_argument('--rows', type=int, default=144)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.backends, args.coins, args.rows, args.workers, args.batch_size, args.rounds)
@@ -0,0 +1,126 @@
+import threading
+import time
+
+# Responses that change when we trade; dropped from the cache after any order call
+PRIVATE_METHODS = ('fetch_balance', 'fetch_open_orders', 'fetch_closed_orders', 'fetch_order',
+                   'fetch_orders', 'fetch_my_trades', 'fetch_positions')
+ORDER_PREFIXES = ('create_', 'cancel_', 'edit_')
+
+
+class _Call:
+    """One in-flight request that identical concurrent requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CachingExchange:
+    """
+    Thin proxy around a ccxt exchange. Calls to the methods listed in `ttls` ({method: seconds})
+    are keyed by their arguments: a response younger than its TTL is returned from the cache,
+    and a call identical to one still in flight waits for that one instead of hitting the API
+    (a TTL of 0 only coalesces). Every other attribute and method goes straight to the exchange;
+    order calls (create_*/cancel_*/edit_*) also drop the cached private responses such as the
+    balance. Cached responses are shared, callers must not modify them.
+    """
+
+    def __init__(self, exchange, ttls=None):
+        object.__setattr__(self, 'exchange', exchange)
+        object.__setattr__(self, 'ttls', dict(ttls or {}))
+        object.__setattr__(self, '_cache', {})
+        object.__setattr__(self, '_inflight', {})
+        object.__setattr__(self, '_lock', threading.Lock())
+        object.__setattr__(self, '_wrappers', {})
+        object.__setattr__(self, '_generation', 0)
+        self.reset_stats()
+
+    def reset_stats(self):
+        object.__setattr__(self, 'stats', {'calls': 0, 'cached': 0, 'coalesced': 0})
+
+    def __getattr__(self, name):
+        attr = getattr(self.exchange, name)
+        if name in self.ttls and callable(attr):
+            wrapper = self._wrappers.get(name)
+            if wrapper is None:
+                wrapper = self._wrappers[name] = self._cached_method(name)
+            return wrapper
+        if name.startswith(ORDER_PREFIXES) and callable(attr):
+            def order_call(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    self.invalidate(*PRIVATE_METHODS)
+            return order_call
+        return attr
+
+    def __setattr__(self, name, value):
+        setattr(self.exchange, name, value)
+
+    def _cached_method(self, name):
+        ttl = self.ttls[name]
+
+        def call(*args, **kwargs):
+            # Symbol lists (fetch_tickers) are keyed as tuples
+            key = (name, tuple(tuple(a) if isinstance(a, list) else a for a in args), tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                # Unhashable arguments (e.g. a params dict): nothing to share
+                return getattr(self.exchange, name)(*args, **kwargs)
+            with self._lock:
+                self.stats['calls'] += 1
+                entry = self._cache.get(key)
+                if entry is not None and time.monotonic() - entry[0] < ttl:
+                    self.stats['cached'] += 1
+                    return entry[1]
+                pending = self._inflight.get(key)
+                owner = pending is None
+                if owner:
+                    pending = self._inflight[key] = _Call()
+                    generation = self._generation
+                else:
+                    self.stats['coalesced'] += 1
+            if not owner:
+                pending.done.wait()
+                if pending.error is not None:
+                    raise pending.error
+                return pending.result
+            try:
+                pending.result = getattr(self.exchange, name)(*args, **kwargs)
+                with self._lock:
+                    # Not if an invalidation happened meanwhile: the response may predate an order
+                    if ttl > 0 and generation == self._generation:
+                        self._cache[key] = (time.monotonic(), pending.result)
+                return pending.result
+            except Exception as e:
+                pending.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                pending.done.set()
+
+        return call
+
+    def invalidate(self, *methods):
+        """Drop cached responses of `methods` (all of them if none given)."""
+        with self._lock:
+            object.__setattr__(self, '_generation', self._generation + 1)
+            for key in list(self._cache):
+                if not methods or key[0] in methods:
+                    del self._cache[key]
+
+    def print_stats(self):
+        """Print and reset the per-cycle counters; also prunes expired responses."""
+        now = time.monotonic()
+        with self._lock:
+            for key, (stamp, _) in list(self._cache.items()):
+                if now - stamp >= self.ttls.get(key[0], 0):
+                    del self._cache[key]
+            s = self.stats
+            saved = s['cached'] + s['coalesced']
+            print(f"[API CACHE] calls: {s['calls']} | saved: {saved} "
+                  f"(cached: {s['cached']}, coalesced: {s['coalesced']}) | entries: {len(self._cache)}")
+        self.reset_stats()
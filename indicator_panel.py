@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+BASE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _ema(x, span):
+    """EMA along the time axis matching pandas ewm(span, adjust=False); starts at each row's first value."""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    prev = x[:, 0].copy()
+    out[:, 0] = prev
+    for t in range(1, x.shape[1]):
+        cur = x[:, t]
+        prev = np.where(np.isnan(prev), cur, alpha * cur + (1 - alpha) * prev)
+        out[:, t] = prev
+    return out
+
+
+def _rolling(x, window, fn):
+    """Trailing rolling window reduction; windows containing NaN (incl. the warm-up) give NaN."""
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        windows = sliding_window_view(x, window, axis=1)
+        out[:, window - 1:] = fn(windows)
+    return out
+
+
+def rolling_mean(x, window):
+    return _rolling(x, window, lambda w: w.mean(axis=-1))
+
+
+def rolling_std(x, window):
+    return _rolling(x, window, lambda w: w.std(axis=-1, ddof=1))
+
+
+def _shift(x, n=1):
+    out = np.full_like(x, np.nan)
+    out[:, n:] = x[:, :-n]
+    return out
+
+
+class PanelView:
+    """
+    Read-only per-symbol view of an IndicatorPanel. Supports the subset of the DataFrame
+    interface the strategy checks use (len, `col in view`, view['col'] -> Series).
+    Columns are zero-copy slices of the panel arrays.
+    """
+
+    def __init__(self, panel, row, length):
+        self._panel = panel
+        self._row = row
+        self._length = length
+        self._series = {}
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, column):
+        return column in self._panel.columns
+
+    def __getitem__(self, column):
+        series = self._series.get(column)
+        if series is None:
+            values = self._panel.columns[column][self._row, -self._length:]
+            series = pd.Series(values, copy=False, name=column)
+            self._series[column] = series
+        return series
+
+
+class IndicatorPanel:
+    """
+    Aligns many symbols' candles into 2-D (symbols x time) float arrays and computes the
+    add_momentum_indicators columns for all of them in one vectorized pass.
+    Series are right-aligned on their last candle and left-padded with NaN, so each row
+    gives the same values the per-frame pandas code would produce for that symbol.
+    """
+
+    def __init__(self, frames):
+        self.symbols = list(frames)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.lengths = np.array([len(frames[s]) for s in self.symbols], dtype=np.int64)
+        width = int(self.lengths.max()) if len(self.lengths) else 0
+        self.columns = {}
+        for col in BASE_COLUMNS:
+            arr = np.full((len(self.symbols), width), np.nan)
+            for i, s in enumerate(self.symbols):
+                n = self.lengths[i]
+                if n:
+                    arr[i, width - n:] = frames[s][col].to_numpy(dtype=float)
+            self.columns[col] = arr
+        if width:
+            self._compute()
+
+    def view(self, symbol):
+        row = self.index[symbol]
+        return PanelView(self, row, int(self.lengths[row]))
+
+    def views(self):
+        return {s: self.view(s) for s in self.symbols}
+
+    def _compute(self):
+        c = self.columns
+        close, volume = c['close'], c['volume']
+        lengths = self.lengths[:, None]
+
+        c['rsi'] = self._rsi(close, 14)
+
+        ema_12 = _ema(close, 12)
+        ema_26 = _ema(close, 26)
+        c['macd'] = ema_12 - ema_26
+        c['macd_signal'] = _ema(c['macd'], 9)
+        c['macd_hist'] = c['macd'] - c['macd_signal']
+        c['roc_5'] = (close / _shift(close, 5) - 1) * 100
+        for w in (10, 20, 50, 200):
+            c[f'sma_{w}'] = rolling_mean(close, w)
+
+        self._golden_cross(lengths)
+
+        c['std_20'] = rolling_std(close, 20)
+        c['upper_band'] = c['sma_20'] + 2 * c['std_20']
+        c['lower_band'] = c['sma_20'] - 2 * c['std_20']
+        c['bb_position'] = (close - c['lower_band']) / (c['upper_band'] - c['lower_band'])
+        c['volume_trend'] = volume / rolling_mean(volume, 5)
+
+        long_enough = lengths > 2
+        c['macd_crossover'] = ((_shift(c['macd']) <= _shift(c['macd_signal'])) &
+                               (c['macd'] > c['macd_signal'])).astype(float)
+        c['macd_hist_growing'] = ((c['macd_hist'] > 0) &
+                                  (c['macd_hist'] > _shift(c['macd_hist']))).astype(float)
+        c['sma_crossover'] = ((_shift(c['sma_10']) <= _shift(c['sma_20'])) &
+                              (c['sma_10'] > c['sma_20'])).astype(float)
+        age = c['golden_cross_age']
+        c['golden_cross_factor'] = np.select(
+            [age <= 0, age <= 5, age <= 15, age <= 30, age <= 50],
+            [0.0, 5.0, 3.0, 1.5, 0.5], default=0.2
+        )
+        score = (
+            c['macd_crossover'] * 2.0 +
+            c['macd_hist_growing'] * 1.5 +
+            c['sma_crossover'] * 2.0 +
+            c['roc_5'] * 0.3 +
+            c['volume_trend'] * 1.0 +
+            c['golden_cross'] * 6.0 +
+            c['golden_cross_factor'] +
+            c['post_golden_cross'] * 1.5
+        ) - c['death_cross'] * 4.0
+        c['momentum_score'] = np.where(long_enough, score, 0.0)
+
+    @staticmethod
+    def _rsi(close, period):
+        """Vectorized strategy.calculate_rsi (simple rolling means of gains and losses)."""
+        filled = pd.DataFrame(close.T).ffill().to_numpy().T
+        delta = np.nan_to_num(filled - _shift(filled), nan=0.0)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        avg_gain = rolling_mean(gain, period)
+        avg_loss = rolling_mean(loss, period)
+        avg_loss = np.where(avg_loss == 0, 0.00001, avg_loss)
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        # Windows reaching into a shorter row's left padding have no pandas equivalent: report 50 like fillna.
+        first = np.argmax(~np.isnan(close), axis=1)[:, None]
+        warm_up = np.arange(close.shape[1]) < first + period - 1
+        return np.where(np.isnan(rsi) | warm_up, 50.0, rsi)
+
+    def _golden_cross(self, lengths):
+        """Golden/death cross flags over the last 20 candles, only for series longer than 201 rows."""
+        c = self.columns
+        sma_50, sma_200 = c['sma_50'], c['sma_200']
+        shape = sma_50.shape
+        deep = lengths > 201
+        golden = np.zeros(shape)
+        death = np.zeros(shape)
+        if shape[1] > 21:
+            cur50, cur200 = sma_50[:, -20:-1], sma_200[:, -20:-1]
+            prev50, prev200 = sma_50[:, -21:-2], sma_200[:, -21:-2]
+            up = (prev50 <= prev200) & (cur50 > cur200)
+            down = ~up & (prev50 >= prev200) & (cur50 < cur200)
+            golden[:, -20:-1] = up & deep
+            death[:, -20:-1] = down & deep
+        c['golden_cross'] = golden
+        c['death_cross'] = death
+        c['post_golden_cross'] = np.where(deep, (sma_50 > sma_200).astype(float), 0.0)
+        # Age since the most recent golden cross, counted from that candle onwards (0 before it).
+        cols = np.arange(shape[1])
+        has_cross = golden.any(axis=1)
+        last_idx = np.where(has_cross, shape[1] - 1 - np.argmax(golden[:, ::-1], axis=1), 0)
+        age = np.where(has_cross[:, None] & (cols >= last_idx[:, None]), cols - last_idx[:, None], 0)
+        c['golden_cross_age'] = np.where(deep, age, 99).astype(float)
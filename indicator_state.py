@@ -0,0 +1,355 @@
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+
+BASE_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+INDICATOR_COLUMNS = (
+    'rsi', 'macd', 'macd_signal', 'macd_hist', 'roc_5', 'sma_10', 'sma_20', 'sma_50', 'sma_200',
+    'golden_cross', 'death_cross', 'post_golden_cross', 'golden_cross_age', 'upper_band', 'lower_band',
+    'bb_position', 'volume_trend', 'macd_crossover', 'macd_hist_growing', 'sma_crossover',
+    'golden_cross_factor', 'momentum_score'
+)
+TAIL = 50  # rows kept for the strategy checks (breakout looks back 48 candles)
+
+
+class RunningEMA:
+    """EMA matching pandas ewm(span, adjust=False): seeded with the first value."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = math.nan
+
+    def push(self, x):
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class RollingStats:
+    """
+    Rolling mean/std over the last `n` values from running sums and sums of squares.
+    Sums are kept relative to a reference value and rebuilt exactly once per `n` pushes,
+    which keeps cancellation error and float drift bounded.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.values = deque(maxlen=n)
+        self._ref = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_rebuild = 0
+
+    def push(self, x):
+        if len(self.values) == self.n:
+            old = self.values[0] - self._ref
+            self._sum -= old
+            self._sumsq -= old * old
+        self.values.append(x)
+        d = x - self._ref
+        self._sum += d
+        self._sumsq += d * d
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.n:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._ref = self.values[-1]
+        self._sum = math.fsum(v - self._ref for v in self.values)
+        self._sumsq = math.fsum((v - self._ref) ** 2 for v in self.values)
+        self._since_rebuild = 0
+
+    @property
+    def full(self):
+        return len(self.values) == self.n
+
+    def mean(self):
+        if not self.full:
+            return math.nan
+        return self._ref + self._sum / self.n
+
+    def std(self):
+        if not self.full or self.n < 2:
+            return math.nan
+        var = (self._sumsq - self._sum * self._sum / self.n) / (self.n - 1)
+        if var <= 1e-14 * (self._sumsq / self.n):
+            return 0.0
+        return math.sqrt(var)
+
+
+class RollingExtreme:
+    """Rolling max (or min) over the last `n` values with a monotonic deque: amortized O(1) per push."""
+
+    def __init__(self, n, mode='max'):
+        self.n = n
+        self.sign = 1.0 if mode == 'max' else -1.0
+        self._deque = deque()
+        self._count = 0
+
+    def push(self, x):
+        key = self.sign * x
+        while self._deque and self._deque[-1][1] <= key:
+            self._deque.pop()
+        self._deque.append((self._count, key))
+        self._count += 1
+        while self._deque[0][0] <= self._count - 1 - self.n:
+            self._deque.popleft()
+
+    def value(self):
+        return self.sign * self._deque[0][1] if self._deque else math.nan
+
+
+class StateView:
+    """
+    DataFrame-like view over an IndicatorState's recent rows for the strategy checks.
+    `len()` reports the logical window length while columns only hold the last TAIL rows.
+    """
+
+    def __init__(self, state):
+        self._state = state
+        self._series = {}
+
+    def __len__(self):
+        return len(self._state)
+
+    def __contains__(self, column):
+        return column in self._state.tail
+
+    def __getitem__(self, column):
+        series = self._series.get(column)
+        if series is None:
+            series = pd.Series(self._state.column(column), name=column)
+            self._series[column] = series
+        return series
+
+
+class IndicatorState:
+    """
+    Incrementally maintained indicators for one symbol. Each closed candle updates the
+    MACD EMAs, rolling SMAs and Bollinger std, RSI, volume means, the breakout resistance and
+    the window high/low in O(1). Rolling values equal strategy.add_momentum_indicators and
+    calculate_rsi on the last `window` candles; the EMAs run over the whole stream, so once the
+    window starts sliding they differ from a window-seeded batch EMA only by the decayed seed.
+    """
+
+    def __init__(self, window=144, breakout_lookback=48, breakout_confirmation=3, range_window=None):
+        self.window = window
+        self.count = 0
+        self.last_timestamp = None
+        self._ema_12 = RunningEMA(12)
+        self._ema_26 = RunningEMA(26)
+        self._signal = RunningEMA(9)
+        self._sma = {n: RollingStats(n) for n in (10, 20, 50, 200)}
+        self._volume_5 = RollingStats(5)
+        self._volume_20 = RollingStats(20)
+        self._gain = RollingStats(14)
+        self._loss = RollingStats(14)
+        self._high = RollingExtreme(range_window or window, 'max')
+        self._low = RollingExtreme(range_window or window, 'min')
+        # check_breakout's resistance: max high over [-lookback, -confirmation)
+        self._resistance = RollingExtreme(breakout_lookback - breakout_confirmation, 'max')
+        self._lagged_highs = deque(maxlen=breakout_confirmation)
+        self._prev_close = None
+        self._pos = 0
+        self.tail = {c: np.full(TAIL, np.nan) for c in BASE_COLUMNS + INDICATOR_COLUMNS}
+
+    def __len__(self):
+        return min(self.count, self.window)
+
+    def _get(self, column, back=0):
+        """Value of `column` `back` rows before the newest one."""
+        return self.tail[column][(self._pos - 1 - back) % TAIL]
+
+    def column(self, column):
+        """Tail rows of `column` in time order (oldest first)."""
+        arr = self.tail[column]
+        n = min(self.count, TAIL)
+        return np.concatenate((arr[self._pos:], arr[:self._pos]))[-n:] if n else arr[:0]
+
+    def view(self):
+        return StateView(self)
+
+    def range_pct(self):
+        """High/low range over the last `range_window` candles in percent (evaluate_coin's pump filter)."""
+        low = self._low.value()
+        return (self._high.value() - low) / low * 100
+
+    @property
+    def resistance(self):
+        return self._resistance.value()
+
+    def _sma_value(self, n):
+        # A rolling window longer than the candle window is never complete in the batch version.
+        return self._sma[n].mean() if n <= self.window else math.nan
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """Apply one closed candle."""
+        row = {'timestamp': timestamp, 'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+        self.count += 1
+        self.last_timestamp = timestamp
+        pos = self._pos
+        self._pos = (pos + 1) % TAIL
+        for col, value in row.items():
+            self.tail[col][pos] = value
+        t = self.tail
+        length = len(self)
+
+        # RSI from rolling means of gains/losses (first delta counts as 0, like diff().fillna(0))
+        delta = close - self._prev_close if self._prev_close is not None else 0.0
+        self._prev_close = close
+        self._gain.push(delta if delta > 0 else 0.0)
+        self._loss.push(-delta if delta < 0 else 0.0)
+        if self._gain.full and self.window >= 14:
+            # All-zero windows are checked exactly so float residue in the running sums cannot leak in.
+            avg_gain = self._gain.mean() if any(self._gain.values) else 0.0
+            avg_loss = self._loss.mean() if any(self._loss.values) else 0.00001
+            t['rsi'][pos] = 100 - 100 / (1 + avg_gain / avg_loss)
+        else:
+            t['rsi'][pos] = 50.0
+
+        macd = self._ema_12.push(close) - self._ema_26.push(close)
+        signal = self._signal.push(macd)
+        t['macd'][pos] = macd
+        t['macd_signal'][pos] = signal
+        t['macd_hist'][pos] = macd - signal
+        t['roc_5'][pos] = (close / self._get('close', 5) - 1) * 100 if length > 5 else math.nan
+
+        for n, stats in self._sma.items():
+            stats.push(close)
+            t[f'sma_{n}'][pos] = self._sma_value(n)
+        std_20 = self._sma[20].std() if self.window >= 20 else math.nan
+        sma_20 = t['sma_20'][pos]
+        t['upper_band'][pos] = sma_20 + 2 * std_20
+        t['lower_band'][pos] = sma_20 - 2 * std_20
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t['bb_position'][pos] = np.float64(close - t['lower_band'][pos]) / (t['upper_band'][pos] - t['lower_band'][pos])
+
+        self._volume_5.push(volume)
+        self._volume_20.push(volume)
+        vol_mean_5 = self._volume_5.mean() if self.window >= 5 else math.nan
+        t['volume_trend'][pos] = volume / vol_mean_5 if vol_mean_5 != 0 else math.nan
+
+        self._high.push(high)
+        self._low.push(low)
+        if len(self._lagged_highs) == self._lagged_highs.maxlen:
+            self._resistance.push(self._lagged_highs[0])
+        self._lagged_highs.append(high)
+
+        self._update_golden_cross(length)
+        self._update_momentum(pos, length)
+
+    def _update_golden_cross(self, length):
+        """Re-derive cross flags for the last 20 rows the way the batch code sees a frame ending here."""
+        t = self.tail
+        n = min(self.count, TAIL)
+        cols = {c: self.column(c) for c in ('sma_50', 'sma_200')}
+        golden = np.zeros(n)
+        death = np.zeros(n)
+        deep = length > 201
+        if deep and n > 21:
+            cur50, cur200 = cols['sma_50'][-20:-1], cols['sma_200'][-20:-1]
+            prev50, prev200 = cols['sma_50'][-21:-2], cols['sma_200'][-21:-2]
+            up = (prev50 <= prev200) & (cur50 > cur200)
+            down = ~up & (prev50 >= prev200) & (cur50 < cur200)
+            golden[-20:-1] = up
+            death[-20:-1] = down
+        if deep:
+            post = (cols['sma_50'] > cols['sma_200']).astype(float)
+            crosses = np.flatnonzero(golden)
+            age = np.zeros(n)
+            if len(crosses):
+                last = crosses[-1]
+                age[last:] = np.arange(n - last)
+        else:
+            post = np.zeros(n)
+            age = np.full(n, 99.0)
+        for col, values in (('golden_cross', golden), ('death_cross', death),
+                            ('post_golden_cross', post), ('golden_cross_age', age)):
+            self._write_tail(col, values)
+
+    def _write_tail(self, column, values):
+        n = len(values)
+        idx = (self._pos - n + np.arange(n)) % TAIL
+        self.tail[column][idx] = values
+
+    def _update_momentum(self, pos, length):
+        t = self.tail
+        if length <= 2:
+            t['momentum_score'][pos] = 0.0
+            return
+        macd, signal, hist = t['macd'][pos], t['macd_signal'][pos], t['macd_hist'][pos]
+        sma_10, sma_20 = t['sma_10'][pos], t['sma_20'][pos]
+        t['macd_crossover'][pos] = float(self._get('macd', 1) <= self._get('macd_signal', 1) and macd > signal)
+        t['macd_hist_growing'][pos] = float(hist > 0 and hist > self._get('macd_hist', 1))
+        t['sma_crossover'][pos] = float(self._get('sma_10', 1) <= self._get('sma_20', 1) and sma_10 > sma_20)
+        age = t['golden_cross_age'][pos]
+        if age <= 0:
+            factor = 0.0
+        elif age <= 5:
+            factor = 5.0
+        elif age <= 15:
+            factor = 3.0
+        elif age <= 30:
+            factor = 1.5
+        elif age <= 50:
+            factor = 0.5
+        else:
+            factor = 0.2
+        t['golden_cross_factor'][pos] = factor
+        t['momentum_score'][pos] = (
+            t['macd_crossover'][pos] * 2.0 +
+            t['macd_hist_growing'][pos] * 1.5 +
+            t['sma_crossover'][pos] * 2.0 +
+            t['roc_5'][pos] * 0.3 +
+            t['volume_trend'][pos] * 1.0 +
+            t['golden_cross'][pos] * 6.0 +
+            factor +
+            t['post_golden_cross'][pos] * 1.5
+        ) - t['death_cross'][pos] * 4.0
+
+
+class IndicatorStateBook:
+    """One IndicatorState per symbol, fed with closed candles from CandleStore rows."""
+
+    def __init__(self, window=144, timeframe_ms=60000, range_window=None):
+        self.window = window
+        self.timeframe_ms = timeframe_ms
+        self.range_window = range_window
+        self.states = {}
+
+    def drop(self, symbol):
+        """Forget a symbol (its candles were evicted from the store)."""
+        self.states.pop(symbol, None)
+
+    def sync_buffer(self, symbol, buf, now_ms):
+        """Sync from a CandleBuffer, reading only its newest rows once the state is warm."""
+        state = self.states.get(symbol)
+        if state is not None and state.last_timestamp is not None and len(buf):
+            if state.last_timestamp < buf.first_timestamp:
+                # Missed candles that the buffer no longer holds: rebuild from scratch.
+                del self.states[symbol]
+            else:
+                behind = int((buf.last_timestamp - state.last_timestamp) // self.timeframe_ms) + 2
+                return self.sync(symbol, buf.tail(behind), now_ms)
+        return self.sync(symbol, buf.to_array(), now_ms)
+
+    def sync(self, symbol, rows, now_ms):
+        """
+        Apply closed candles from `rows` ([ts, o, h, l, c, v] in time order) that the state has
+        not seen yet. The still-forming candle (ts + timeframe > now) is left for a later sync.
+        """
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = IndicatorState(window=self.window, range_window=self.range_window)
+        last = state.last_timestamp
+        for row in rows:
+            ts = row[0]
+            if ts + self.timeframe_ms > now_ms:
+                break
+            if last is not None and ts <= last:
+                continue
+            state.update(*row)
+        return state
@@ -0,0 +1,257 @@
+import numpy as np
+import pandas as pd
+
+# name -> (function, dependency names). Functions receive an IndicatorFrame and read their inputs from it.
+INDICATORS = {}
+
+
+def indicator(name, *deps):
+    """Register a function as the indicator node `name` depending on `deps`."""
+    def register(fn):
+        INDICATORS[name] = (fn, deps)
+        return fn
+    return register
+
+
+def required(names):
+    """Every node needed to compute `names`, dependencies first."""
+    order = []
+    seen = set()
+
+    def visit(name):
+        if name in seen:
+            return
+        seen.add(name)
+        for dep in INDICATORS.get(name, (None, ()))[1]:
+            visit(dep)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+class IndicatorFrame:
+    """
+    Lazy, memoized view of the indicator graph over one candle DataFrame.
+    `frame['sma_20']` computes the node (and its dependencies) on first access and caches it,
+    so every indicator is evaluated at most once per frame and only if something asks for it.
+    The underlying DataFrame is never modified.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def __contains__(self, name):
+        return name in self._cache or name in INDICATORS or name in self.df.columns
+
+    def __getitem__(self, name):
+        value = self._cache.get(name)
+        if value is None:
+            if name in INDICATORS:
+                value = INDICATORS[name][0](self)
+            else:
+                value = self.df[name]
+                if name != 'timestamp' and value.dtype != np.float64:
+                    value = value.astype(float)
+            self._cache[name] = value
+        return value
+
+    def is_computed(self, name):
+        return name in self._cache
+
+    def require(self, names):
+        """Compute the given nodes (in dependency order) up front."""
+        for name in required(names):
+            self[name]
+
+
+# === Indicator nodes ===
+
+def calculate_rsi(series, period=14):
+    """Calculate the Relative Strength Index"""
+    try:
+        series = series.ffill()
+        delta = series.diff()
+        delta = delta.fillna(0)
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        avg_gain = gain.rolling(window=period).mean()
+        avg_loss = loss.rolling(window=period).mean()
+        avg_loss = avg_loss.replace(0, 0.00001)
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+        rsi = rsi.fillna(50)
+        return rsi
+    except Exception as e:
+        print(f"[ERROR] RSI calculation: {e}")
+        return pd.Series([100] * len(series))
+
+
+@indicator('rsi', 'close')
+def _rsi(f):
+    return calculate_rsi(f['close'], 14)
+
+
+@indicator('ema_12', 'close')
+def _ema_12(f):
+    return f['close'].ewm(span=12, adjust=False).mean()
+
+
+@indicator('ema_26', 'close')
+def _ema_26(f):
+    return f['close'].ewm(span=26, adjust=False).mean()
+
+
+@indicator('macd', 'ema_12', 'ema_26')
+def _macd(f):
+    return f['ema_12'] - f['ema_26']
+
+
+@indicator('macd_signal', 'macd')
+def _macd_signal(f):
+    return f['macd'].ewm(span=9, adjust=False).mean()
+
+
+@indicator('macd_hist', 'macd', 'macd_signal')
+def _macd_hist(f):
+    return f['macd'] - f['macd_signal']
+
+
+@indicator('roc_5', 'close')
+def _roc_5(f):
+    return f['close'].pct_change(periods=5) * 100
+
+
+def _sma(window):
+    @indicator(f'sma_{window}', 'close')
+    def node(f):
+        return f['close'].rolling(window=window).mean()
+    return node
+
+
+for _window in (10, 20, 50, 200):
+    _sma(_window)
+
+
+@indicator('std_20', 'close')
+def _std_20(f):
+    return f['close'].rolling(window=20).std()
+
+
+@indicator('upper_band', 'sma_20', 'std_20')
+def _upper_band(f):
+    return f['sma_20'] + 2 * f['std_20']
+
+
+@indicator('lower_band', 'sma_20', 'std_20')
+def _lower_band(f):
+    return f['sma_20'] - 2 * f['std_20']
+
+
+@indicator('bb_position', 'close', 'upper_band', 'lower_band')
+def _bb_position(f):
+    return (f['close'] - f['lower_band']) / (f['upper_band'] - f['lower_band'])
+
+
+@indicator('volume_trend', 'volume')
+def _volume_trend(f):
+    return f['volume'] / f['volume'].rolling(window=5).mean()
+
+
+@indicator('crosses', 'sma_50', 'sma_200')
+def _crosses(f):
+    """(golden, death) flags for SMA50/SMA200 crosses among the last 20 candles; needs > 201 rows."""
+    n = len(f)
+    golden = np.zeros(n)
+    death = np.zeros(n)
+    if n > 201:
+        # Candles -20..-2 against their predecessors -21..-3
+        sma_50 = f['sma_50'].to_numpy()[-21:]
+        sma_200 = f['sma_200'].to_numpy()[-21:]
+        prev_50, prev_200 = sma_50[:-2], sma_200[:-2]
+        cur_50, cur_200 = sma_50[1:-1], sma_200[1:-1]
+        up = (prev_50 <= prev_200) & (cur_50 > cur_200)
+        golden[-20:-1] = up
+        death[-20:-1] = ~up & (prev_50 >= prev_200) & (cur_50 < cur_200)
+    index = f.df.index
+    return pd.Series(golden, index=index), pd.Series(death, index=index)
+
+
+@indicator('golden_cross', 'crosses')
+def _golden_cross(f):
+    return f['crosses'][0]
+
+
+@indicator('death_cross', 'crosses')
+def _death_cross(f):
+    return f['crosses'][1]
+
+
+@indicator('post_golden_cross', 'sma_50', 'sma_200')
+def _post_golden_cross(f):
+    if len(f) > 201:
+        return (f['sma_50'] > f['sma_200']).astype(float)
+    return pd.Series(0.0, index=f.df.index)
+
+
+@indicator('golden_cross_age', 'golden_cross')
+def _golden_cross_age(f):
+    n = len(f)
+    if n <= 201:
+        return pd.Series(99, index=f.df.index)
+    age = np.zeros(n, dtype=np.int64)
+    # Most recent golden cross among the last 99 candles
+    start = max(0, n-100) + 1
+    hits = np.flatnonzero(f['golden_cross'].to_numpy()[start:] == 1.0)
+    if hits.size:
+        last_golden_cross_idx = start + hits[-1]
+        age[last_golden_cross_idx:] = np.arange(n - last_golden_cross_idx)
+    return pd.Series(age, index=f.df.index)
+
+
+@indicator('golden_cross_factor', 'golden_cross_age')
+def _golden_cross_factor(f):
+    age = f['golden_cross_age']
+    return pd.Series(np.select(
+        [age <= 0, age <= 5, age <= 15, age <= 30, age <= 50],
+        [0.0, 5.0, 3.0, 1.5, 0.5], default=0.2
+    ), index=f.df.index)
+
+
+@indicator('macd_crossover', 'macd', 'macd_signal')
+def _macd_crossover(f):
+    return ((f['macd'].shift(1) <= f['macd_signal'].shift(1)) &
+            (f['macd'] > f['macd_signal'])).astype(float)
+
+
+@indicator('macd_hist_growing', 'macd_hist')
+def _macd_hist_growing(f):
+    return ((f['macd_hist'] > 0) & (f['macd_hist'] > f['macd_hist'].shift(1))).astype(float)
+
+
+@indicator('sma_crossover', 'sma_10', 'sma_20')
+def _sma_crossover(f):
+    return ((f['sma_10'].shift(1) <= f['sma_20'].shift(1)) & (f['sma_10'] > f['sma_20'])).astype(float)
+
+
+@indicator('momentum_score', 'macd_crossover', 'macd_hist_growing', 'sma_crossover', 'roc_5',
+           'volume_trend', 'golden_cross', 'golden_cross_factor', 'post_golden_cross', 'death_cross')
+def _momentum_score(f):
+    if len(f) <= 2:
+        return pd.Series(0.0, index=f.df.index)
+    score = (
+        f['macd_crossover'] * 2.0 +
+        f['macd_hist_growing'] * 1.5 +
+        f['sma_crossover'] * 2.0 +
+        f['roc_5'] * 0.3 +
+        f['volume_trend'] * 1.0 +
+        f['golden_cross'] * 6.0 +
+        f['golden_cross_factor'] +
+        f['post_golden_cross'] * 1.5
+    )
+    return score - (f['death_cross'] * 4.0)
@@ -4,15 +4,44 @@ import ccxt
 import traceback
 import json
 import math
+from concurrent.futures import as_completed
 from strategy import (
-    evaluate_coin, check_volume_spike, check_breakout, check_mean_reversion
+    evaluate_coin, evaluate_panel, evaluate_state, check_volume_spike, check_breakout, check_mean_reversion,
+    cascade_stats, RANGE_WINDOW
 )
+from indicator_panel import IndicatorPanel
+from indicator_state import IndicatorStateBook
+from indicators import IndicatorFrame
 from utils import (
-    fetch_ohlc_data, load_api_keys, place_order, sell_order,
-    get_balance, save_trading_history, load_trading_history
+    load_api_keys, place_order, sell_order,
+    get_balance, save_trading_history, load_trading_history, trade_journal
 )
 from adaptive_parameters import AdaptiveParameters
-from market_condition import detect_market_condition
+from trade_store import open_trade_store
+from portfolio_journal import PortfolioJournal, reconcile
+from performance import RollingPerformance
+from regime_service import RegimeService
+from resampler import Resampler
+from scanner import OHLCVScanner, exchange_rate_limiter
+from candle_store import CandleStore
+from candle_archive import CandleArchive
+from market_stream import MarketStream
+from scan_scheduler import ScanScheduler
+from prefilter import TickerPrefilter
+from evaluation_pool import EvaluationPool
+from exchange_proxy import CachingExchange
+from order_executor import OrderExecutor, order_rate_limiter
+from result_cache import EvaluationCache, params_key
+from config import (
+    SCAN_MAX_WORKERS, SCAN_SYMBOL_TIMEOUT, SCAN_RATE_LIMIT_MS, CANDLE_CACHE_SIZE, SCAN_CANDLE_LIMIT,
+    CANDLE_STORE_MAX_MB, CANDLE_STORE_TTL, CANDLE_ARCHIVE_DIR, CANDLE_ARCHIVE_ROWS,
+    STREAM_ENABLED, STREAM_URL, SCHED_HOT_SIZE, SCHED_WARM_SIZE, SCHED_WARM_EVERY,
+    SCHED_COLD_EVERY, SCHED_MOVE_PCT, PREFILTER_ENABLED, PREFILTER_MIN_QUOTE_VOLUME,
+    PREFILTER_MAX_SPREAD_PCT, PREFILTER_MAX_RANGE_PCT, PREFILTER_MAX_AGE, INDICATOR_ENGINE,
+    ENABLED_STRATEGIES, EVAL_BACKEND, EVAL_MAX_WORKERS, EVAL_BATCH_SIZE, EVAL_CACHE_SIZE,
+    REGIME_POLL_SECONDS, REGIME_CLOSE_GRACE, REGIME_STREAMING, EXCHANGE_CACHE_TTLS,
+    TRADE_STORE_PATH, PORTFOLIO_PATH, ORDER_RATE_LIMIT_MS
+)
 from exit_strategies import (
     update_trailing_stops, check_partial_profit_exits,
     check_time_based_exits
@@ -33,11 +62,11 @@ time.sleep(5)
 
 api_key, api_secret = load_api_keys()
 
-exchange = ccxt.kraken({
+exchange = CachingExchange(ccxt.kraken({
     'apiKey': api_key,
     'secret': api_secret,
     'enableRateLimit': True
-})
+}), ttls=EXCHANGE_CACHE_TTLS)
 print("Loading available markets from Kraken...")
 exchange.load_markets()
 try:
@@ -49,6 +78,9 @@ except Exception as e:
 
 trading_history = load_trading_history()
 print(f"Loaded trading history with {len(trading_history['trades'])} previous trades")
+trade_store = open_trade_store(TRADE_STORE_PATH, trading_history['trades'])
+performance = RollingPerformance()
+performance.seed(trade_store)
 cooldown_until = trading_history.get('cooldown_until')
 if cooldown_until and datetime.datetime.fromisoformat(cooldown_until) > datetime.datetime.now(datetime.timezone.utc):
     print(f"[NOTICE] Bot is in cooldown until {cooldown_until} due to excessive losses")
@@ -63,6 +95,13 @@ if cooldown_until and datetime.datetime.fromisoformat(cooldown_until) > datetime
 params = AdaptiveParameters()
 print("Initialized adaptive parameter system")
 portfolio = {}
+portfolio_journal = PortfolioJournal(PORTFOLIO_PATH) if PORTFOLIO_PATH else None
+if portfolio_journal:
+    checkpoint = portfolio_journal.load()
+    if checkpoint or portfolio_journal.saved_at is not None:
+        portfolio.update(reconcile(exchange, checkpoint, portfolio_journal.saved_at))
+        portfolio_journal.save(portfolio)
+        print(f"[PORTFOLIO] Resumed {len(portfolio)} open positions from {PORTFOLIO_PATH}")
 usdc = 'USDC/USD'
 
 # === SCAN ALL KRAKEN USD PAIRS ===
@@ -77,7 +116,49 @@ if not valid_coins:
     exit(1)
 
 max_positions = 10
-ohlcv_data = {}
+# Before any other thread starts: the process backend forks its workers here
+evaluation_pool = EvaluationPool(EVAL_BACKEND, max_workers=EVAL_MAX_WORKERS, batch_size=EVAL_BATCH_SIZE)
+result_cache = EvaluationCache(maxsize=EVAL_CACHE_SIZE)
+candle_archive = CandleArchive(CANDLE_ARCHIVE_DIR, capacity=CANDLE_ARCHIVE_ROWS) if CANDLE_ARCHIVE_DIR else None
+candle_store = CandleStore(capacity=CANDLE_CACHE_SIZE, max_bytes=CANDLE_STORE_MAX_MB * 2**20,
+                           ttl=CANDLE_STORE_TTL, archive=candle_archive)
+if candle_archive:
+    print(f"[CANDLES] Restored {candle_store.warm_start()} series from {CANDLE_ARCHIVE_DIR}/")
+indicator_states = IndicatorStateBook(window=CANDLE_CACHE_SIZE, range_window=RANGE_WINDOW)
+market_stream = None
+if STREAM_ENABLED:
+    market_stream = MarketStream(candle_store, url=STREAM_URL)
+    market_stream.start(valid_coins)
+scanner = OHLCVScanner(
+    exchange,
+    fetch=market_stream.fetch if market_stream else candle_store.fetch,
+    max_workers=SCAN_MAX_WORKERS,
+    timeout=SCAN_SYMBOL_TIMEOUT,
+    limit=SCAN_CANDLE_LIMIT,
+    rate_limiter=exchange_rate_limiter(exchange, SCAN_RATE_LIMIT_MS)
+)
+scheduler = ScanScheduler(
+    hot_size=SCHED_HOT_SIZE,
+    warm_size=SCHED_WARM_SIZE,
+    warm_every=SCHED_WARM_EVERY,
+    cold_every=SCHED_COLD_EVERY,
+    move_pct=SCHED_MOVE_PCT
+)
+resampler = Resampler(candle_store, exchange)
+regime_service = RegimeService(exchange, poll_interval=REGIME_POLL_SECONDS, close_grace=REGIME_CLOSE_GRACE,
+                               resampler=resampler, streaming=REGIME_STREAMING)
+regime_service.start()
+# Every private call from here on goes through this queue, so Kraken nonces stay in order
+order_executor = OrderExecutor(exchange, rate_limiter=order_rate_limiter(exchange, ORDER_RATE_LIMIT_MS))
+prefilter = None
+if PREFILTER_ENABLED:
+    prefilter = TickerPrefilter(
+        min_quote_volume=PREFILTER_MIN_QUOTE_VOLUME,
+        max_spread_pct=PREFILTER_MAX_SPREAD_PCT,
+        max_range_pct=PREFILTER_MAX_RANGE_PCT,
+        max_age=PREFILTER_MAX_AGE,
+        last_update=market_stream.last_update if market_stream else None
+    )
 
 # Weekly compounding logic
 if "weekly_investment" not in trading_history:
@@ -103,7 +184,7 @@ def get_base_position_size():
     last_week = datetime.datetime.fromisoformat(trading_history["last_week_start"])
     if now.weekday() == 6 and (now - last_week).days >= 7:
         try:
-            balances = get_balance(exchange)
+            balances = order_executor.call(get_balance)
             usd_balance = balances.get('USD', 0)
         except Exception:
             usd_balance = sum([pos['allocation'] for pos in portfolio.values()])
@@ -114,11 +195,12 @@ def get_base_position_size():
         save_trading_history(trading_history)
     return trading_history["base_position_size"]
 
-def compute_pnl(trades, days=1):
-    now = datetime.datetime.now(datetime.timezone.utc)
-    cutoff = now - datetime.timedelta(days=days)
-    pnl = sum(t.get("profit_usd", 0) for t in trades if "close_time" in t and datetime.datetime.fromisoformat(t["close_time"]) > cutoff)
-    return pnl
+def checkpoint_portfolio():
+    if portfolio_journal:
+        portfolio_journal.save(portfolio)
+
+def compute_pnl(days=1):
+    return performance.pnl(f'{days}d')
 
 def get_trailing_stop(pct_gain):
     # Trailing stops: 1% at 5%, 3% at 12%, 5% at 20%, 8% at 30%, 10% at 40%, 15% at 50%+
@@ -143,7 +225,7 @@ try:
         loop_start_time = datetime.datetime.now(datetime.timezone.utc)
         print(f"\n--- Cycle Start --- {loop_start_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
         try:
-            balances = get_balance(exchange)
+            balances = order_executor.call(get_balance)
             usd_balance = balances.get('USD', 0)
             print(f"Current USD Balance: ${usd_balance:.2f}")
         except Exception as e:
@@ -152,16 +234,18 @@ try:
 
         position_size = get_base_position_size()
 
-        daily_pnl = compute_pnl(trading_history['trades'], days=1)
-        weekly_pnl = compute_pnl(trading_history['trades'], days=7)
+        daily_pnl = compute_pnl(days=1)
+        weekly_pnl = compute_pnl(days=7)
         print_gain_visual(daily_pnl, weekly_pnl)
 
-        market_info = detect_market_condition(exchange)
+        market_info = regime_service.current()
         market_condition = market_info['condition']
         market_description = market_info.get('description', '')
         print(f"[MARKET] Detected {market_condition} market condition")
         print(f"[MARKET] {market_description}")
-        params.update_statistics(trading_history, market_condition)
+        regime_service.print_stats()
+        resampler.print_stats()
+        params.update_statistics(trading_history, market_condition, performance)
         params.print_current_settings()
         if trading_history.get('cooldown_until') and datetime.datetime.fromisoformat(trading_history['cooldown_until']) > loop_start_time:
             cooldown_time = datetime.datetime.fromisoformat(trading_history['cooldown_until'])
@@ -172,39 +256,108 @@ try:
         print(f"Open positions: {open_positions}/{max_positions}")
         # --- Use batch ticker fetching for all open positions ---
         symbols_to_check = list(portfolio.keys())
-        if symbols_to_check:
+        tickers = market_stream.tickers(symbols_to_check) if market_stream else {}
+        missing = [s for s in symbols_to_check if s not in tickers]
+        if missing:
             try:
-                tickers = exchange.fetch_tickers(symbols_to_check)
+                tickers.update(exchange.fetch_tickers(missing))
             except Exception as e:
                 print(f"[ERROR] Could not fetch batch tickers: {e}")
-                tickers = {}
-        else:
-            tickers = {}
         if open_positions < max_positions and not (trading_history.get('cooldown_until') and datetime.datetime.fromisoformat(trading_history['cooldown_until']) > loop_start_time):
             momentum_candidates = []
             volume_spike_candidates = []
             breakout_candidates = []
             mean_reversion_candidates = []
-            for coin in valid_coins:
-                if coin == usdc or coin in portfolio:
-                    continue
+            scan_coins = [coin for coin in valid_coins if coin != usdc and coin not in portfolio]
+            if prefilter:
+                scan_coins = prefilter.apply(exchange, scan_coins)
+                prefilter.print_stats()
+            if market_stream:
+                live = market_stream.tickers(scan_coins)
+                scheduler.check_price_moves({s: t['last'] for s, t in live.items()})
+            elif prefilter:
+                scheduler.check_price_moves({s: p for s, p in prefilter.prices().items() if s in scan_coins})
+            scan_coins = scheduler.due(scan_coins)
+            candidates_by_strategy = {
+                'MOMENTUM': momentum_candidates,
+                'VOLUME_SPIKE': volume_spike_candidates,
+                'BREAKOUT': breakout_candidates,
+                'MEAN_REVERSION': mean_reversion_candidates
+            }
+            current_params = params.get_parameters()
+            params_hash = params_key(current_params, ENABLED_STRATEGIES)
+            panel_frames = {}
+            pool_frames = {}
+            cache_keys = {}
+            for coin, ohlcv in scanner.scan(scan_coins):
                 try:
-                    ohlcv = fetch_ohlc_data(exchange, coin)
-                    if ohlcv is not None and len(ohlcv) > 0:
-                        ohlcv_data[coin] = ohlcv
-                        result = evaluate_coin(ohlcv, coin, params.get_parameters())
-                        if result:
-                            strategy_type = result.get('strategy')
-                            if strategy_type == 'MOMENTUM':
-                                momentum_candidates.append(result)
-                            elif strategy_type == 'VOLUME_SPIKE':
-                                volume_spike_candidates.append(result)
-                            elif strategy_type == 'BREAKOUT':
-                                breakout_candidates.append(result)
-                            elif strategy_type == 'MEAN_REVERSION':
-                                mean_reversion_candidates.append(result)
+                    state = None
+                    if INDICATOR_ENGINE == 'state':
+                        # Synced under the entry lock: the stream may be merging into the same buffer
+                        with candle_store.locked(coin) as buf:
+                            state = indicator_states.sync_buffer(coin, buf, time.time() * 1000) if buf else None
+                        key = result_cache.state_key(coin, state, params_hash)
+                    else:
+                        key = result_cache.key(coin, ohlcv, params_hash)
+                    hit, result = result_cache.get(key)
+                    if hit:
+                        scheduler.observe(coin, None, current_params, result)
+                        if result and result.get('strategy') in candidates_by_strategy:
+                            candidates_by_strategy[result['strategy']].append(result)
+                        continue
+                    cache_keys[coin] = key
+                    if INDICATOR_ENGINE == 'panel':
+                        # Evaluated together once the scan finishes
+                        panel_frames[coin] = ohlcv
+                        continue
+                    if INDICATOR_ENGINE == 'frame' and evaluation_pool.backend != 'serial':
+                        pool_frames[coin] = ohlcv
+                        continue
+                    if INDICATOR_ENGINE == 'state':
+                        result = evaluate_state(state, coin, current_params, ENABLED_STRATEGIES)
+                        scheduler.observe(coin, state.view() if state and len(state) else ohlcv, current_params, result)
+                    else:
+                        frame = IndicatorFrame(ohlcv)
+                        result = evaluate_coin(frame, coin, current_params, ENABLED_STRATEGIES)
+                        scheduler.observe(coin, frame, current_params, result)
+                    result_cache.put(key, result)
+                    if result and result.get('strategy') in candidates_by_strategy:
+                        candidates_by_strategy[result['strategy']].append(result)
                 except Exception as e:
                     print(f"[ERROR] {coin}: {e}")
+            if panel_frames:
+                try:
+                    panel = IndicatorPanel(panel_frames)
+                    for coin, result in evaluate_panel(panel, current_params, ENABLED_STRATEGIES).items():
+                        scheduler.observe(coin, panel.view(coin), current_params, result)
+                        result_cache.put(cache_keys.get(coin), result)
+                        if result and result.get('strategy') in candidates_by_strategy:
+                            candidates_by_strategy[result['strategy']].append(result)
+                except Exception as e:
+                    print(f"[ERROR] Panel evaluation: {e}")
+            if pool_frames:
+                try:
+                    for coin, result in evaluation_pool.evaluate(pool_frames, current_params, ENABLED_STRATEGIES).items():
+                        scheduler.observe(coin, pool_frames[coin], current_params, result)
+                        result_cache.put(cache_keys.get(coin), result)
+                        if result and result.get('strategy') in candidates_by_strategy:
+                            candidates_by_strategy[result['strategy']].append(result)
+                except Exception as e:
+                    print(f"[ERROR] Pooled evaluation: {e}")
+                evaluation_pool.print_stats()
+            scheduler.finish_cycle()
+            scheduler.print_stats(len(scan_coins))
+            scanner.print_stats()
+            cascade_stats.print_stats()
+            result_cache.print_stats()
+            for symbol, timeframe in candle_store.evict():
+                if timeframe == '1m':
+                    indicator_states.drop(symbol)
+            candle_store.print_stats()
+            if candle_archive:
+                candle_archive.print_stats()
+            if market_stream:
+                market_stream.print_stats()
             all_candidates = []
             if momentum_candidates:
                 momentum_candidates.sort(key=lambda x: (-x['rank_factor'], -x['vol']))
@@ -251,20 +404,16 @@ try:
                 filtered_candidates.sort(key=lambda x: -x['rank_factor'])
                 filtered_candidates = filtered_candidates[:max_positions]
                 print(f"Selected top {len(filtered_candidates)} candidates based on rank factor")
+                signal_time = time.monotonic()
+                pending_buys = {}
                 for entry in filtered_candidates:
-                    if len(portfolio) >= max_positions:
+                    if len(portfolio) + len(pending_buys) >= max_positions:
                         break
                     symbol = entry['symbol']
                     allocation = position_size
                     price = entry['price']
                     strategy = entry.get('strategy', 'UNKNOWN')
-                    recent_loss = False
-                    for trade in trading_history['trades']:
-                        if trade['symbol'] == symbol and trade.get('profit_pct', 0) < 0:
-                            trade_time = datetime.datetime.fromisoformat(trade['close_time']) if isinstance(trade['close_time'], str) else trade['close_time']
-                            if (loop_start_time - trade_time).total_seconds() < 21600:
-                                recent_loss = True
-                                break
+                    recent_loss = performance.has_loss_since(symbol, loop_start_time - datetime.timedelta(hours=6))
                     if recent_loss:
                         print(f"[SKIP] {symbol} - Recently closed with loss, skipping for 12h cooldown")
                         continue
@@ -288,8 +437,15 @@ try:
                         print(f"[SKIP] {symbol}: Coin amount too small or would exceed allocation. Skipping buy.")
                         continue
                     print(f"[DEBUG] Buying {coin_amount} {symbol} at ${price:.2f} (Total: ${actual_cost:.2f}, Allocation: ${allocation:.2f})")
-                    order = place_order(exchange, symbol, coin_amount)
+                    future = order_executor.submit(place_order, symbol, coin_amount)
+                    pending_buys[future] = (symbol, price, allocation, coin_amount, strategy)
+                # Each acknowledgement is handled as soon as it arrives, while later orders are still queued
+                filled = 0
+                for future in as_completed(pending_buys):
+                    symbol, price, allocation, coin_amount, strategy = pending_buys[future]
+                    order = future.result()
                     if order:
+                        filled += 1
                         print(f"[BUY - {strategy}] {symbol} @ {price} | Allocated: ${allocation:.2f} | Amount: {coin_amount:.8f}")
                         portfolio[symbol] = {
                             'entry': price,
@@ -303,7 +459,10 @@ try:
                             'trailing_stop': None,
                             'max_price': price
                         }
-                    time.sleep(2)
+                        checkpoint_portfolio()
+                if pending_buys:
+                    print(f"[EXEC] {filled}/{len(pending_buys)} buys filled | "
+                          f"signal to last fill: {time.monotonic() - signal_time:.2f}s")
             else:
                 print("No candidates found that meet any strategy criteria")
                 params.adjust_parameters(0)
@@ -383,7 +542,7 @@ try:
                 
                 if sell_reason:
                     print(f"[DEBUG] Attempting to sell {symbol} at {last_price} (reason: {sell_reason})")
-                    order = sell_order(exchange, symbol, pos['amount'], sell_percentage)
+                    order = order_executor.call(sell_order, symbol, pos['amount'], sell_percentage)
                     print(f"[DEBUG] Sell order result: {order}")
                     if order:
                         strategy = pos.get('strategy', 'UNKNOWN')
@@ -405,6 +564,8 @@ try:
                             'hours_held': hours_held
                         }
                         trading_history['trades'].append(trade_record)
+                        trade_store.add(trade_record)
+                        performance.add(trade_record)
                         if gain < 0:
                             loss_amount = abs(trade_record['profit_usd'])
                             trading_history['last_24h_losses'] = trading_history.get('last_24h_losses', 0) + loss_amount
@@ -414,14 +575,9 @@ try:
         for symbol in symbols_to_remove:
             if symbol in portfolio:
                 del portfolio[symbol]
+        checkpoint_portfolio()
         
-        cutoff_time = loop_start_time - datetime.timedelta(hours=24)
-        recent_losses = 0
-        for trade in trading_history['trades']:
-            if 'close_time' in trade:
-                trade_time = datetime.datetime.fromisoformat(trade['close_time']) if isinstance(trade['close_time'], str) else trade['close_time']
-                if trade_time > cutoff_time and trade.get('profit_pct', 0) < 0:
-                    recent_losses += abs(trade.get('profit_usd', 0))
+        recent_losses = performance.losses('1d', loop_start_time)
         trading_history['last_24h_losses'] = recent_losses
         cooldown_threshold = trading_history["base_position_size"] * max_positions * 0.15
         if recent_losses >= cooldown_threshold and not trading_history.get('cooldown_until'):
@@ -432,21 +588,28 @@ try:
         save_trading_history(trading_history)
         print("\n--- Trading Performance By Strategy ---")
         strategies = ['MOMENTUM', 'VOLUME_SPIKE', 'BREAKOUT', 'MEAN_REVERSION']
+        summary = performance.strategy_summary()
         for strategy in strategies:
-            trades = [t for t in trading_history['trades'] if t.get('strategy') == strategy]
-            if trades:
-                trades_count = len(trades)
-                profit = sum(t.get('profit_usd', 0) for t in trades)
-                wins = sum(1 for t in trades if t.get('profit_pct', 0) > 0)
+            if strategy in summary:
+                trades_count, profit, wins = summary[strategy]
                 win_rate = (wins / trades_count) * 100
                 print(f"{strategy} Strategy: {trades_count} trades | ${profit:.2f} profit | {win_rate:.1f}% win rate")
         print(f"\n[PORTFOLIO] Value: ${total_value:.2f} | Open Positions: {len(portfolio)}")
+        exchange.print_stats()
+        order_executor.print_stats()
         loop_end_time = datetime.datetime.now(datetime.timezone.utc)
         print(f"--- Cycle complete. Loop duration: {(loop_end_time - loop_start_time).total_seconds():.2f}s. Waiting 10 seconds... ---")
         time.sleep(10)
 except KeyboardInterrupt:
+    scanner.shutdown()
+    order_executor.shutdown()
+    evaluation_pool.shutdown()
+    regime_service.stop()
+    if market_stream:
+        market_stream.stop()
     print("\n\n=== Bot stopped by user ===")
     print("Final portfolio summary:")
+    sold_symbols = []
     for symbol, pos in portfolio.items():
         try:
             ticker = exchange.fetch_ticker(symbol)
@@ -477,26 +640,27 @@ except KeyboardInterrupt:
                                             else datetime.datetime.fromisoformat(pos['timestamp']))).total_seconds() / 3600
                         }
                         trading_history['trades'].append(trade_record)
+                        trade_store.add(trade_record)
+                        performance.add(trade_record)
                         save_trading_history(trading_history)
+                        sold_symbols.append(symbol)
         except Exception as e:
             print(f"{symbol}: Unable to fetch current price - {e}")
+    for symbol in sold_symbols:
+        del portfolio[symbol]
+    checkpoint_portfolio()
     print("\nTrading history summary:")
-    total_trades = len(trading_history['trades'])
-    winning_trades = sum(1 for t in trading_history['trades'] if t.get('profit_pct', 0) > 0)
-    losing_trades = sum(1 for t in trading_history['trades'] if t.get('profit_pct', 0) < 0)
+    total_trades, winning_trades, losing_trades, total_profit = performance.totals()
     if total_trades > 0:
         win_rate = winning_trades / total_trades * 100
-        total_profit = sum(t.get('profit_usd', 0) for t in trading_history['trades'])
         print(f"Total trades: {total_trades}")
         print(f"Overall win rate: {win_rate:.2f}% ({winning_trades} wins, {losing_trades} losses)")
         print(f"Total profit/loss: ${total_profit:.2f}")
         strategies = ['MOMENTUM', 'VOLUME_SPIKE', 'BREAKOUT', 'MEAN_REVERSION']
+        summary = performance.strategy_summary()
         for strategy in strategies:
-            trades = [t for t in trading_history['trades'] if t.get('strategy') == strategy]
-            if trades:
-                trades_count = len(trades)
-                profit = sum(t.get('profit_usd', 0) for t in trades)
-                wins = sum(1 for t in trades if t.get('profit_pct', 0) > 0)
+            if strategy in summary:
+                trades_count, profit, wins = summary[strategy]
                 win_rate = (wins / trades_count) * 100
                 print(f"{strategy} Strategy: {trades_count} trades | ${profit:.2f} profit | {win_rate:.1f}% win rate")
     else:
@@ -508,4 +672,9 @@ except Exception as e:
     for symbol, pos in portfolio.items():
         strategy = pos.get('strategy', 'UNKNOWN')
         print(f"{symbol} [{strategy}]: Entry ${pos['entry']} | Amount: {pos['amount']:.8f}")
-    print("\nBot stopped due to critical error. Please check your positions manually in Kraken.")
\ No newline at end of file
+    print("\nBot stopped due to critical error. Please check your positions manually in Kraken.")
+finally:
+    trade_journal.close()
+    trade_store.close()
+    if portfolio_journal:
+        portfolio_journal.close()
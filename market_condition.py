@@ -1,7 +1,10 @@
 import pandas as pd
 import numpy as np
+from collections import deque
 from utils import fetch_ohlc_data
 
+EMA_PERIODS = (9, 21, 50, 200)
+
 def calculate_ema(prices, period):
     alpha = 2 / (period + 1)
     ema = [prices[0]]
@@ -42,137 +45,390 @@ def calculate_rsi_array(prices, period=14):
     rs = avg_gain / avg_loss
     return 100 - (100 / (1 + rs))
 
+def ohlcv_arrays(data):
+    """closes, highs, lows, volumes of Candles, a candle DataFrame or a CCXT list of lists; None if unusable."""
+    if data is None:
+        return None
+    if hasattr(data, 'columns'):
+        return tuple(data[col].to_numpy(dtype=float) for col in ('close', 'high', 'low', 'volume'))
+    if not isinstance(data, (list, tuple)):
+        return None
+    rows = [c for c in data if isinstance(c, (list, tuple)) and len(c) >= 6]
+    closes = np.array([c[4] for c in rows])
+    highs = np.array([c[2] for c in rows])
+    lows = np.array([c[3] for c in rows])
+    volumes = np.array([c[5] for c in rows])
+    return closes, highs, lows, volumes
+
+def series_signals(closes, highs, lows, volumes):
+    """Regime signals of one (symbol, timeframe) series, or None if it is too short to judge."""
+    if len(closes) < 50 or len(highs) < 50 or len(lows) < 50 or len(volumes) < 20:
+        return None
+
+    # Volatility: Average candle size and ATR%
+    candle_sizes = np.mean((highs - lows) / np.where(lows == 0, 1, lows) * 100)
+    atr = calculate_atr_array(highs, lows, closes)
+    bb_width = calculate_bb_width_array(closes)
+
+    # Trend: EMA alignment and slopes
+    ema9 = calculate_ema(closes, 9)
+    ema21 = calculate_ema(closes, 21)
+    ema50 = calculate_ema(closes, 50)
+    ema200 = calculate_ema(closes, 200) if len(closes) > 200 else np.array([closes[0]] * len(closes))
+
+    # Volume
+    avg_vol_20 = np.mean(volumes[-20:])
+    avg_vol_5 = np.mean(volumes[-5:])
+    rel_volume = avg_vol_5 / avg_vol_20 if avg_vol_20 != 0 else 1
+
+    # RSI
+    rsi = calculate_rsi_array(closes)
+    return _decide(closes[-1], candle_sizes, atr, bb_width, ema9[-1], ema9[-5], ema21[-1], ema21[-5],
+                   ema50[-1], ema200[-1], rel_volume, rsi)
+
+def _decide(close, candle_sizes, atr, bb_width, ema9, ema9_prev, ema21, ema21_prev, ema50, ema200, rel_volume, rsi):
+    """Regime signals from one series' features (latest EMA values and the ones 4 candles earlier)."""
+    atr_pct = atr / close * 100 if close != 0 else 0
+    ema_alignment = 0
+    if ema9 > ema21 > ema50:
+        ema_alignment = 1
+    elif ema9 < ema21 < ema50:
+        ema_alignment = -1
+    ema9_slope = (ema9 / ema9_prev - 1) * 100 if ema9_prev != 0 else 0
+    ema21_slope = (ema21 / ema21_prev - 1) * 100 if ema21_prev != 0 else 0
+    price_vs_50ema = (close / ema50 - 1) * 100 if ema50 != 0 else 0
+    price_vs_200ema = (close / ema200 - 1) * 100 if ema200 != 0 else 0
+
+    # Heuristic scoring
+    trending = ema_alignment != 0 and abs(ema9_slope) > 0.2 and abs(ema21_slope) > 0.15
+    volatile = atr_pct > 3.5 or bb_width > 6 or candle_sizes > 2.5
+    bullish = trending and ema_alignment == 1 and rsi > 55 and price_vs_50ema > 0.5 and price_vs_200ema > 0.5
+    bearish = trending and ema_alignment == -1 and rsi < 45 and price_vs_50ema < -0.5 and price_vs_200ema < -0.5
+    return {
+        'trending': bool(trending),
+        'volatile': bool(volatile),
+        'bullish': bool(bullish),
+        'bearish': bool(bearish),
+        'rel_volume': float(rel_volume)
+    }
+
+# === Vectorized kernels (batch case) ===
+# Each kernel takes (series x time) arrays of equally long series and reproduces the scalar functions
+# above bit for bit: reductions run along the contiguous time axis like the 1-D calls, and the EMA
+# recurrence applies the same float operations, only across all series and periods at once.
+
+def ema_kernel(closes, periods, keep=5):
+    """Last `keep` EMA values for every period: array (periods, series, keep); series need more than `keep` candles."""
+    alpha = np.array([2 / (p + 1) for p in periods])[:, None]
+    one_minus = 1 - alpha
+    prev = np.broadcast_to(closes[:, 0], (len(periods), len(closes))).copy()
+    out = np.empty((len(periods), len(closes), keep))
+    n = closes.shape[1]
+    for i in range(1, n):
+        prev = alpha * closes[:, i] + one_minus * prev
+        j = i - (n - keep)
+        if j >= 0:
+            out[..., j] = prev
+    return out
+
+def atr_kernel(highs, lows, closes, period=14):
+    """calculate_atr_array for every series (requires more than `period` candles)."""
+    prev_close = closes[:, -period - 1:-1]
+    tr1 = highs[:, -period:] - lows[:, -period:]
+    tr2 = np.abs(highs[:, -period:] - prev_close)
+    tr3 = np.abs(lows[:, -period:] - prev_close)
+    return np.mean(np.maximum(np.maximum(tr1, tr2), tr3), axis=1)
+
+def bb_width_kernel(closes, period=20, num_std=2):
+    """calculate_bb_width_array for every series (requires at least `period` candles)."""
+    window = closes[:, -period:]
+    ma = np.mean(window, axis=1)
+    std = np.std(window, axis=1)
+    upper = ma + num_std * std
+    lower = ma - num_std * std
+    safe_ma = np.where(ma == 0, 1, ma)
+    return np.where(ma == 0, 0, ((upper - lower) / safe_ma) * 100)
+
+def rsi_kernel(closes, period=14):
+    """calculate_rsi_array for every series (requires more than `period` candles)."""
+    deltas = np.diff(closes[:, -period - 1:], axis=1)
+    avg_gain = np.mean(np.where(deltas > 0, deltas, 0), axis=1)
+    avg_loss = np.mean(np.where(deltas < 0, -deltas, 0), axis=1)
+    safe_loss = np.where(avg_loss == 0, 1, avg_loss)
+    return np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / safe_loss)))
+
+def batch_signals(series):
+    """
+    series_signals for many (closes, highs, lows, volumes) series at once, in input order.
+    Series are grouped by length and each group goes through the kernels in one pass.
+    """
+    results = [None] * len(series)
+    groups = {}
+    for i, arrays in enumerate(series):
+        if arrays is None or min(len(a) for a in arrays) < 50:
+            continue
+        groups.setdefault(len(arrays[0]), []).append(i)
+    for n, members in groups.items():
+        closes, highs, lows, volumes = (np.array([series[i][k] for i in members], dtype=np.float64)
+                                        for k in range(4))
+        candle_sizes = np.mean((highs - lows) / np.where(lows == 0, 1, lows) * 100, axis=1)
+        atr = atr_kernel(highs, lows, closes)
+        bb_width = bb_width_kernel(closes)
+        rsi = rsi_kernel(closes)
+        periods = EMA_PERIODS if n > 200 else EMA_PERIODS[:3]
+        emas = ema_kernel(closes, periods)
+        ema200 = emas[3, :, -1] if n > 200 else closes[:, 0]
+        avg_vol_20 = np.mean(volumes[:, -20:], axis=1)
+        avg_vol_5 = np.mean(volumes[:, -5:], axis=1)
+        rel_volume = np.where(avg_vol_20 != 0, avg_vol_5 / np.where(avg_vol_20 == 0, 1, avg_vol_20), 1)
+        for row, i in enumerate(members):
+            results[i] = _decide(closes[row, -1], candle_sizes[row], atr[row], bb_width[row],
+                                 emas[0, row, -1], emas[0, row, 0], emas[1, row, -1], emas[1, row, 0],
+                                 emas[2, row, -1], ema200[row], rel_volume[row], rsi[row])
+    return results
+
+# === Streaming state ===
+
+class _RollingSum:
+    """Sum of the last `size` values, kept up to date as values are pushed."""
+
+    def __init__(self, size):
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self.values)
+
+    def push(self, x):
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+
+    def mean(self, x=None):
+        """Mean of the window, or of the window that pushing `x` would leave."""
+        if x is None:
+            return self.total / len(self.values)
+        if len(self.values) == self.values.maxlen:
+            return (self.total - self.values[0] + x) / len(self.values)
+        return (self.total + x) / (len(self.values) + 1)
+
+    def resync(self):
+        self.total = float(sum(self.values))
+
+class RegimeState:
+    """
+    Regime features of one (symbol, timeframe) series maintained per closed candle; signals() gives
+    series_signals() of the last `window` candles fed (optionally plus a still-forming candle).
+    update() and signals() are O(1) in the window: the ATR, RSI, Bollinger, candle size and volume
+    inputs are running sums over the same candles the batch functions average, and the EMAs run over
+    the whole history. The batch EMAs start at the window's first close c_s; since the recurrence is
+    linear they equal E_t - (1 - alpha)^(t - s) * (E_s - c_s), which is exact until the window first
+    slides and equal up to float rounding after. The sums are recomputed from their windows every
+    `window` candles so rounding does not build up.
+    """
+
+    ATR_PERIOD = 14
+    RSI_PERIOD = 14
+    BB_PERIOD = 20
+
+    def __init__(self, window=144):
+        self.window = window
+        self.closes = deque(maxlen=window)
+        self.count = 0
+        self._sizes = _RollingSum(window)
+        self._true_ranges = _RollingSum(self.ATR_PERIOD)
+        self._gains = _RollingSum(self.RSI_PERIOD)
+        self._losses = _RollingSum(self.RSI_PERIOD)
+        self._bb = _RollingSum(self.BB_PERIOD)
+        self._bb_squares = _RollingSum(self.BB_PERIOD)
+        self._vol20 = _RollingSum(20)
+        self._vol5 = _RollingSum(5)
+        self._alpha = {p: 2 / (p + 1) for p in EMA_PERIODS}
+        self._emas = {p: deque(maxlen=window) for p in EMA_PERIODS}
+
+    def __len__(self):
+        return len(self.closes)
+
+    @staticmethod
+    def _candle_size(high, low):
+        return (high - low) / (1 if low == 0 else low) * 100
+
+    def _steps(self, high, low, close):
+        """True range, gain and loss of a candle following the newest stored one."""
+        prev = self.closes[-1]
+        delta = close - prev
+        return (max(high - low, abs(high - prev), abs(low - prev)),
+                delta if delta > 0 else 0, -delta if delta < 0 else 0)
+
+    def update(self, high, low, close, volume):
+        """Add a closed candle."""
+        for p, values in self._emas.items():
+            values.append(self._next_ema(p, close))
+        if self.closes:
+            true_range, gain, loss = self._steps(high, low, close)
+            self._gains.push(gain)
+            self._losses.push(loss)
+        else:
+            true_range = high - low
+        self._true_ranges.push(true_range)
+        self._sizes.push(self._candle_size(high, low))
+        self._bb.push(close)
+        self._bb_squares.push(close * close)
+        self._vol20.push(volume)
+        self._vol5.push(volume)
+        self.closes.append(close)
+        self.count += 1
+        if self.count % self.window == 0:
+            for rolling in (self._sizes, self._true_ranges, self._gains, self._losses, self._bb,
+                            self._bb_squares, self._vol20, self._vol5):
+                rolling.resync()
+
+    def _next_ema(self, period, close):
+        values = self._emas[period]
+        if not values:
+            return close
+        alpha = self._alpha[period]
+        return alpha * close + (1 - alpha) * values[-1]
+
+    def _window_ema(self, period, n, forming_close=None):
+        """Batch EMAs (seeded at the series' first close) of the series' last and 5th-last candles."""
+        values = self._emas[period]
+        full = [values[-1], values[-5]] if forming_close is None else [self._next_ema(period, forming_close), values[-4]]
+        offset = values[0] - self.closes[0]
+        decay = 1 - self._alpha[period]
+        return full[0] - decay ** (n - 1) * offset, full[1] - decay ** (n - 5) * offset
+
+    def signals(self, forming=None):
+        """series_signals of the stored candles, plus `forming` (high, low, close, volume) if given."""
+        n = len(self.closes) + (forming is not None)
+        if n < 50:
+            return None
+        if forming is None:
+            close = self.closes[-1]
+            candle_sizes = self._sizes.mean()
+            atr = self._true_ranges.mean()
+            avg_gain, avg_loss = self._gains.mean(), self._losses.mean()
+            ma, mean_square = self._bb.mean(), self._bb_squares.mean()
+            avg_vol_20, avg_vol_5 = self._vol20.mean(), self._vol5.mean()
+        else:
+            high, low, close, volume = forming
+            true_range, gain, loss = self._steps(high, low, close)
+            # The forming candle extends the window instead of sliding it, as in the batch call
+            candle_sizes = (self._sizes.total + self._candle_size(high, low)) / n
+            atr = self._true_ranges.mean(true_range)
+            avg_gain, avg_loss = self._gains.mean(gain), self._losses.mean(loss)
+            ma, mean_square = self._bb.mean(close), self._bb_squares.mean(close * close)
+            avg_vol_20, avg_vol_5 = self._vol20.mean(volume), self._vol5.mean(volume)
+        rsi = 100 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+        std = np.sqrt(max(mean_square - ma * ma, 0.0))
+        bb_width = 0 if ma == 0 else (((ma + 2 * std) - (ma - 2 * std)) / ma) * 100
+        rel_volume = avg_vol_5 / avg_vol_20 if avg_vol_20 != 0 else 1
+        forming_close = None if forming is None else close
+        ema9, ema9_prev = self._window_ema(9, n, forming_close)
+        ema21, ema21_prev = self._window_ema(21, n, forming_close)
+        ema50, _ = self._window_ema(50, n, forming_close)
+        ema200 = self._window_ema(200, n, forming_close)[0] if n > 200 else self.closes[0]
+        return _decide(close, candle_sizes, atr, bb_width, ema9, ema9_prev, ema21, ema21_prev, ema50,
+                       ema200, rel_volume, rsi)
+
+def classify_market(signals):
+    """Combine per-series signals (series_signals results) into the market condition dict."""
+    aggregated_metrics = {
+        'volatility': 0,
+        'trending_strength': 0,
+        'bullish_signals': 0,
+        'bearish_signals': 0,
+        'volume_intensity': 0,
+        'total_samples': 0
+    }
+
+    bullish_count = 0
+    bearish_count = 0
+    ranging_count = 0
+    volatile_count = 0
+
+    for signal in signals:
+        if signal is None:
+            continue
+        # Count signals
+        if signal['bullish']:
+            bullish_count += 1
+        elif signal['bearish']:
+            bearish_count += 1
+        elif signal['volatile']:
+            volatile_count += 1
+        else:
+            ranging_count += 1
+
+        aggregated_metrics['volatility'] += float(signal['volatile'])
+        aggregated_metrics['trending_strength'] += float(signal['trending'])
+        aggregated_metrics['bullish_signals'] += float(signal['bullish'])
+        aggregated_metrics['bearish_signals'] += float(signal['bearish'])
+        aggregated_metrics['volume_intensity'] += signal['rel_volume']
+        aggregated_metrics['total_samples'] += 1
+
+    # Decision logic
+    samples = aggregated_metrics['total_samples']
+    if samples == 0:
+        return {
+            'condition': 'RANGING',
+            'description': 'No valid samples for market condition detection.'
+        }
+
+    # Aggregate proportions
+    bull = bullish_count / samples
+    bear = bearish_count / samples
+    range_ = ranging_count / samples
+    vol = volatile_count / samples
+
+    # Main classification
+    if bull > 0.49:
+        return {
+            'condition': 'TRENDING_BULLISH',
+            'description': f"Detected strong bullish market ({bull*100:.0f}% bullish signals, {range_*100:.0f}% ranging)."
+        }
+    elif bear > 0.49:
+        return {
+            'condition': 'TRENDING_BEARISH',
+            'description': f"Detected strong bearish market ({bear*100:.0f}% bearish signals, {range_*100:.0f}% ranging)."
+        }
+    elif vol > 0.49:
+        return {
+            'condition': 'VOLATILE',
+            'description': f"Detected high volatility ({vol*100:.0f}% volatile signals)."
+        }
+    else:
+        return {
+            'condition': 'RANGING',
+            'description': f"Market is mostly ranging ({range_*100:.0f}% ranging, {bull*100:.0f}% bull, {bear*100:.0f}% bear, {vol*100:.0f}% volatile)."
+        }
+
 def detect_market_condition(
     exchange, 
     timeframes=['5m', '15m', '1h', '4h'],
-    reference_symbols=["BTC/USD", "ETH/USD", "SOL/USD"]
+    reference_symbols=["BTC/USD", "ETH/USD", "SOL/USD"],
+    resampler=None
 ):
+    """
+    Classify the market from every reference series in one blocking call (see RegimeService for the
+    cached version). With a Resampler the series are aggregated from local 1m candles instead of fetched.
+    """
     try:
-        aggregated_metrics = {
-            'volatility': 0,
-            'trending_strength': 0,
-            'bullish_signals': 0,
-            'bearish_signals': 0,
-            'volume_intensity': 0,
-            'total_samples': 0
-        }
-
-        bullish_count = 0
-        bearish_count = 0
-        ranging_count = 0
-        volatile_count = 0
-
+        series = []
         for symbol in reference_symbols:
+            if resampler:
+                resampler.update(symbol, timeframes)
             for timeframe in timeframes:
-                data = fetch_ohlc_data(exchange, symbol, timeframe=timeframe)
-                if not isinstance(data, (list, tuple)) or len(data) < 30:
-                    continue
-
-                closes = np.array([c[4] for c in data if isinstance(c, (list, tuple)) and len(c) >= 6])
-                highs = np.array([c[2] for c in data if isinstance(c, (list, tuple)) and len(c) >= 6])
-                lows = np.array([c[3] for c in data if isinstance(c, (list, tuple)) and len(c) >= 6])
-                volumes = np.array([c[5] for c in data if isinstance(c, (list, tuple)) and len(c) >= 6])
-
-                if len(closes) < 50 or len(highs) < 50 or len(lows) < 50 or len(volumes) < 20:
-                    continue
-
-                # Volatility: Average candle size and ATR%
-                candle_sizes = np.mean((highs - lows) / np.where(lows == 0, 1, lows) * 100)
-                atr = calculate_atr_array(highs, lows, closes)
-                atr_pct = atr / closes[-1] * 100 if closes[-1] != 0 else 0
-                bb_width = calculate_bb_width_array(closes)
-                
-                # Trend: EMA alignment and slopes
-                ema9 = calculate_ema(closes, 9)
-                ema21 = calculate_ema(closes, 21)
-                ema50 = calculate_ema(closes, 50)
-                ema200 = calculate_ema(closes, 200) if len(closes) > 200 else np.array([closes[0]] * len(closes))
-                ema_alignment = 0
-                if len(ema9) > 0 and len(ema21) > 0 and len(ema50) > 0:
-                    if ema9[-1] > ema21[-1] > ema50[-1]:
-                        ema_alignment = 1
-                    elif ema9[-1] < ema21[-1] < ema50[-1]:
-                        ema_alignment = -1
-                ema9_slope = (ema9[-1] / ema9[-5] - 1) * 100 if len(ema9) > 5 and ema9[-5] != 0 else 0
-                ema21_slope = (ema21[-1] / ema21[-5] - 1) * 100 if len(ema21) > 5 and ema21[-5] != 0 else 0
-                ema50_slope = (ema50[-1] / ema50[-5] - 1) * 100 if len(ema50) > 5 and ema50[-5] != 0 else 0
-                price_change = (closes[-1] / closes[-20] - 1) * 100 if closes[-20] != 0 else 0
-
-                # Volume
-                avg_vol_20 = np.mean(volumes[-20:])
-                avg_vol_5 = np.mean(volumes[-5:])
-                rel_volume = avg_vol_5 / avg_vol_20 if avg_vol_20 != 0 else 1
-
-                # RSI
-                rsi = calculate_rsi_array(closes)
-                price_vs_50ema = (closes[-1] / ema50[-1] - 1) * 100 if len(ema50) > 0 and ema50[-1] != 0 else 0
-                price_vs_200ema = (closes[-1] / ema200[-1] - 1) * 100 if len(ema200) > 0 and ema200[-1] != 0 else 0
-
-                # Golden/Death Cross
-                golden_cross = False
-                death_cross = False
-                if len(ema50) > 10 and len(ema200) > 10:
-                    golden_cross = ema50[-1] > ema200[-1] and ema50[-10] < ema200[-10]
-                    death_cross = ema50[-1] < ema200[-1] and ema50[-10] > ema200[-10]
-
-                # Heuristic scoring
-                trending = ema_alignment != 0 and abs(ema9_slope) > 0.2 and abs(ema21_slope) > 0.15
-                volatile = atr_pct > 3.5 or bb_width > 6 or candle_sizes > 2.5
-                bullish = trending and ema_alignment == 1 and rsi > 55 and price_vs_50ema > 0.5 and price_vs_200ema > 0.5
-                bearish = trending and ema_alignment == -1 and rsi < 45 and price_vs_50ema < -0.5 and price_vs_200ema < -0.5
-
-                # Count signals
-                if bullish:
-                    bullish_count += 1
-                elif bearish:
-                    bearish_count += 1
-                elif volatile:
-                    volatile_count += 1
+                if resampler:
+                    data = resampler.read(symbol, timeframe)
                 else:
-                    ranging_count += 1
-
-                aggregated_metrics['volatility'] += float(volatile)
-                aggregated_metrics['trending_strength'] += float(trending)
-                aggregated_metrics['bullish_signals'] += float(bullish)
-                aggregated_metrics['bearish_signals'] += float(bearish)
-                aggregated_metrics['volume_intensity'] += float(rel_volume)
-                aggregated_metrics['total_samples'] += 1
-
-        # Decision logic
-        samples = aggregated_metrics['total_samples']
-        if samples == 0:
-            return {
-                'condition': 'RANGING',
-                'description': 'No valid samples for market condition detection.'
-            }
-
-        # Aggregate proportions
-        bull = bullish_count / samples
-        bear = bearish_count / samples
-        range_ = ranging_count / samples
-        vol = volatile_count / samples
-
-        # Main classification
-        if bull > 0.49:
-            return {
-                'condition': 'TRENDING_BULLISH',
-                'description': f"Detected strong bullish market ({bull*100:.0f}% bullish signals, {range_*100:.0f}% ranging)."
-            }
-        elif bear > 0.49:
-            return {
-                'condition': 'TRENDING_BEARISH',
-                'description': f"Detected strong bearish market ({bear*100:.0f}% bearish signals, {range_*100:.0f}% ranging)."
-            }
-        elif vol > 0.49:
-            return {
-                'condition': 'VOLATILE',
-                'description': f"Detected high volatility ({vol*100:.0f}% volatile signals)."
-            }
-        else:
-            return {
-                'condition': 'RANGING',
-                'description': f"Market is mostly ranging ({range_*100:.0f}% ranging, {bull*100:.0f}% bull, {bear*100:.0f}% bear, {vol*100:.0f}% volatile)."
-            }
+                    data = fetch_ohlc_data(exchange, symbol, timeframe=timeframe)
+                arrays = ohlcv_arrays(data)
+                if arrays is None or len(arrays[0]) < 30:
+                    continue
+                series.append(arrays)
+        return classify_market(batch_signals(series))
 
     except Exception as e:
         print(f"[ERROR] Market condition detection: {e}")
@@ -180,3 +436,57 @@ def detect_market_condition(
             'condition': 'RANGING',
             'description': 'Fallback due to exception.'
         }
+
+def _signals_match(a, b):
+    """Same regime flags, and rel_volume equal up to float rounding (RegimeState keeps running sums)."""
+    if a is None or b is None:
+        return a is b
+    return all(a[k] == b[k] for k in ('trending', 'volatile', 'bullish', 'bearish')) and \
+        bool(np.isclose(a['rel_volume'], b['rel_volume'], rtol=1e-9))
+
+def benchmark(series_count=12, length=144, rounds=50, seed=0):
+    """Time series_signals (per-series scalar functions) against batch_signals and RegimeState updates."""
+    import time
+    rng = np.random.default_rng(seed)
+    series = []
+    for i in range(series_count):
+        closes = 100 * np.exp(np.cumsum(rng.normal((i % 3 - 1) * 0.003, 0.01, length + 1)))
+        spread = rng.random(length + 1) * 0.01
+        series.append((closes, closes * (1 + spread), closes * (1 - spread), rng.random(length + 1) * 10))
+    current = [tuple(a[:length] for a in s) for s in series]
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        legacy = [series_signals(*s) for s in current]
+    legacy_time = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        batch = batch_signals(current)
+    batch_time = (time.perf_counter() - started) / rounds
+
+    # Streaming: one new closed candle per series, against recomputing every series from scratch
+    states = []
+    for closes, highs, lows, volumes in current:
+        state = RegimeState(window=length + 1)
+        for k in range(length):
+            state.update(highs[k], lows[k], closes[k], volumes[k])
+        states.append(state)
+    started = time.perf_counter()
+    streamed = []
+    for state, (closes, highs, lows, volumes) in zip(states, series):
+        state.update(highs[-1], lows[-1], closes[-1], volumes[-1])
+        streamed.append(state.signals())
+    stream_time = time.perf_counter() - started
+    started = time.perf_counter()
+    recomputed = [series_signals(*s) for s in series]
+    recompute_time = time.perf_counter() - started
+
+    print(f"[BENCH] {series_count} series x {length} candles")
+    print(f"[BENCH] series_signals: {legacy_time * 1000:.2f}ms | batch_signals: {batch_time * 1000:.2f}ms "
+          f"({legacy_time / batch_time:.1f}x) | identical: {batch == legacy}")
+    print(f"[BENCH] new candle - recompute: {recompute_time * 1000:.2f}ms | RegimeState: {stream_time * 1000:.2f}ms "
+          f"({recompute_time / stream_time:.1f}x) | identical: {all(map(_signals_match, streamed, recomputed))}")
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,229 @@
+import asyncio
+import datetime
+import json
+import threading
+import time
+import websockets
+
+KRAKEN_WS_URL = "wss://ws.kraken.com/v2"
+
+
+def _iso_to_ms(value):
+    """Convert Kraken's RFC3339 timestamps ('2024-01-01T00:00:00.000000000Z') to epoch milliseconds."""
+    value = value.rstrip('Z')
+    if '.' in value:
+        head, frac = value.split('.', 1)
+        value = f"{head}.{frac[:6]}"
+    dt = datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.timezone.utc)
+    return int(round(dt.timestamp() * 1000))
+
+
+class MarketStream:
+    """
+    Kraken WebSocket (v2) ingestion for the ohlc, ticker and trade channels.
+    Candle updates are merged straight into a CandleStore and the latest ticker/trade
+    prices are kept in memory, so the scan and the exit logic can read live state
+    instead of polling REST. Runs its own asyncio loop on a daemon thread.
+    """
+
+    def __init__(self, candle_store, url=KRAKEN_WS_URL, interval=1, batch_size=100,
+                 heartbeat_timeout=30.0, price_max_age=60.0):
+        self.candle_store = candle_store
+        self.url = url
+        self.interval = interval
+        self.timeframe = f"{interval}m"
+        self.batch_size = batch_size
+        self.heartbeat_timeout = heartbeat_timeout
+        self.price_max_age = price_max_age
+        self.symbols = []
+        self._subscribed = set()
+        self._subscribed_at = {}
+        self._tickers = {}
+        self._lock = threading.Lock()
+        self._last_message = 0.0
+        self._thread = None
+        self._loop = None
+        self._stop = None
+        self.stats = {'messages': 0, 'candles': 0, 'tickers': 0, 'trades': 0, 'reconnects': 0}
+
+    # --- lifecycle ---
+
+    def start(self, symbols):
+        """Subscribe to `symbols` and start the background reader thread."""
+        self.symbols = list(symbols)
+        self._thread = threading.Thread(target=self._thread_main, name='market-stream', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._loop and self._stop:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._stop = asyncio.Event()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url, max_size=None, ping_interval=20) as ws:
+                    print(f"[STREAM] Connected to {self.url}, subscribing {len(self.symbols)} symbols")
+                    await self._subscribe(ws)
+                    backoff = 1.0
+                    await self._read(ws)
+            except Exception as e:
+                print(f"[ERROR] Market stream: {e}")
+            with self._lock:
+                self._subscribed.clear()
+            if self._stop.is_set():
+                break
+            self.stats['reconnects'] += 1
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 60.0)
+
+    async def _subscribe(self, ws):
+        for i in range(0, len(self.symbols), self.batch_size):
+            batch = self.symbols[i:i + self.batch_size]
+            for params in (
+                {'channel': 'ohlc', 'symbol': batch, 'interval': self.interval, 'snapshot': True},
+                {'channel': 'ticker', 'symbol': batch},
+                {'channel': 'trade', 'symbol': batch, 'snapshot': False},
+            ):
+                await ws.send(json.dumps({'method': 'subscribe', 'params': params}))
+
+    async def _read(self, ws):
+        while not self._stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=self.heartbeat_timeout)
+            except asyncio.TimeoutError:
+                print(f"[WARNING] Market stream silent for {self.heartbeat_timeout:.0f}s, reconnecting")
+                return
+            self._last_message = time.monotonic()
+            self.stats['messages'] += 1
+            try:
+                self.handle_message(json.loads(raw))
+            except Exception as e:
+                print(f"[ERROR] Market stream message: {e}")
+
+    # --- message handling ---
+
+    def handle_message(self, msg):
+        """Apply one decoded Kraken v2 message to the in-memory state."""
+        if msg.get('method') == 'subscribe':
+            result = msg.get('result') or {}
+            if msg.get('success') and result.get('channel') == 'ohlc':
+                with self._lock:
+                    self._subscribed.add(result.get('symbol'))
+                    self._subscribed_at.setdefault(result.get('symbol'), time.time())
+            elif not msg.get('success'):
+                print(f"[WARNING] Stream subscription failed: {msg.get('error')}")
+            return
+        channel = msg.get('channel')
+        data = msg.get('data') or []
+        if channel == 'ohlc':
+            self._on_ohlc(data)
+        elif channel == 'ticker':
+            self._on_ticker(data)
+        elif channel == 'trade':
+            self._on_trade(data)
+
+    def _on_ohlc(self, data):
+        rows_by_symbol = {}
+        for c in data:
+            if c.get('interval', self.interval) != self.interval:
+                continue
+            row = [_iso_to_ms(c['interval_begin']), float(c['open']), float(c['high']),
+                   float(c['low']), float(c['close']), float(c['volume'])]
+            rows_by_symbol.setdefault(c['symbol'], []).append(row)
+        for symbol, rows in rows_by_symbol.items():
+            rows.sort(key=lambda r: r[0])
+            self.candle_store.ingest(symbol, self.timeframe, rows)
+            self.stats['candles'] += len(rows)
+
+    def _on_ticker(self, data):
+        now = time.time()
+        with self._lock:
+            for t in data:
+                ticker = self._tickers.setdefault(t['symbol'], {'symbol': t['symbol']})
+                for key in ('last', 'bid', 'ask', 'high', 'low', 'volume', 'vwap'):
+                    if t.get(key) is not None:
+                        ticker[key] = float(t[key])
+                ticker['updated'] = now
+                self.stats['tickers'] += 1
+
+    def _on_trade(self, data):
+        now = time.time()
+        with self._lock:
+            for t in data:
+                ticker = self._tickers.setdefault(t['symbol'], {'symbol': t['symbol']})
+                price = float(t['price'])
+                ticker['last'] = price
+                if price > ticker.get('high', price):
+                    ticker['high'] = price
+                ticker['updated'] = now
+                self.stats['trades'] += 1
+
+    # --- readers ---
+
+    @property
+    def connected(self):
+        return self._last_message > 0 and time.monotonic() - self._last_message < self.heartbeat_timeout
+
+    def is_live(self, symbol):
+        """True when the stream is healthy and `symbol` has an active ohlc subscription."""
+        with self._lock:
+            subscribed = symbol in self._subscribed
+        return subscribed and self.connected
+
+    def last_price(self, symbol):
+        """Latest trade/ticker price for `symbol`, or None if unknown or stale."""
+        ticker = self.tickers([symbol]).get(symbol)
+        return ticker['last'] if ticker else None
+
+    def last_update(self, symbol):
+        """
+        Epoch seconds of the last streamed ticker/trade update for `symbol` (its subscription time
+        if nothing arrived yet), or None when the symbol is not being streamed.
+        """
+        if not self.is_live(symbol):
+            return None
+        with self._lock:
+            t = self._tickers.get(symbol)
+            return t['updated'] if t else self._subscribed_at.get(symbol)
+
+    def tickers(self, symbols):
+        """Return ccxt-style ticker dicts for symbols with a fresh streamed price."""
+        cutoff = time.time() - self.price_max_age
+        out = {}
+        with self._lock:
+            for symbol in symbols:
+                t = self._tickers.get(symbol)
+                if t and t.get('last') is not None and t['updated'] >= cutoff:
+                    out[symbol] = dict(t)
+        return out
+
+    def fetch(self, exchange, symbol, timeframe='1m', limit=144, pace=None):
+        """
+        Candle source for the scanner: read streamed candles when the symbol is live and the
+        store already holds its backfilled history, otherwise fall back to the store's REST refresh
+        (the only path that calls `pace`).
+        """
+        if timeframe == self.timeframe and self.is_live(symbol) and self.candle_store.is_backfilled(symbol, timeframe):
+            return self.candle_store.read(symbol, timeframe=timeframe, limit=limit)
+        return self.candle_store.fetch(exchange, symbol, timeframe=timeframe, limit=limit, pace=pace)
+
+    def print_stats(self):
+        s = self.stats
+        state = 'live' if self.connected else 'down'
+        print(f"[STREAM] {state} | subscribed: {len(self._subscribed)} | msgs: {s['messages']} | "
+              f"candles: {s['candles']} | tickers: {s['tickers']} | trades: {s['trades']} | reconnects: {s['reconnects']}")
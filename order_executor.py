@@ -0,0 +1,96 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from scanner import RateLimiter, exchange_rate_limiter
+
+
+class OrderExecutor:
+    """
+    Private exchange calls (orders, balances) run one at a time on a single worker thread, in
+    the order they were submitted. Kraken rejects a private request whose nonce is not above the
+    previous one, so requests from several threads racing each other can fail; queueing them keeps
+    nonces increasing while callers submit a whole batch at once and handle each acknowledgement
+    as its Future completes. Request starts are spaced by `rate_limiter` instead of a fixed sleep
+    (see order_rate_limiter); ccxt's own throttle still applies inside each call.
+    """
+
+    def __init__(self, exchange, rate_limiter=None):
+        self.exchange = exchange
+        self.rate_limiter = rate_limiter or exchange_rate_limiter(exchange)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='orders', daemon=True)
+        self._thread.start()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {'calls': 0, 'errors': 0, 'queued': 0.0, 'busy': 0.0}
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(exchange, *args, **kwargs); returns a Future with its result."""
+        future = Future()
+        self._queue.put((future, fn, args, kwargs, time.monotonic()))
+        return future
+
+    def call(self, fn, *args, **kwargs):
+        """submit() and wait for the result."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs, submitted = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            self.rate_limiter.wait()
+            started = time.monotonic()
+            try:
+                future.set_result(fn(self.exchange, *args, **kwargs))
+                error = False
+            except Exception as e:
+                future.set_exception(e)
+                error = True
+            finished = time.monotonic()
+            with self._lock:
+                self.stats['calls'] += 1
+                self.stats['errors'] += error
+                self.stats['queued'] += started - submitted
+                self.stats['busy'] += finished - started
+
+    def shutdown(self, wait=True):
+        """Stop the worker once the calls already queued have run."""
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def print_stats(self):
+        with self._lock:
+            s = self.stats
+            self.reset_stats()
+        if not s['calls']:
+            return
+        print(f"[ORDERS] private calls: {s['calls']} | errors: {s['errors']} | "
+              f"avg queued: {s['queued'] / s['calls'] * 1000:.0f}ms | avg call: {s['busy'] / s['calls'] * 1000:.0f}ms")
+
+
+def order_rate_limiter(exchange, rate_limit_ms=None):
+    """
+    RateLimiter spacing order starts by `rate_limit_ms` (None: exchange.rateLimit). With
+    enableRateLimit ccxt sleeps rateLimit * endpoint cost before each request on its own; for
+    Kraken AddOrder costs 0, so this limiter is the only pacing on orders. If ccxt charges orders
+    at least `rate_limit_ms`, its throttle already sets the spacing and this one would only add to it.
+    """
+    if rate_limit_ms is None:
+        return exchange_rate_limiter(exchange)
+    ccxt_ms = 0
+    if getattr(exchange, 'enableRateLimit', False):
+        config = (((getattr(exchange, 'api', None) or {}).get('private') or {}).get('post') or {}).get('AddOrder')
+        cost = config.get('cost', 1) if isinstance(config, dict) else 1
+        ccxt_ms = (getattr(exchange, 'rateLimit', 0) or 0) * cost
+    if ccxt_ms >= rate_limit_ms > 0:
+        print(f"[WARNING] ccxt already spaces orders {ccxt_ms:.0f}ms apart, ORDER_RATE_LIMIT_MS={rate_limit_ms} has no effect")
+        return RateLimiter(0)
+    return RateLimiter(rate_limit_ms / 1000.0)
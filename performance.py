@@ -0,0 +1,146 @@
+import collections
+import datetime
+import numpy as np
+from trade_store import close_ms
+
+# Columns of a bucket: realised PnL, absolute losses, closed trades, winning trades
+PNL, LOSS, TRADES, WINS = range(4)
+WINDOWS = {'1d': 86400, '7d': 7 * 86400}
+
+
+class RollingPerformance:
+    """
+    Trade performance updated once per closed trade and read in O(1).
+    Trades are summed into per-minute buckets held in a ring covering the longest window;
+    each window (WINDOWS) keeps a running total that buckets are subtracted from as they
+    age out, so windowed PnL, losses and win rates never rescan history. Window edges are
+    minute aligned. Alongside: all-time and per-strategy totals, the last losing close per
+    symbol and the current streak of losing trades.
+    """
+
+    def __init__(self, windows=WINDOWS, bucket_seconds=60):
+        self.windows = dict(windows)
+        self.bucket_ms = bucket_seconds * 1000
+        self._sizes = {name: -(-seconds * 1000 // self.bucket_ms) for name, seconds in self.windows.items()}
+        self._ring_size = max(self._sizes.values()) + 1
+        self._ring = np.zeros((self._ring_size, 4))
+        self._head = None
+        self._totals = {name: np.zeros(4) for name in self.windows}
+        self._tails = {}
+        self._strategies = {}
+        self._all = np.zeros(4)
+        self._all_losses = 0
+        self._last_loss = {}
+        self._streak = collections.deque()
+        self._streak_start = None
+
+    def _bucket(self, ms):
+        return int(ms // self.bucket_ms)
+
+    def _advance(self, now_bucket):
+        """Age every window out to `now_bucket`, then move the ring head there."""
+        if self._head is None:
+            self._head = now_bucket
+            for name, size in self._sizes.items():
+                self._tails[name] = now_bucket - size + 1
+            return
+        if now_bucket <= self._head:
+            return
+        for name, size in self._sizes.items():
+            first = now_bucket - size + 1
+            tail = self._tails[name]
+            if first > self._head:
+                self._totals[name][:] = 0
+            else:
+                # Slots past the head still hold buckets from a previous lap of the ring
+                for b in range(tail, first):
+                    self._totals[name] -= self._ring[b % self._ring_size]
+            self._tails[name] = max(tail, first)
+        if now_bucket - self._head >= self._ring_size:
+            self._ring[:] = 0
+        else:
+            for b in range(self._head + 1, now_bucket + 1):
+                self._ring[b % self._ring_size] = 0
+        self._head = now_bucket
+
+    def add(self, trade, now=None):
+        """Count a closed trade (call once, when it closes)."""
+        stamp = close_ms(trade)
+        if stamp is None:
+            return
+        profit = trade.get('profit_usd', 0)
+        pct = trade.get('profit_pct', 0)
+        row = np.array([profit, abs(profit) if pct < 0 else 0.0, 1.0, 1.0 if pct > 0 else 0.0])
+        self._all += row
+        self._all_losses += pct < 0
+        strategy = trade.get('strategy')
+        if strategy is not None:
+            self._strategies.setdefault(strategy, np.zeros(4))[:] += row
+        if pct < 0:
+            self._last_loss[trade['symbol']] = max(stamp, self._last_loss.get(trade['symbol'], stamp))
+            if self._streak_start is None or stamp >= self._streak_start:
+                self._streak.append(stamp)
+        elif self._streak_start is None or stamp >= self._streak_start:
+            # A trade that did not lose ends the streak
+            self._streak.clear()
+            self._streak_start = stamp
+        bucket = self._bucket(stamp)
+        self._advance(max(bucket, self._now_bucket(now)))
+        if bucket <= self._head - self._ring_size:
+            return
+        self._ring[bucket % self._ring_size] += row
+        for name in self.windows:
+            if bucket >= self._tails[name]:
+                self._totals[name] += row
+
+    def seed(self, trade_store, now=None):
+        """Load history from a trade store: every trade inside the longest window, oldest first."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        horizon = now - datetime.timedelta(seconds=max(self.windows.values()))
+        for trade in trade_store.trades_since(horizon):
+            self.add(trade, now=now)
+        # Older trades only count towards the all-time totals
+        count, wins, losses, profit = trade_store.totals()
+        self._all = np.array([profit, self._all[LOSS], count, wins])
+        self._all_losses = losses
+        for strategy, (trades, strategy_profit, strategy_wins) in trade_store.strategy_summary().items():
+            self._strategies[strategy] = np.array([strategy_profit, 0.0, trades, strategy_wins])
+
+    def _now_bucket(self, now=None):
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        return self._bucket(now.timestamp() * 1000)
+
+    def _window(self, window, now=None):
+        self._advance(self._now_bucket(now))
+        return self._totals[window]
+
+    def pnl(self, window='1d', now=None):
+        return float(self._window(window, now)[PNL])
+
+    def losses(self, window='1d', now=None):
+        """Sum of absolute losses of losing trades in the window."""
+        return float(self._window(window, now)[LOSS])
+
+    def counts(self, window='1d', now=None):
+        """(closed trades, winning trades) in the window."""
+        totals = self._window(window, now)
+        return int(totals[TRADES]), int(totals[WINS])
+
+    def has_loss_since(self, symbol, cutoff):
+        """True if `symbol` closed a losing trade after `cutoff` (an aware datetime)."""
+        return self._last_loss.get(symbol, -np.inf) > cutoff.timestamp() * 1000
+
+    def consecutive_losses(self, since):
+        """Losing trades closed after `since` with no non-losing trade after them."""
+        cutoff = since.timestamp() * 1000
+        while self._streak and self._streak[0] <= cutoff:
+            self._streak.popleft()
+        return len(self._streak)
+
+    def strategy_summary(self):
+        """{strategy: (trades, profit_usd, wins)} over all trades with a strategy."""
+        return {s: (int(v[TRADES]), float(v[PNL]), int(v[WINS])) for s, v in self._strategies.items()}
+
+    def totals(self):
+        """(trades, wins, losses, profit_usd) over all trades."""
+        return int(self._all[TRADES]), int(self._all[WINS]), int(self._all_losses), float(self._all[PNL])
@@ -0,0 +1,245 @@
+import datetime
+import json
+import os
+import threading
+import time
+
+# Recomputed from the ticker every cycle, not worth persisting
+TRANSIENT_FIELDS = ('current_price',)
+# Exchange and local clocks differ a little; fills this close to the last save are rechecked
+CLOCK_SKEW_MS = 5000
+
+
+def _encode(pos):
+    return json.dumps({k: v for k, v in pos.items() if k not in TRANSIENT_FIELDS}, default=str, sort_keys=True)
+
+
+def _decode(encoded):
+    pos = json.loads(encoded)
+    if isinstance(pos.get('timestamp'), str):
+        pos['timestamp'] = datetime.datetime.fromisoformat(pos['timestamp'])
+    return pos
+
+
+class PortfolioJournal:
+    """
+    Open positions checkpointed as a JSON snapshot plus an append-only JSON Lines journal:
+        {"seq": n, "time": ms, "set": symbol, "pos": {...}}    a position opened or changed
+        {"seq": n, "time": ms, "del": symbol}                  a position closed
+    save() compares each position with what was last written and appends only the changes, fsynced
+    right away (a lost position is an unmanaged one). After `compact_every` records the journal is
+    folded into a new snapshot (written atomically) and truncated. `saved_at` is the epoch ms of the
+    last write: fills after it were not seen by the bot and are picked up by reconcile().
+    """
+
+    def __init__(self, path='portfolio.json', journal_path=None, compact_every=500):
+        self.path = path
+        self.journal_path = journal_path or os.path.splitext(path)[0] + '.journal'
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+        self._records = 0
+        self._written = {}
+        self.saved_at = None
+
+    def load(self):
+        """Snapshot with the journal replayed on top of it. Returns {symbol: position}."""
+        with self._lock:
+            positions = {}
+            seq = 0
+            try:
+                with open(self.path, 'r') as f:
+                    snapshot = json.load(f)
+                seq = snapshot.get('seq', 0)
+                self.saved_at = snapshot.get('time')
+                positions = {s: json.dumps(p, sort_keys=True) for s, p in snapshot.get('positions', {}).items()}
+            except FileNotFoundError:
+                pass
+            self._seq = seq
+            self._records = 0
+            if os.path.exists(self.journal_path):
+                self._replay(positions, seq)
+            self._written = positions
+            return {symbol: _decode(encoded) for symbol, encoded in positions.items()}
+
+    def _replay(self, positions, snapshot_seq):
+        good = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"[WARNING] Portfolio journal damaged after {self._records} records, truncating")
+                    break
+                good += len(line)
+                self._records += 1
+                self._seq = max(self._seq, record['seq'])
+                if record['seq'] <= snapshot_seq:
+                    continue
+                self.saved_at = max(self.saved_at or 0, record['time'])
+                if 'del' in record:
+                    positions.pop(record['del'], None)
+                else:
+                    positions[record['set']] = json.dumps(record['pos'], sort_keys=True)
+        if good != os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, good)
+
+    def save(self, portfolio):
+        """Append the positions opened, changed or closed since the last save."""
+        with self._lock:
+            now = int(time.time() * 1000)
+            encoded = {symbol: _encode(pos) for symbol, pos in portfolio.items()}
+            lines = []
+            for symbol, value in encoded.items():
+                if self._written.get(symbol) != value:
+                    self._seq += 1
+                    lines.append(f'{{"seq": {self._seq}, "time": {now}, "set": {json.dumps(symbol)}, "pos": {value}}}')
+            for symbol in self._written.keys() - encoded.keys():
+                self._seq += 1
+                lines.append(json.dumps({'seq': self._seq, 'time': now, 'del': symbol}))
+            self._written = encoded
+            if not lines:
+                return
+            if self._file is None:
+                self._file = open(self.journal_path, 'a')
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._records += len(lines)
+            self.saved_at = now
+            if self._records >= self.compact_every:
+                self._snapshot(now)
+
+    def _snapshot(self, now):
+        snapshot = {'seq': self._seq, 'time': now,
+                    'positions': {symbol: json.loads(value) for symbol, value in self._written.items()}}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        with open(self.journal_path, 'w'):
+            pass
+        self._records = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def reconcile(exchange, positions, saved_at):
+    """
+    Check checkpointed positions against the account in one batched pass: a single fetch_balance
+    and a single fetch_my_trades since the last checkpoint. Each symbol's fills after the checkpoint
+    are replayed in time order on top of its checkpointed position (see _apply_fills), so a position
+    sold and bought again in that window is kept, and buys the bot did not get to save are adopted.
+    Amounts are then capped at what is held; positions left below the minimum order are dropped.
+    Returns the reconciled {symbol: position}.
+    """
+    try:
+        balance = exchange.fetch_balance().get('total', {})
+    except Exception as e:
+        print(f"[WARNING] Could not fetch balance to reconcile the portfolio, keeping the checkpoint: {e}")
+        return positions
+    fills = []
+    if saved_at is not None:
+        try:
+            fills = exchange.fetch_my_trades(since=int(saved_at) - CLOCK_SKEW_MS)
+        except Exception as e:
+            print(f"[WARNING] Could not fetch recent fills, reconciling against balances only: {e}")
+    by_symbol = {}
+    for fill in sorted(fills, key=lambda f: f['timestamp']):
+        by_symbol.setdefault(fill['symbol'], []).append(fill)
+
+    reconciled = {}
+    for symbol in list(positions) + [s for s in by_symbol if s not in positions]:
+        held, min_amount = _held(exchange, balance, symbol)
+        checkpointed = positions.get(symbol)
+        pos = _apply_fills(symbol, checkpointed, by_symbol.get(symbol, []), min_amount)
+        if pos is None:
+            if checkpointed is not None:
+                print(f"[RECONCILE] {symbol}: sold after the checkpoint, dropping the position")
+            continue
+        if held < max(min_amount, pos['amount'] * 0.01):
+            if checkpointed is not None:
+                print(f"[RECONCILE] {symbol}: no longer held, dropping the position")
+            continue
+        if held < pos['amount']:
+            print(f"[RECONCILE] {symbol}: amount {pos['amount']:.8f} -> {held:.8f} (held)")
+            pos['amount'] = held
+            pos['allocation'] = pos['entry'] * held
+        reconciled[symbol] = pos
+    return reconciled
+
+
+def _apply_fills(symbol, pos, fills, min_amount):
+    """
+    Replay a symbol's fills (oldest first) on its checkpointed position, or on none. Sells reduce
+    the amount; a buy adds to an open position or, once it is closed, opens a new one at the fill
+    price. Fills from before the checkpointed position opened, and its own opening order, are
+    skipped: they belong to an earlier position or are already counted.
+    Returns the resulting position, or None if it ends up closed.
+    """
+    pos = dict(pos) if pos is not None else None
+    opened_by = pos.get('order_id') if pos is not None else None
+    opened_at = _opened_ms(pos)
+    for fill in fills:
+        if opened_by is not None and (fill.get('order') == opened_by or fill['timestamp'] < opened_at):
+            continue
+        amount = fill['amount']
+        cost = fill.get('cost') or amount * fill['price']
+        is_open = pos is not None and pos['amount'] > min_amount
+        if fill.get('side') == 'sell':
+            if is_open:
+                pos['amount'] -= amount
+            continue
+        if fill.get('side') != 'buy':
+            continue
+        if is_open:
+            total = pos['amount'] + amount
+            pos['entry'] = (pos['entry'] * pos['amount'] + cost) / total
+            pos['amount'] = total
+            pos['allocation'] = pos['entry'] * total
+            continue
+        entry = cost / amount
+        pos = {
+            'entry': entry,
+            'allocation': cost,
+            'amount': amount,
+            'timestamp': datetime.datetime.fromtimestamp(fill['timestamp'] / 1000, datetime.timezone.utc),
+            'highest': entry,
+            'lowest': entry,
+            'strategy': 'UNKNOWN',
+            'order_id': fill.get('order') or 'unknown',
+            'trailing_stop': None,
+            'max_price': entry
+        }
+        opened_by = None
+        print(f"[RECONCILE] {symbol}: adopted a buy filled after the checkpoint | Amount: {amount:.8f} @ {entry}")
+    if pos is None or pos['amount'] <= min_amount:
+        return None
+    return pos
+
+
+def _opened_ms(pos):
+    stamp = pos.get('timestamp') if pos is not None else None
+    if isinstance(stamp, str):
+        stamp = datetime.datetime.fromisoformat(stamp)
+    return stamp.timestamp() * 1000 if isinstance(stamp, datetime.datetime) else 0
+
+
+def _held(exchange, balance, symbol):
+    """(total balance of the symbol's base currency, exchange minimum order amount)."""
+    try:
+        market = exchange.market(symbol)
+    except Exception:
+        market = {'base': symbol.split('/')[0]}
+    min_amount = ((market.get('limits') or {}).get('amount') or {}).get('min') or 0
+    return balance.get(market.get('base'), 0) or 0, min_amount
@@ -0,0 +1,89 @@
+import time
+
+
+class TickerPrefilter:
+    """
+    Reject symbols from a single bulk `fetch_tickers` call before any candles are downloaded.
+    Rules (any can be disabled with None):
+      - min_quote_volume: 24h USD volume below this is too illiquid to trade
+      - max_spread_pct:   bid/ask spread wider than this eats the edge of a scalp
+      - max_range_pct:    24h high/low range above this has already pumped
+      - max_age:          ticker older than this many seconds is treated as stale
+    Kraken's REST tickers carry no timestamp; for those the age is taken from `last_update`
+    (symbol -> epoch seconds of the last streamed update, e.g. MarketStream.last_update), and
+    the rule is skipped when neither is known.
+    """
+
+    def __init__(self, min_quote_volume=10000, max_spread_pct=1.0, max_range_pct=80.0, max_age=120,
+                 last_update=None):
+        self.min_quote_volume = min_quote_volume
+        self.max_spread_pct = max_spread_pct
+        self.max_range_pct = max_range_pct
+        self.max_age = max_age
+        self.last_update = last_update
+        self.tickers = {}
+        self.last_stats = {}
+
+    def apply(self, exchange, symbols):
+        """Return the symbols that pass every rule. Falls back to all symbols if the ticker call fails."""
+        symbols = list(symbols)
+        stats = {'checked': len(symbols), 'passed': 0, 'missing': 0, 'volume': 0,
+                 'spread': 0, 'range': 0, 'stale': 0}
+        self.last_stats = stats
+        if not symbols:
+            return []
+        try:
+            self.tickers = exchange.fetch_tickers(symbols)
+        except Exception as e:
+            print(f"[ERROR] Pre-filter ticker fetch failed, scanning unfiltered: {e}")
+            self.tickers = {}
+            stats['passed'] = len(symbols)
+            return symbols
+        now_ms = time.time() * 1000
+        passed = []
+        for symbol in symbols:
+            reason = self.check(self.tickers.get(symbol), now_ms)
+            if reason:
+                stats[reason] += 1
+            else:
+                passed.append(symbol)
+        stats['passed'] = len(passed)
+        return passed
+
+    def check(self, ticker, now_ms=None):
+        """Return the name of the first rule `ticker` fails, or None if it passes."""
+        if not ticker or ticker.get('last') is None:
+            return 'missing'
+        if self.min_quote_volume is not None:
+            quote_volume = ticker.get('quoteVolume')
+            if quote_volume is None and ticker.get('baseVolume') is not None:
+                quote_volume = ticker['baseVolume'] * (ticker.get('vwap') or ticker['last'])
+            if (quote_volume or 0) < self.min_quote_volume:
+                return 'volume'
+        if self.max_spread_pct is not None:
+            bid, ask = ticker.get('bid'), ticker.get('ask')
+            if bid and ask and (ask - bid) / ask * 100 > self.max_spread_pct:
+                return 'spread'
+        if self.max_range_pct is not None:
+            high, low = ticker.get('high'), ticker.get('low')
+            if high and low and (high - low) / low * 100 > self.max_range_pct:
+                return 'range'
+        if self.max_age is not None:
+            stamp = ticker.get('timestamp')
+            if stamp is None and self.last_update is not None and ticker.get('symbol'):
+                updated = self.last_update(ticker['symbol'])
+                stamp = updated * 1000 if updated is not None else None
+            if stamp and ((now_ms or time.time() * 1000) - stamp) / 1000 > self.max_age:
+                return 'stale'
+        return None
+
+    def prices(self):
+        """Last prices from the most recent bulk ticker call."""
+        return {s: t.get('last') for s, t in self.tickers.items() if t}
+
+    def print_stats(self):
+        s = self.last_stats
+        if not s:
+            return
+        print(f"[PREFILTER] {s['passed']}/{s['checked']} passed | rejected - volume: {s['volume']} | "
+              f"spread: {s['spread']} | range: {s['range']} | stale: {s['stale']} | no ticker: {s['missing']}")
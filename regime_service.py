@@ -0,0 +1,177 @@
+import datetime
+import threading
+import time
+import ccxt
+from candle_store import CandleStore
+from market_condition import ohlcv_arrays, batch_signals, classify_market, RegimeState
+
+DEFAULT_SYMBOLS = ('BTC/USD', 'ETH/USD', 'SOL/USD')
+DEFAULT_TIMEFRAMES = ('5m', '15m', '1h', '4h')
+
+
+class RegimeService:
+    """
+    Market regime kept up to date off the hot path.
+    With a Resampler, every series is aggregated locally from the 1m candles the bot already holds.
+    Otherwise each (symbol, timeframe) series is cached until its forming candle closes and only then
+    refreshed (deltas only, through a CandleStore). Series signals are recomputed only for series
+    whose candles changed (in one batch_signals pass), and the regime only when some signal input
+    changed. With `streaming`, resampled series instead keep a RegimeState that is fed each closed
+    bar once and gives the same signals without recomputing the window. current() never touches the network.
+    """
+
+    def __init__(self, exchange, symbols=DEFAULT_SYMBOLS, timeframes=DEFAULT_TIMEFRAMES, limit=144,
+                 poll_interval=5.0, close_grace=2.0, candle_store=None, resampler=None, streaming=False):
+        self.exchange = exchange
+        self.symbols = tuple(symbols)
+        self.timeframes = tuple(timeframes)
+        self.keys = [(s, tf) for s in symbols for tf in timeframes]
+        self.resampler = resampler
+        self.streaming = streaming and resampler is not None
+        self._states = {}
+        self.limit = limit
+        self.poll_interval = poll_interval
+        self.close_grace_ms = int(close_grace * 1000)
+        self.candle_store = candle_store or CandleStore(capacity=limit)
+        self._signals = {}
+        self._inputs = {}
+        self._next_due = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._result = {
+            'condition': 'RANGING',
+            'description': 'Market regime not computed yet.',
+            'timestamp': None
+        }
+        self.stats = {'refreshes': 0, 'unchanged': 0, 'recomputes': 0, 'failures': 0}
+
+    def start(self):
+        """Compute the regime once, then keep it current on a background thread."""
+        self.refresh_due()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='regime', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh_due()
+            except Exception as e:
+                print(f"[ERROR] Regime refresh: {e}")
+
+    def _fingerprint(self, symbol, timeframe):
+        """Identifies the cached series contents: newest candle timestamp and values."""
+        with self.candle_store.locked(symbol, timeframe) as buf:
+            if buf is None or len(buf) == 0:
+                return None
+            return len(buf), tuple(buf.tail(1)[0])
+
+    def _update_signals(self, changed):
+        """Recompute the signals of the changed {key: candles} series in one batch."""
+        keys = list(changed)
+        series = []
+        for key in keys:
+            arrays = ohlcv_arrays(changed[key])
+            series.append(arrays if arrays and len(arrays[0]) >= 30 else None)
+        for key, signals in zip(keys, batch_signals(series)):
+            self._signals[key] = signals
+
+    def _stream_signals(self, key, candles):
+        """Feed closed bars newer than the state's last one, then read signals with the forming bar."""
+        rows = candles.rows()
+        state, last = self._states.get(key, (None, None))
+        closed = rows[:-1]
+        if state is None or not len(closed) or last < closed[0, 0]:
+            # New series, or the resampler was reseeded past what the state has seen
+            state, last = RegimeState(window=self.limit), None
+        for row in closed if last is None else closed[closed[:, 0] > last]:
+            state.update(row[2], row[3], row[4], row[5])
+            last = row[0]
+        self._states[key] = (state, last)
+        forming = rows[-1]
+        self._signals[key] = state.signals(forming=(forming[2], forming[3], forming[4], forming[5]))
+
+    def refresh_due(self, now_ms=None):
+        """Refresh every series whose candle has closed. Returns True if the regime was recomputed."""
+        now_ms = now_ms or int(time.time() * 1000)
+        changed = self._refresh_resampled(now_ms) if self.resampler else self._refresh_fetched(now_ms)
+        if changed:
+            result = classify_market(self._signals.values())
+            result['timestamp'] = datetime.datetime.now(datetime.timezone.utc)
+            with self._lock:
+                self._result = result
+            self.stats['recomputes'] += 1
+        return changed
+
+    def _refresh_resampled(self, now_ms):
+        changed = {}
+        for symbol in self.symbols:
+            try:
+                self.resampler.update(symbol, self.timeframes, now_ms=now_ms)
+            except Exception as e:
+                self.stats['failures'] += 1
+                print(f"[ERROR] {symbol} regime resample: {e}")
+        for key in self.keys:
+            candles = self.resampler.read(*key, limit=self.limit)
+            if candles is None:
+                self.stats['failures'] += 1
+                continue
+            self.stats['refreshes'] += 1
+            fingerprint = (len(candles), tuple(candles.rows()[-1]))
+            if fingerprint == self._inputs.get(key):
+                self.stats['unchanged'] += 1
+                continue
+            self._inputs[key] = fingerprint
+            if self.streaming:
+                self._stream_signals(key, candles)
+            changed[key] = candles
+        if changed and not self.streaming:
+            self._update_signals(changed)
+        return bool(changed)
+
+    def _refresh_fetched(self, now_ms):
+        changed = {}
+        for symbol, timeframe in self.keys:
+            key = (symbol, timeframe)
+            if now_ms < self._next_due.get(key, 0):
+                continue
+            if not self.candle_store.refresh(self.exchange, symbol, timeframe=timeframe, limit=self.limit):
+                self.stats['failures'] += 1
+                continue
+            self.stats['refreshes'] += 1
+            with self.candle_store.locked(symbol, timeframe) as buf:
+                last = buf.last_timestamp if buf is not None else None
+            if last is None:
+                continue
+            tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+            # The newest stored candle is still forming; nothing new can arrive before it closes.
+            self._next_due[key] = last + tf_ms + self.close_grace_ms
+            fingerprint = self._fingerprint(symbol, timeframe)
+            if fingerprint == self._inputs.get(key):
+                self.stats['unchanged'] += 1
+                continue
+            self._inputs[key] = fingerprint
+            changed[key] = self.candle_store.read(symbol, timeframe=timeframe, limit=self.limit)
+        if changed:
+            self._update_signals(changed)
+        return bool(changed)
+
+    def current(self):
+        """Latest regime: {'condition', 'description', 'timestamp', 'age'} (age in seconds, None before the first run)."""
+        with self._lock:
+            result = dict(self._result)
+        stamp = result['timestamp']
+        result['age'] = (datetime.datetime.now(datetime.timezone.utc) - stamp).total_seconds() if stamp else None
+        return result
+
+    def print_stats(self):
+        s = self.stats
+        print(f"[REGIME] refreshes: {s['refreshes']} | unchanged: {s['unchanged']} | "
+              f"recomputes: {s['recomputes']} | failures: {s['failures']}")
@@ -0,0 +1,150 @@
+import threading
+import time
+import numpy as np
+import ccxt
+from candle_store import CandleBuffer
+from candles import Candles
+
+
+def resample(rows, timeframe_ms):
+    """
+    Aggregate OHLCV rows (n x 6, timestamp ordered) into `timeframe_ms` bars aligned to the epoch:
+    first open, highest high, lowest low, last close, summed volume. Minutes without trades
+    (absent rows) simply contribute nothing, as on the exchange.
+    """
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+    if not len(rows):
+        return rows.copy()
+    buckets = rows[:, 0] // timeframe_ms * timeframe_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(rows)] - 1
+    out = np.empty((len(starts), 6))
+    out[:, 0] = buckets[starts]
+    out[:, 1] = rows[starts, 1]
+    out[:, 2] = np.maximum.reduceat(rows[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(rows[:, 3], starts)
+    out[:, 4] = rows[ends, 4]
+    out[:, 5] = np.add.reduceat(rows[:, 5], starts)
+    return out
+
+
+def _combine(bar, agg):
+    """Extend bar (same bucket) with a later aggregate."""
+    return [bar[0], bar[1], max(bar[2], agg[2]), min(bar[3], agg[3]), agg[4], bar[5] + agg[5]]
+
+
+class Resampler:
+    """
+    Higher-timeframe candles built locally from the 1m candles in a CandleStore.
+    Closed 1m candles are folded into per-(symbol, timeframe) bars once; reads overlay the
+    still-forming 1m candle on a copy of the last bar, so no extra exchange requests are needed.
+
+    Bars older than the 1m window are seeded once per series from the exchange. Bars are exact
+    from the first bucket boundary after seeding; the bucket forming at seed time can miss the
+    trades of that one minute after the seed request. If the 1m window ever falls further behind
+    than its capacity, the series is reseeded.
+    """
+
+    def __init__(self, candle_store, exchange=None, base='1m', capacity=144):
+        self.candle_store = candle_store
+        self.exchange = exchange
+        self.base = base
+        self.base_ms = ccxt.Exchange.parse_timeframe(base) * 1000
+        self.capacity = capacity
+        self._bars = {}
+        self._folded = {}
+        self._lock = threading.Lock()
+        self.stats = {'seeds': 0, 'reseeds': 0, 'folded': 0, 'refreshes': 0}
+
+    def update(self, symbol, timeframes, now_ms=None):
+        """Bring the 1m candles up to date if stale, seed new series, and fold closed 1m candles."""
+        now_ms = now_ms or int(time.time() * 1000)
+        rows = self.candle_store.rows(symbol, self.base)
+        if self.exchange and (rows is None or not len(rows) or rows[-1, 0] < now_ms - 2 * self.base_ms):
+            self.candle_store.refresh(self.exchange, symbol, timeframe=self.base)
+            self.stats['refreshes'] += 1
+            rows = self.candle_store.rows(symbol, self.base)
+        if rows is None or not len(rows):
+            return
+        for timeframe in timeframes:
+            key = (symbol, timeframe)
+            with self._lock:
+                folded = self._folded.get(key)
+                if folded is not None and rows[0, 0] > folded:
+                    # Closed candles were dropped from the 1m window before they were folded
+                    self.stats['reseeds'] += 1
+                    folded = None
+                if folded is None:
+                    if not self._seed(key, rows):
+                        continue
+                self._fold(key, rows)
+
+    def _seed(self, key, rows):
+        symbol, timeframe = key
+        tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        bars = CandleBuffer(self.capacity)
+        if self.exchange:
+            try:
+                data = self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=self.capacity)
+            except Exception as e:
+                print(f"[ERROR] {symbol} {timeframe} resampler seed: {e}")
+                return False
+            bars.reset(data or [])
+            # The exchange's last bar already includes the forming minute
+            folded = rows[-1, 0]
+        else:
+            # Only whole buckets can be built from the window: skip a leading partial one
+            closed = rows[:-1]
+            start = -(-closed[0, 0] // tf_ms) * tf_ms if len(closed) else 0
+            bars.reset(resample(closed[closed[:, 0] >= start], tf_ms))
+            folded = closed[-1, 0] if len(closed) else rows[-1, 0] - self.base_ms
+        self._bars[key] = bars
+        self._folded[key] = folded
+        self.stats['seeds'] += 1
+        return True
+
+    def _fold(self, key, rows):
+        """Fold closed 1m rows newer than what the bars already hold (the newest row is still forming)."""
+        tf_ms = ccxt.Exchange.parse_timeframe(key[1]) * 1000
+        closed = rows[:-1]
+        pending = closed[closed[:, 0] > self._folded[key]]
+        if not len(pending):
+            return
+        self._merge(self._bars[key], resample(pending, tf_ms))
+        self._folded[key] = pending[-1, 0]
+        self.stats['folded'] += len(pending)
+
+    @staticmethod
+    def _merge(bars, aggregates):
+        last = bars.last_timestamp
+        for agg in aggregates:
+            if last is not None and agg[0] == last:
+                bars.merge([_combine(bars.tail(1)[0], agg)])
+            else:
+                bars.merge([agg])
+            last = bars.last_timestamp
+
+    def read(self, symbol, timeframe, limit=None):
+        """Bars for (symbol, timeframe) including the forming one, as Candles; None if not seeded. No network."""
+        key = (symbol, timeframe)
+        tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        with self._lock:
+            bars = self._bars.get(key)
+            if bars is None:
+                return None
+            out = bars.to_array()
+            rows = self.candle_store.rows(symbol, self.base)
+            if rows is not None and len(rows):
+                pending = rows[rows[:, 0] > self._folded[key]]
+                if len(pending):
+                    overlay = CandleBuffer(len(out) + len(pending))
+                    overlay.reset(out)
+                    self._merge(overlay, resample(pending, tf_ms))
+                    out = overlay.to_array()
+        limit = limit or self.capacity
+        return Candles.from_rows(out[-limit:])
+
+    def print_stats(self):
+        s = self.stats
+        print(f"[RESAMPLE] series: {len(self._bars)} | seeds: {s['seeds']} | reseeds: {s['reseeds']} | "
+              f"folded 1m candles: {s['folded']} | 1m refreshes: {s['refreshes']}")
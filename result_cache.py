@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from candles import Candles, COLUMNS
+
+
+def params_key(params, strategies=()):
+    """Hashable fingerprint of AdaptiveParameters.get_parameters() plus the enabled strategies."""
+    return hash((tuple(sorted((params or {}).items())), tuple(strategies)))
+
+
+class EvaluationCache:
+    """
+    LRU cache of evaluate_coin results keyed by
+    (symbol, last closed candle timestamp, still-forming candle, parameter hash).
+    A coin is only re-evaluated when a candle closed, the forming candle traded, or the adaptive
+    parameters changed; otherwise the previous result (including None) is reused.
+    """
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def key(symbol, candles, params_hash):
+        """Cache key for a candle source (Candles or DataFrame); None if it is too short to key."""
+        if candles is None or len(candles) < 2:
+            return None
+        if isinstance(candles, Candles):
+            closed = candles.values[0, -2]
+            forming = tuple(candles.values[:, -1])
+        else:
+            closed = candles['timestamp'].iloc[-2]
+            forming = tuple(candles[col].iloc[-1] for col in COLUMNS)
+        return symbol, closed, forming, params_hash
+
+    @staticmethod
+    def state_key(symbol, state, params_hash):
+        """Cache key for an IndicatorState, which only ever holds closed candles."""
+        if state is None or state.last_timestamp is None:
+            return None
+        return symbol, state.last_timestamp, None, params_hash
+
+    def get(self, key):
+        """Return (hit, result). A cached None result is a hit."""
+        with self._lock:
+            if key is not None and key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                result = self._entries[key]
+                return True, dict(result) if result else result
+            self.stats['misses'] += 1
+            return False, None
+
+    def put(self, key, result):
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = dict(result) if result else result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def print_stats(self):
+        """Print and reset the per-cycle counters."""
+        s = self.stats
+        total = s['hits'] + s['misses']
+        rate = s['hits'] / total * 100 if total else 0
+        print(f"[EVAL CACHE] hits: {s['hits']} | misses: {s['misses']} ({rate:.0f}% hit) | "
+              f"evictions: {s['evictions']} | entries: {len(self._entries)}")
+        self.reset_stats()
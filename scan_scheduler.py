@@ -0,0 +1,125 @@
+import math
+import numpy as np
+
+
+class ScanScheduler:
+    """
+    Tiered scan scheduler. Symbols are ranked by cheap activity signals (recent volume ratio,
+    short-term volatility and how close the momentum score is to its threshold) and split into
+    hot, warm and cold tiers. Hot symbols are scanned every cycle, warm every `warm_every`
+    cycles and cold every `cold_every` cycles. Symbols that just signalled, or whose streamed
+    price jumps, are promoted straight to hot.
+    """
+
+    def __init__(self, hot_size=40, warm_size=80, warm_every=3, cold_every=10,
+                 signal_hold=5, move_pct=1.5):
+        self.hot_size = hot_size
+        self.warm_size = warm_size
+        self.warm_every = max(1, warm_every)
+        self.cold_every = max(1, cold_every)
+        self.signal_hold = signal_hold
+        self.move_pct = move_pct
+        self.cycle = 0
+        self._scores = {}
+        self._last_scanned = {}
+        self._last_close = {}
+        self._hot_until = {}
+        self._tiers = {}
+
+    def tier(self, symbol):
+        return self._tiers.get(symbol, 'new')
+
+    def _interval(self, symbol):
+        tier = self.tier(symbol)
+        if tier == 'warm':
+            return self.warm_every
+        if tier == 'cold':
+            return self.cold_every
+        return 1
+
+    def due(self, symbols):
+        """Return the symbols to scan this cycle, hottest first."""
+        selected = []
+        for symbol in symbols:
+            last = self._last_scanned.get(symbol)
+            if last is None or self.cycle - last >= self._interval(symbol):
+                selected.append(symbol)
+        selected.sort(key=lambda s: -self._scores.get(s, math.inf))
+        return selected
+
+    def observe(self, symbol, df, params=None, result=None):
+        """Record a completed scan of `symbol` and update its activity score."""
+        self._last_scanned[symbol] = self.cycle
+        if result:
+            self._hot_until[symbol] = self.cycle + self.signal_hold
+        if df is None:
+            # Candles unchanged since the last scan (cached evaluation): the previous score still holds
+            return
+        try:
+            closes = df['close'].to_numpy(dtype=float)
+            volumes = df['volume'].to_numpy(dtype=float)
+            self._last_close[symbol] = closes[-1]
+            self._scores[symbol] = self.score(closes, volumes, df, params)
+        except Exception as e:
+            print(f"[ERROR] Scheduler score for {symbol}: {e}")
+
+    @staticmethod
+    def score(closes, volumes, df=None, params=None):
+        """Cheap activity score: volume ratio + volatility + momentum-threshold proximity."""
+        params = params or {}
+        avg_volume = np.mean(volumes[-21:-1]) if len(volumes) > 1 else 0
+        vol_ratio = volumes[-1] / avg_volume if avg_volume > 0 else 0
+        volume_part = min(vol_ratio / params.get('volume_multiplier', 3.0), 1.5)
+        tail = closes[-21:]
+        returns = np.diff(tail) / np.where(tail[:-1] == 0, 1, tail[:-1])
+        volatility = float(np.std(returns) * 100) if len(returns) else 0.0
+        volatility_part = min(volatility / 0.5, 1.5)
+        proximity_part = 0.0
+        # Only read a momentum score the evaluation already computed; never trigger the work here.
+        is_computed = getattr(df, 'is_computed', None)
+        if df is not None and 'momentum_score' in df and (is_computed is None or is_computed('momentum_score')):
+            momentum = df['momentum_score'].iloc[-1]
+            threshold = params.get('momentum_score_threshold', 3.0)
+            if threshold > 0 and not np.isnan(momentum):
+                proximity_part = min(max(momentum / threshold, 0.0), 1.5)
+        return volume_part + volatility_part + proximity_part
+
+    def check_price_moves(self, prices):
+        """Promote symbols whose live price moved more than `move_pct` since they were last scanned."""
+        promoted = 0
+        for symbol, price in prices.items():
+            last = self._last_close.get(symbol)
+            if not last or price is None or self.tier(symbol) == 'hot':
+                continue
+            if abs(price / last - 1) * 100 >= self.move_pct:
+                self._hot_until[symbol] = self.cycle + 1
+                self._tiers[symbol] = 'hot'
+                promoted += 1
+        return promoted
+
+    def finish_cycle(self):
+        """Re-rank scored symbols into tiers and advance the cycle counter."""
+        ranked = sorted(self._scores, key=lambda s: -self._scores[s])
+        tiers = {}
+        for i, symbol in enumerate(ranked):
+            if i < self.hot_size or self._hot_until.get(symbol, -1) >= self.cycle:
+                tiers[symbol] = 'hot'
+            elif i < self.hot_size + self.warm_size:
+                tiers[symbol] = 'warm'
+            else:
+                tiers[symbol] = 'cold'
+            if tiers[symbol] != self._tiers.get(symbol) and tiers[symbol] != 'hot':
+                # Stagger newly demoted symbols so their rescans spread across cycles instead of bunching up.
+                interval = self.warm_every if tiers[symbol] == 'warm' else self.cold_every
+                if symbol in self._last_scanned:
+                    self._last_scanned[symbol] -= i % interval
+        self._tiers = tiers
+        self.cycle += 1
+
+    def print_stats(self, scanned):
+        counts = {'hot': 0, 'warm': 0, 'cold': 0}
+        for tier in self._tiers.values():
+            counts[tier] += 1
+        print(f"[SCHEDULER] cycle {self.cycle} | scanned {scanned} | "
+              f"hot: {counts['hot']} | warm: {counts['warm']} (every {self.warm_every}) | "
+              f"cold: {counts['cold']} (every {self.cold_every})")
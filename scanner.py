@@ -0,0 +1,117 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils import fetch_ohlc_data
+
+
+class RateLimiter:
+    """Serialize request starts across threads so they stay `interval` seconds apart."""
+
+    def __init__(self, interval):
+        self.interval = max(0.0, interval)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the caller may issue its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def exchange_rate_limiter(exchange, rate_limit_ms=None):
+    """Build a RateLimiter honouring the exchange's enableRateLimit/rateLimit settings."""
+    if rate_limit_ms is None:
+        if not getattr(exchange, 'enableRateLimit', False):
+            return RateLimiter(0)
+        rate_limit_ms = getattr(exchange, 'rateLimit', 0) or 0
+    return RateLimiter(rate_limit_ms / 1000.0)
+
+
+def rest_fetch(exchange, symbol, timeframe='1m', limit=144, pace=None):
+    """fetch_ohlc_data for the scanner: every call is a REST request, so it is always paced."""
+    if pace is not None:
+        pace()
+    return fetch_ohlc_data(exchange, symbol, timeframe=timeframe, limit=limit)
+
+
+class OHLCVScanner:
+    """
+    Fetch OHLCV frames for many symbols on a bounded thread pool.
+    Frames are yielded as soon as each fetch finishes, so evaluation overlaps the
+    remaining downloads instead of waiting for the whole batch.
+    `fetch` is called with a `pace` callback that it must call before each REST request; candles
+    served from memory skip it, so only real requests are spaced by `rate_limiter` and count
+    against the per-symbol timeout.
+    """
+
+    def __init__(self, exchange, max_workers=8, timeout=15.0, fetch=None,
+                 timeframe='1m', limit=144, rate_limiter=None):
+        self.exchange = exchange
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.fetch = fetch or rest_fetch
+        self.timeframe = timeframe
+        self.limit = limit
+        self.rate_limiter = rate_limiter or exchange_rate_limiter(exchange)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ohlcv')
+        self.last_stats = {}
+
+    def _fetch(self, symbol, started):
+        def pace():
+            self.rate_limiter.wait()
+            started[symbol] = time.monotonic()
+        return self.fetch(self.exchange, symbol, timeframe=self.timeframe, limit=self.limit, pace=pace)
+
+    def scan(self, symbols):
+        """Yield (symbol, frame) pairs in completion order; failed or timed out symbols are skipped."""
+        scan_start = time.monotonic()
+        started = {}
+        pending = {self._executor.submit(self._fetch, s, started): s for s in symbols}
+        stats = {'submitted': len(pending), 'completed': 0, 'empty': 0, 'failed': 0, 'timed_out': 0}
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol = pending.pop(future)
+                    try:
+                        frame = future.result()
+                    except Exception as e:
+                        print(f"[ERROR] {symbol}: {e}")
+                        stats['failed'] += 1
+                        continue
+                    if frame is None or len(frame) == 0:
+                        stats['empty'] += 1
+                        continue
+                    stats['completed'] += 1
+                    yield symbol, frame
+                if self.timeout:
+                    now = time.monotonic()
+                    for future, symbol in list(pending.items()):
+                        t0 = started.get(symbol)
+                        if t0 is not None and now - t0 > self.timeout and not future.done():
+                            # The request thread cannot be interrupted; drop its result instead.
+                            future.cancel()
+                            del pending[future]
+                            stats['timed_out'] += 1
+                            print(f"[WARNING] {symbol}: OHLCV fetch exceeded {self.timeout:.0f}s, skipping this cycle")
+        finally:
+            for future in pending:
+                future.cancel()
+            stats['duration'] = time.monotonic() - scan_start
+            self.last_stats = stats
+
+    def print_stats(self):
+        """Print a one-line summary of the last scan."""
+        s = self.last_stats
+        if not s:
+            return
+        print(f"[SCAN] {s['completed']}/{s['submitted']} frames in {s['duration']:.1f}s "
+              f"({self.max_workers} workers) | empty: {s['empty']} | failed: {s['failed']} | timed out: {s['timed_out']}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
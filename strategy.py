@@ -1,8 +1,67 @@
 import datetime
+import threading
+import time
 import numpy as np
 import pandas as pd
+from indicators import IndicatorFrame, calculate_rsi
 
-def evaluate_coin(df, coin, params=None):
+# Indicator nodes each strategy reads; only these (and their dependencies) are computed for it
+STRATEGY_INPUTS = {
+    'MOMENTUM': ('momentum_score', 'post_golden_cross', 'golden_cross', 'macd', 'macd_signal',
+                 'sma_10', 'sma_20', 'volume_trend', 'roc_5'),
+    'VOLUME_SPIKE': ('open', 'close', 'volume'),
+    'BREAKOUT': ('high', 'close', 'volume'),
+    'MEAN_REVERSION': ('sma_20', 'std_20', 'close', 'volume'),
+}
+ALL_STRATEGIES = tuple(STRATEGY_INPUTS)
+
+# Closes needed for the RSI of the last candle: 14 deltas plus the leading one calculate_rsi zeroes
+RSI_TAIL = 16
+# Candles the pump filter looks back over; sources can hold longer history for the golden cross
+RANGE_WINDOW = 144
+
+
+class CascadeStats:
+    """
+    Pass/fail counts and time spent per stage of the evaluation cascade, so it is visible
+    where coins drop out and what each stage costs per cycle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.stages = {}
+
+    def record(self, stage, passed, started):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            counts = self.stages.setdefault(stage, [0, 0, 0.0])
+            counts[0 if passed else 1] += 1
+            counts[2] += elapsed
+
+    def merge(self, stages):
+        """Add counters collected elsewhere (e.g. in an evaluation worker process)."""
+        with self._lock:
+            for stage, (passed, failed, elapsed) in stages.items():
+                counts = self.stages.setdefault(stage, [0, 0, 0.0])
+                counts[0] += passed
+                counts[1] += failed
+                counts[2] += elapsed
+
+    def print_stats(self):
+        """Print and reset the counters for this cycle."""
+        if not self.stages:
+            return
+        parts = [f"{stage}: {p}/{p + f} passed ({t * 1000:.0f}ms)" for stage, (p, f, t) in self.stages.items()]
+        print(f"[CASCADE] {' | '.join(parts)}")
+        self.reset()
+
+
+cascade_stats = CascadeStats()
+
+def evaluate_coin(df, coin, params=None, strategies=ALL_STRATEGIES):
     """
     Coin evaluation function that can identify multiple strategies:
     1. Coins in early uptrends with momentum (potential explosion) - NOW WITH GOLDEN CROSS
@@ -10,212 +69,272 @@ def evaluate_coin(df, coin, params=None):
     3. Breakout patterns
     4. Mean reversion opportunities
     (Dip buying strategy is REMOVED)
+    `df` may be a candle DataFrame or an IndicatorFrame; indicators are computed lazily, once,
+    and only for the enabled `strategies`.
     """
     # Check if df is None or has less than 50 rows
     if df is None or len(df) < 50:
         return None
 
     try:
-        # Convert columns to float
-        df['close'] = df['close'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+        frame = df if isinstance(df, IndicatorFrame) else IndicatorFrame(df)
 
-        current_price = df['close'].iloc[-1]
-        previous_price = df['close'].iloc[-16]  # Roughly 2 hours back on 5-minute candles
-        price_change = (current_price - previous_price) / previous_price * 100
-
-        # Get 3-day high to check for recent pumps
-        three_day_high = df['high'].max()
-        three_day_low = df['low'].min()
-        three_day_range = (three_day_high - three_day_low) / three_day_low * 100
-        
-        # Skip if coin has pumped more than 40% in last 3 days
-        if three_day_range > 40:
+        # Cheap rejections first; the indicator graph is only built for the strategies that survive
+        screened = _cascade(frame, params, strategies)
+        if screened is None:
             return None
+        current_rsi, strategies = screened
+        return _select_strategy(frame, coin, current_rsi, params, strategies, stats=cascade_stats)
 
-        # Calculate RSI for oversold/overbought detection
-        rsi_values = calculate_rsi(df['close'], 14)
-        current_rsi = rsi_values.iloc[-1]
-        
-        # Get adaptive parameters if provided
-        if params:
-            rsi_threshold = params.get('rsi_threshold', 40)
-            price_drop_threshold = params.get('price_drop_threshold', 2.0)
-            bb_distance = params.get('bb_distance', 2.0)
-            momentum_score_threshold = params.get('momentum_score_threshold', 3.0)
-            volume_multiplier = params.get('volume_multiplier', 3.0)
-        else:
-            rsi_threshold = 40
-            price_drop_threshold = 2.0
-            bb_distance = 2.0
-            momentum_score_threshold = 3.0
-            volume_multiplier = 3.0
-        
-        # If RSI is extremely high (over 75), skip - likely overbought and will retrace
-        if current_rsi > 75:
+    except Exception as e:
+        print(f"[ERROR] Processing {coin}: {e}")
+        return None
+
+def evaluate_panel(panel, params=None, strategies=ALL_STRATEGIES):
+    """
+    Evaluate every coin on an IndicatorPanel, whose indicators were computed for all coins
+    in one vectorized pass. Each coin's strategy checks read its panel view.
+    Returns {coin: result or None}.
+    """
+    results = {}
+    for coin in panel.symbols:
+        view = panel.view(coin)
+        if len(view) < 50:
+            results[coin] = None
+            continue
+        try:
+            screened = _cascade(view, params, strategies, current_rsi=view['rsi'].iloc[-1])
+            if screened is None:
+                results[coin] = None
+                continue
+            current_rsi, live = screened
+            results[coin] = _select_strategy(view, coin, current_rsi, params, live, stats=cascade_stats)
+        except Exception as e:
+            print(f"[ERROR] Processing {coin}: {e}")
+            results[coin] = None
+    return results
+
+def evaluate_state(state, coin, params=None, strategies=ALL_STRATEGIES):
+    """
+    Evaluate a coin from its incrementally maintained IndicatorState (closed candles only).
+    The strategy checks read the state's recent rows, so the cost does not grow with the window.
+    """
+    if state is None or len(state) < 50:
+        return None
+    try:
+        view = state.view()
+        screened = _cascade(view, params, strategies, current_rsi=view['rsi'].iloc[-1],
+                            range_pct=state.range_pct())
+        if screened is None:
             return None
+        current_rsi, strategies = screened
+        return _select_strategy(view, coin, current_rsi, params, strategies, stats=cascade_stats)
+    except Exception as e:
+        print(f"[ERROR] Processing {coin}: {e}")
+        return None
+
+def _three_day_range(df):
+    """High/low range of the last RANGE_WINDOW candles in percent (used to skip coins that already pumped)."""
+    three_day_high = df['high'].iloc[-RANGE_WINDOW:].max()
+    three_day_low = df['low'].iloc[-RANGE_WINDOW:].min()
+    return (three_day_high - three_day_low) / three_day_low * 100
+
+def _strategy_params(params):
+    if params:
+        return params.get('momentum_score_threshold', 3.0), params.get('volume_multiplier', 3.0)
+    return 3.0, 3.0
+
+def _cascade(df, params=None, strategies=ALL_STRATEGIES, current_rsi=None, range_pct=None, stats=None):
+    """
+    Cost-ordered rejection stages run before any indicator work:
+      1. range  - skip coins that already pumped (max/min over the window)
+      2. rsi    - overbought filter; RSI of the last candle from its RSI_TAIL closes
+      3. gates  - per-strategy necessary conditions on the last candles (volume ratio, price
+                  position); a strategy whose gate fails could not signal, so it is dropped
+    Sources that already hold the RSI or range (panel, state) pass them in.
+    Returns (current_rsi, surviving strategies) or None if the coin is rejected.
+    """
+    stats = stats or cascade_stats
+
+    started = time.perf_counter()
+    if range_pct is None:
+        range_pct = _three_day_range(df)
+    passed = not range_pct > 40
+    stats.record('range', passed, started)
+    if not passed:
+        return None
+
+    started = time.perf_counter()
+    if current_rsi is None:
+        current_rsi = _tail_rsi(df['close'])
+    passed = not current_rsi > 75
+    stats.record('rsi', passed, started)
+    if not passed:
+        return None
+
+    started = time.perf_counter()
+    momentum_score_threshold, volume_multiplier = _strategy_params(params)
+    gates = {
+        'MOMENTUM': lambda: _momentum_gate(df, momentum_score_threshold),
+        'VOLUME_SPIKE': lambda: _volume_spike_gate(df, volume_multiplier),
+        'BREAKOUT': lambda: _breakout_gate(df),
+        'MEAN_REVERSION': lambda: _mean_reversion_gate(df),
+    }
+    live = [s for s in strategies if s not in gates or gates[s]()]
+    stats.record('gates', bool(live), started)
+    if not live:
+        return None
+    return current_rsi, live
+
+def _tail_rsi(close, period=14):
+    """calculate_rsi(close).iloc[-1] from the last period + 1 closes only."""
+    tail = close.iloc[-(period + 1):].to_numpy(dtype=float)
+    if len(tail) <= period or np.isnan(tail).any():
+        return calculate_rsi(close.iloc[-RSI_TAIL:], period).iloc[-1]
+    delta = np.diff(tail)
+    avg_gain = delta[delta > 0].sum() / period
+    avg_loss = -delta[delta < 0].sum() / period
+    if avg_loss == 0:
+        avg_loss = 0.00001
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+# Gates are necessary (never sufficient) conditions of the strategy checks below, read from the
+# last few raw candles only. They must stay in step with the checks: a gate may let a coin through
+# that its check rejects, never the other way round.
+
+def _momentum_gate(df, threshold):
+    """Upper bound of check_momentum_signal from ROC and volume trend (MACD/SMA terms at their maximum)."""
+    close = df['close']
+    volume = df['volume']
+    roc = (close.iloc[-1] / close.iloc[-6] - 1) * 100
+    volume_trend = volume.iloc[-1] / volume.iloc[-5:].mean()
+    if np.isnan(roc) or np.isnan(volume_trend):
+        return True
+    if not hasattr(df, 'require'):
+        # Precomputed source (panel, state): the score is already there, and its golden cross
+        # terms may cover more history than the rows it exposes
+        if df['momentum_score'].iloc[-1] > threshold:
+            return True
+        return volume_trend > 1.2 or roc > 2.0
+    deep = len(df) > 201
+    # golden cross (6.0) + freshest golden cross factor (5.0) + post golden cross (1.5), else the 0.2 floor
+    golden_terms = 12.5 if deep else 0.2
+    best_score = 2.0 + 1.5 + 2.0 + roc * 0.3 + volume_trend + golden_terms
+    if best_score > threshold:
+        return True
+    if deep:
+        return volume_trend > 1.2 or roc > 2.0
+    return volume_trend > 1.2 and roc > 2.0
+
+def _volume_spike_gate(df, multiplier, lookback=20):
+    """Last-candle volume ratio and price confirmation of check_volume_spike."""
+    volume = df['volume']
+    avg_volume = volume.iloc[-lookback:-1].mean()
+    volume_ratio = volume.iloc[-1] / avg_volume if avg_volume > 0 else 0
+    return volume_ratio >= multiplier and df['close'].iloc[-1] > df['open'].iloc[-1]
+
+def _breakout_gate(df, lookback_periods=48, confirmation_periods=3, volume_req=1.5):
+    """Last-candle volume ratio and close above resistance of check_breakout."""
+    volume = df['volume']
+    avg_volume = volume.iloc[-10:].mean()
+    volume_increase = volume.iloc[-1] / avg_volume if avg_volume > 0 else 0
+    if not volume_increase >= volume_req:
+        return False
+    return df['close'].iloc[-1] > df['high'].iloc[-lookback_periods:-confirmation_periods].max()
+
+def _mean_reversion_gate(df, ma_periods=20):
+    """check_mean_reversion needs a rising last close below its moving average."""
+    close = df['close']
+    if not close.iloc[-1] > close.iloc[-2]:
+        return False
+    return close.iloc[-1] <= close.iloc[-ma_periods:].mean() * (1 + 1e-9)
+
+def _select_strategy(df, coin, current_rsi, params=None, strategies=ALL_STRATEGIES, stats=None):
+    """Run the enabled strategy checks on an indicator source and build the result for the best one."""
+    started = time.perf_counter()
+    current_price = df['close'].iloc[-1]
+    previous_price = df['close'].iloc[-16]  # Roughly 2 hours back on 5-minute candles
+    price_change = (current_price - previous_price) / previous_price * 100
+
+    # Get adaptive parameters if provided
+    momentum_score_threshold, volume_multiplier = _strategy_params(params)
+
+    # ===== STRATEGY CHECKS =====
+    all_results = []
+    for strategy in strategies:
+        if hasattr(df, 'require'):
+            df.require(STRATEGY_INPUTS[strategy])
 
-        # Calculate momentum indicators (now with Golden Cross)
-        df = add_momentum_indicators(df)
-        
-        # ===== STRATEGY CHECKS =====
-        
         # Strategy 1: MOMENTUM BUYING (Enhanced with Golden Cross)
-        momentum_result = None
-        if check_momentum_signal(df, threshold=momentum_score_threshold):
-            momentum_result = {
-                'strategy': 'MOMENTUM',
-                'momentum_score': df['momentum_score'].iloc[-1],
-                'rank_factor': df['momentum_score'].iloc[-1],
-                'golden_cross_active': df['post_golden_cross'].iloc[-1] > 0
-            }
-        
+        if strategy == 'MOMENTUM':
+            if check_momentum_signal(df, threshold=momentum_score_threshold):
+                all_results.append({
+                    'strategy': 'MOMENTUM',
+                    'momentum_score': df['momentum_score'].iloc[-1],
+                    'rank_factor': df['momentum_score'].iloc[-1],
+                    'golden_cross_active': df['post_golden_cross'].iloc[-1] > 0
+                })
+
         # Strategy 2: VOLUME SPIKE
-        volume_result = check_volume_spike(df, multiplier=volume_multiplier)
-        
+        elif strategy == 'VOLUME_SPIKE':
+            all_results.append(check_volume_spike(df, multiplier=volume_multiplier))
+
         # Strategy 3: BREAKOUT
-        breakout_result = check_breakout(df)
-        
+        elif strategy == 'BREAKOUT':
+            all_results.append(check_breakout(df))
+
         # Strategy 4: MEAN REVERSION
-        mean_reversion_result = check_mean_reversion(df)
-        
-        # Combine all strategy results (DIP strategy REMOVED)
-        all_results = [momentum_result, volume_result, breakout_result, mean_reversion_result]
-        valid_results = [r for r in all_results if r is not None]
-        
-        if not valid_results:
-            return None
-            
-        # Sort by rank factor and pick the highest one
-        best_result = sorted(valid_results, key=lambda x: x['rank_factor'], reverse=True)[0]
-        
-        # Calculate volume metrics (common for all strategies)
-        avg_volume = df['volume'].rolling(20).mean().iloc[-1]
-        current_volume = df['volume'].iloc[-1]
-        vol_ratio = current_volume / avg_volume if avg_volume > 0 else 0
-        
-        # Create final result with common fields
-        result = {
-            'symbol': coin,
-            'rsi': round(current_rsi, 2),
-            'drop': round(price_change, 2),
-            'volume_ratio': round(vol_ratio, 2),
-            'vol': current_volume,
-            'price': current_price,
-            'timestamp': datetime.datetime.now(datetime.timezone.utc),
-            'strategy': best_result['strategy'],
-            'rank_factor': best_result['rank_factor']
-        }
-        
-        # Add strategy-specific fields
-        result.update({k: v for k, v in best_result.items() if k not in result})
-        
-        return result
-        
-    except Exception as e:
-        print(f"[ERROR] Processing {coin}: {e}")
+        elif strategy == 'MEAN_REVERSION':
+            all_results.append(check_mean_reversion(df))
+
+    # Combine all strategy results (DIP strategy REMOVED)
+    valid_results = [r for r in all_results if r is not None]
+    if stats is not None:
+        stats.record('signal', bool(valid_results), started)
+
+    if not valid_results:
         return None
 
+    # Sort by rank factor and pick the highest one
+    best_result = sorted(valid_results, key=lambda x: x['rank_factor'], reverse=True)[0]
+
+    # Calculate volume metrics (common for all strategies)
+    avg_volume = df['volume'].rolling(20).mean().iloc[-1]
+    current_volume = df['volume'].iloc[-1]
+    vol_ratio = current_volume / avg_volume if avg_volume > 0 else 0
+
+    # Create final result with common fields
+    result = {
+        'symbol': coin,
+        'rsi': round(current_rsi, 2),
+        'drop': round(price_change, 2),
+        'volume_ratio': round(vol_ratio, 2),
+        'vol': current_volume,
+        'price': current_price,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc),
+        'strategy': best_result['strategy'],
+        'rank_factor': best_result['rank_factor']
+    }
+
+    # Add strategy-specific fields
+    result.update({k: v for k, v in best_result.items() if k not in result})
+
+    return result
+
 # === Helper Functions (unchanged except DIP REMOVED) ===
 
-def calculate_rsi(series, period=14):
-    """Calculate the Relative Strength Index"""
-    try:
-        series = series.ffill()  
-        delta = series.diff()
-        delta = delta.fillna(0)
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        avg_loss = avg_loss.replace(0, 0.00001)
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        rsi = rsi.fillna(50)
-        return rsi
-    except Exception as e:
-        print(f"[ERROR] RSI calculation: {e}")
-        return pd.Series([100] * len(series))
+MOMENTUM_COLUMNS = (
+    'macd', 'macd_signal', 'macd_hist', 'roc_5', 'sma_10', 'sma_20', 'sma_50', 'sma_200',
+    'golden_cross', 'death_cross', 'post_golden_cross', 'golden_cross_age', 'upper_band', 'lower_band',
+    'bb_position', 'volume_trend', 'macd_crossover', 'macd_hist_growing', 'sma_crossover',
+    'golden_cross_factor', 'momentum_score'
+)
 
 def add_momentum_indicators(df):
-    """Add momentum indicators to the dataframe, with Golden Cross"""
-    ema_12 = df['close'].ewm(span=12, adjust=False).mean()
-    ema_26 = df['close'].ewm(span=26, adjust=False).mean()
-    df['macd'] = ema_12 - ema_26
-    df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-    df['macd_hist'] = df['macd'] - df['macd_signal']
-    df['roc_5'] = df['close'].pct_change(periods=5) * 100
-    df['sma_10'] = df['close'].rolling(window=10).mean()
-    df['sma_20'] = df['close'].rolling(window=20).mean()
-    df['sma_50'] = df['close'].rolling(window=50).mean()
-    df['sma_200'] = df['close'].rolling(window=200).mean()
-    df['golden_cross'] = 0.0
-    df['death_cross'] = 0.0
-    if len(df) > 201:
-        for i in range(-20, 0):
-            if i+1 < 0:
-                if (df['sma_50'].iloc[i-1] <= df['sma_200'].iloc[i-1] and 
-                    df['sma_50'].iloc[i] > df['sma_200'].iloc[i]):
-                    df.loc[df.index[i], 'golden_cross'] = 1.0
-                elif (df['sma_50'].iloc[i-1] >= df['sma_200'].iloc[i-1] and 
-                      df['sma_50'].iloc[i] < df['sma_200'].iloc[i]):
-                    df.loc[df.index[i], 'death_cross'] = 1.0
-        df['post_golden_cross'] = (df['sma_50'] > df['sma_200']).astype(float)
-        df['golden_cross_age'] = 0
-        last_golden_cross_idx = None
-        for i in range(len(df)-1, max(0, len(df)-100), -1):
-            if df['golden_cross'].iloc[i] == 1.0:
-                last_golden_cross_idx = i
-                break
-        if last_golden_cross_idx is not None:
-            for i in range(last_golden_cross_idx, len(df)):
-                df.loc[df.index[i], 'golden_cross_age'] = i - last_golden_cross_idx
-    else:
-        df['post_golden_cross'] = 0
-        df['golden_cross_age'] = 99
-    window = 20
-    sma = df['close'].rolling(window=window).mean()
-    std = df['close'].rolling(window=window).std()
-    df['upper_band'] = sma + 2 * std
-    df['lower_band'] = sma - 2 * std
-    df['bb_position'] = (df['close'] - df['lower_band']) / (df['upper_band'] - df['lower_band'])
-    df['volume_trend'] = df['volume'] / df['volume'].rolling(window=5).mean()
-    if len(df) > 2:
-        df['macd_crossover'] = ((df['macd'].shift(1) <= df['macd_signal'].shift(1)) & 
-                              (df['macd'] > df['macd_signal'])).astype(float)
-        df['macd_hist_growing'] = ((df['macd_hist'] > 0) & 
-                                (df['macd_hist'] > df['macd_hist'].shift(1))).astype(float)
-        df['sma_crossover'] = ((df['sma_10'].shift(1) <= df['sma_20'].shift(1)) & 
-                            (df['sma_10'] > df['sma_20'])).astype(float)
-        df['golden_cross_factor'] = np.where(
-            df['golden_cross_age'] <= 0, 0,
-            np.where(
-                df['golden_cross_age'] <= 5, 5.0,
-                np.where(
-                    df['golden_cross_age'] <= 15, 3.0,
-                    np.where(
-                        df['golden_cross_age'] <= 30, 1.5,
-                        np.where(
-                            df['golden_cross_age'] <= 50, 0.5,
-                            0.2
-                        )
-                    )
-                )
-            )
-        )
-        df['momentum_score'] = (
-            df['macd_crossover'] * 2.0 +
-            df['macd_hist_growing'] * 1.5 +
-            df['sma_crossover'] * 2.0 +
-            df['roc_5'] * 0.3 +
-            df['volume_trend'] * 1.0 +
-            df['golden_cross'] * 6.0 +
-            df['golden_cross_factor'] +
-            df['post_golden_cross'] * 1.5
-        )
-        df['momentum_score'] = df['momentum_score'] - (df['death_cross'] * 4.0)
-    else:
-        df['momentum_score'] = 0.0
+    """Add momentum indicators to the dataframe, with Golden Cross (computed through the indicator graph)"""
+    frame = IndicatorFrame(df)
+    for name in MOMENTUM_COLUMNS:
+        df[name] = frame[name]
     return df
 
 def check_momentum_signal(df, threshold=3.0):
@@ -236,11 +355,11 @@ def check_momentum_signal(df, threshold=3.0):
                 fresh_golden_cross = True
                 golden_cross_age = 0
             else:
-                for i in range(-20, 0):
-                    if df['golden_cross'].iloc[i] == 1.0:
-                        fresh_golden_cross = True
-                        golden_cross_age = abs(i)
-                        break
+                # Oldest golden cross among the last 20 candles
+                hits = np.flatnonzero(df['golden_cross'].to_numpy()[-20:] == 1.0)
+                if hits.size:
+                    fresh_golden_cross = True
+                    golden_cross_age = 20 - hits[0]
             post_golden_cross = df['post_golden_cross'].iloc[latest_idx] == 1.0
         else:
             post_golden_cross = False
@@ -312,8 +431,13 @@ def check_breakout(df, lookback_periods=48, confirmation_periods=3, volume_req=1
 def check_mean_reversion(df, ma_periods=20, deviation_threshold=2.5, trend_filter=True):
     """Detect mean reversion opportunities when price deviates from moving average"""
     try:
-        ma = df['close'].rolling(ma_periods).mean()
-        std = df['close'].rolling(ma_periods).std()
+        # Reuse the shared SMA/std nodes (also behind the Bollinger bands) when the source has them
+        if f'sma_{ma_periods}' in df and f'std_{ma_periods}' in df:
+            ma = df[f'sma_{ma_periods}']
+            std = df[f'std_{ma_periods}']
+        else:
+            ma = df['close'].rolling(ma_periods).mean()
+            std = df['close'].rolling(ma_periods).std()
         current_price = df['close'].iloc[-1]
         current_ma = ma.iloc[-1]
         current_std = std.iloc[-1]
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+
+SEQ_KEY = '_journal_seq'
+
+
+def default_history():
+    return {'trades': [], 'last_24h_losses': 0, 'cooldown_until': None}
+
+
+class TradeJournal:
+    """
+    Trading history persisted as a JSON snapshot (the original trading_history.json layout)
+    plus an append-only JSON Lines journal of what changed since:
+        {"seq": n, "trade": {...}}             a trade appended to history['trades']
+        {"seq": n, "set": key, "value": v}     any other top-level field changed
+    save() only appends the difference to the last save, so its cost does not grow with the
+    number of trades. Lines are flushed on every save and fsynced at most every
+    `fsync_interval` seconds, or right away when they record a trade. After `compact_every`
+    records the journal is folded into a new snapshot (written atomically) and truncated.
+    The snapshot stores the last sequence number it includes, so a crash between writing it
+    and truncating the journal does not replay records twice; a torn last line is dropped.
+    """
+
+    def __init__(self, path='trading_history.json', journal_path=None, fsync_interval=5.0, compact_every=1000):
+        self.path = path
+        self.journal_path = journal_path or os.path.splitext(path)[0] + '.journal'
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+        self._records = 0
+        self._trades = 0
+        self._fields = {}
+        self._last_fsync = 0.0
+
+    def load(self):
+        """Read the snapshot and replay the journal on top of it. Returns the history dict."""
+        with self._lock:
+            try:
+                with open(self.path, 'r') as f:
+                    history = json.load(f)
+            except FileNotFoundError:
+                history = default_history()
+            seq = history.pop(SEQ_KEY, 0)
+            self._seq = seq
+            self._records = 0
+            if os.path.exists(self.journal_path):
+                self._replay(history, seq)
+            history.setdefault('trades', [])
+            self._remember(history)
+            return history
+
+    def _replay(self, history, snapshot_seq):
+        good = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn write from a crash: everything after it is unusable
+                    print(f"[WARNING] Trade journal damaged after {self._records} records, truncating")
+                    break
+                good += len(line)
+                self._records += 1
+                self._seq = max(self._seq, record['seq'])
+                if record['seq'] <= snapshot_seq:
+                    continue
+                if 'trade' in record:
+                    history.setdefault('trades', []).append(record['trade'])
+                else:
+                    history[record['set']] = record['value']
+        if good != os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, good)
+
+    def _remember(self, history):
+        self._trades = len(history['trades'])
+        self._fields = {key: json.dumps(value, default=str) for key, value in history.items() if key != 'trades'}
+
+    def save(self, history):
+        """Append what changed since the last save (new trades, changed fields) to the journal."""
+        with self._lock:
+            trades = history.get('trades', [])
+            if len(trades) < self._trades:
+                # Trades were removed: the journal cannot express that, write a fresh snapshot
+                self._snapshot(history)
+                return
+            lines = []
+            for trade in trades[self._trades:]:
+                self._seq += 1
+                lines.append(json.dumps({'seq': self._seq, 'trade': trade}, default=str))
+            has_trades = bool(lines)
+            fields = {}
+            for key, value in history.items():
+                if key == 'trades':
+                    continue
+                encoded = json.dumps(value, default=str)
+                fields[key] = encoded
+                if self._fields.get(key) != encoded:
+                    self._seq += 1
+                    lines.append(f'{{"seq": {self._seq}, "set": {json.dumps(key)}, "value": {encoded}}}')
+            self._trades = len(trades)
+            self._fields = fields
+            if not lines:
+                return
+            if self._file is None:
+                self._file = open(self.journal_path, 'a')
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            self._records += len(lines)
+            now = time.monotonic()
+            if has_trades or now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+            if self._records >= self.compact_every:
+                self._snapshot(history)
+
+    def compact(self, history):
+        """Fold the journal into a new snapshot of `history`."""
+        with self._lock:
+            self._snapshot(history)
+
+    def _snapshot(self, history):
+        snapshot = dict(history)
+        snapshot[SEQ_KEY] = self._seq
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(snapshot, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        with open(self.journal_path, 'w'):
+            pass
+        self._records = 0
+        self._remember(history)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
@@ -0,0 +1,193 @@
+import argparse
+import bisect
+import datetime
+import json
+import sqlite3
+import threading
+
+
+def close_ms(trade):
+    """Close time of a trade record as epoch milliseconds (naive timestamps are UTC); None if missing."""
+    value = trade.get('close_time')
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp() * 1000
+
+
+def _ms(when):
+    return when.timestamp() * 1000
+
+
+class MemoryTradeStore:
+    """
+    Closed trades indexed in memory by close time (timestamps parsed once, on add).
+    Same queries as SQLiteTradeStore; used when no database is configured.
+    """
+
+    def __init__(self, trades=()):
+        self._times = []
+        self._trades = []
+        self.migrate(trades)
+
+    def add(self, trade):
+        stamp = close_ms(trade)
+        if stamp is None:
+            return
+        i = bisect.bisect_right(self._times, stamp)
+        self._times.insert(i, stamp)
+        self._trades.insert(i, trade)
+
+    def migrate(self, trades):
+        for trade in trades:
+            self.add(trade)
+
+    def trades_since(self, cutoff):
+        """Trades closed after `cutoff` (an aware datetime), oldest first."""
+        return self._trades[bisect.bisect_right(self._times, _ms(cutoff)):]
+
+    def pnl_since(self, cutoff):
+        return sum(t.get('profit_usd', 0) for t in self.trades_since(cutoff))
+
+    def losses_since(self, cutoff):
+        return sum(abs(t.get('profit_usd', 0)) for t in self.trades_since(cutoff) if t.get('profit_pct', 0) < 0)
+
+    def has_loss_since(self, symbol, cutoff):
+        return any(t['symbol'] == symbol and t.get('profit_pct', 0) < 0 for t in self.trades_since(cutoff))
+
+    def strategy_summary(self):
+        """{strategy: (trades, profit_usd, wins)} over all trades with a strategy."""
+        summary = {}
+        for t in self._trades:
+            strategy = t.get('strategy')
+            if strategy is None:
+                continue
+            count, profit, wins = summary.get(strategy, (0, 0, 0))
+            summary[strategy] = (count + 1, profit + t.get('profit_usd', 0), wins + (t.get('profit_pct', 0) > 0))
+        return summary
+
+    def totals(self):
+        """(trades, wins, losses, profit_usd) over all trades."""
+        wins = sum(1 for t in self._trades if t.get('profit_pct', 0) > 0)
+        losses = sum(1 for t in self._trades if t.get('profit_pct', 0) < 0)
+        return len(self._trades), wins, losses, sum(t.get('profit_usd', 0) for t in self._trades)
+
+    def close(self):
+        pass
+
+
+class SQLiteTradeStore:
+    """
+    Closed trades in SQLite (WAL journal) with indexes on symbol, strategy and close time.
+    The full trade record is kept as JSON next to the indexed columns; close times are stored
+    as epoch milliseconds so range queries never parse timestamps.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY,
+            symbol TEXT NOT NULL,
+            strategy TEXT,
+            open_time TEXT,
+            close_time TEXT,
+            close_ms REAL NOT NULL,
+            profit_usd REAL NOT NULL DEFAULT 0,
+            profit_pct REAL NOT NULL DEFAULT 0,
+            record TEXT NOT NULL,
+            UNIQUE (symbol, open_time, close_time)
+        );
+        CREATE INDEX IF NOT EXISTS trades_close ON trades (close_ms);
+        CREATE INDEX IF NOT EXISTS trades_symbol ON trades (symbol, close_ms);
+        CREATE INDEX IF NOT EXISTS trades_strategy ON trades (strategy);
+    """
+
+    def __init__(self, path='trades.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(self.SCHEMA)
+
+    def _row(self, trade):
+        return (trade['symbol'], trade.get('strategy'), str(trade.get('open_time')), str(trade.get('close_time')),
+                close_ms(trade), trade.get('profit_usd', 0), trade.get('profit_pct', 0),
+                json.dumps(trade, default=str))
+
+    def add(self, trade):
+        if close_ms(trade) is None:
+            return
+        with self._lock, self._db:
+            self._db.execute('INSERT OR IGNORE INTO trades (symbol, strategy, open_time, close_time, close_ms, '
+                             'profit_usd, profit_pct, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self._row(trade))
+
+    def migrate(self, trades):
+        """Insert trades not stored yet (matched on symbol, open and close time). Returns the number added."""
+        rows = [self._row(t) for t in trades if close_ms(t) is not None]
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany('INSERT OR IGNORE INTO trades (symbol, strategy, open_time, close_time, close_ms, '
+                                 'profit_usd, profit_pct, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            return self._db.total_changes - before
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def trades_since(self, cutoff):
+        rows = self._query('SELECT record FROM trades WHERE close_ms > ? ORDER BY close_ms', (_ms(cutoff),))
+        return [json.loads(r[0]) for r in rows]
+
+    def pnl_since(self, cutoff):
+        return self._query('SELECT COALESCE(SUM(profit_usd), 0) FROM trades WHERE close_ms > ?', (_ms(cutoff),))[0][0]
+
+    def losses_since(self, cutoff):
+        return self._query('SELECT COALESCE(SUM(ABS(profit_usd)), 0) FROM trades WHERE close_ms > ? AND profit_pct < 0',
+                           (_ms(cutoff),))[0][0]
+
+    def has_loss_since(self, symbol, cutoff):
+        return bool(self._query('SELECT 1 FROM trades WHERE symbol = ? AND close_ms > ? AND profit_pct < 0 LIMIT 1',
+                                (symbol, _ms(cutoff))))
+
+    def strategy_summary(self):
+        rows = self._query('SELECT strategy, COUNT(*), SUM(profit_usd), SUM(profit_pct > 0) FROM trades '
+                           'WHERE strategy IS NOT NULL GROUP BY strategy')
+        return {strategy: (count, profit, wins) for strategy, count, profit, wins in rows}
+
+    def totals(self):
+        count, wins, losses, profit = self._query(
+            'SELECT COUNT(*), COALESCE(SUM(profit_pct > 0), 0), COALESCE(SUM(profit_pct < 0), 0), '
+            'COALESCE(SUM(profit_usd), 0) FROM trades')[0]
+        return count, wins, losses, profit
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_trade_store(path, trades):
+    """SQLite store at `path` (migrating `trades` into it) or an in-memory index of `trades` if path is None."""
+    if not path:
+        return MemoryTradeStore(trades)
+    store = SQLiteTradeStore(path)
+    added = store.migrate(trades)
+    if added:
+        print(f"[TRADES] Migrated {added} trades into {path}")
+    return store
+
+
+if __name__ == '__main__':
+    from trade_journal import TradeJournal
+    parser = argparse.ArgumentParser(description='Migrate trading_history.json (and its journal) into SQLite.')
+    parser.add_argument('--history', default='trading_history.json')
+    parser.add_argument('--db', default='trades.db')
+    args = parser.parse_args()
+    history = TradeJournal(args.history).load()
+    store = SQLiteTradeStore(args.db)
+    added = store.migrate(history.get('trades', []))
+    count, wins, losses, profit = store.totals()
+    print(f"[TRADES] {added} trades migrated into {args.db}: {count} stored, {wins} wins, {losses} losses, ${profit:.2f}")
+    store.close()
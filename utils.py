@@ -1,11 +1,14 @@
 import ccxt
 import os
 import time
-import json
 import pandas as pd
 from dotenv import load_dotenv
+from candles import Candles
+from trade_journal import TradeJournal, default_history
 from datetime import datetime, timedelta
 
+trade_journal = TradeJournal('trading_history.json')
+
 def load_api_keys():
     """Load API keys from environment variables (.env.txt or fallback .env)"""
     # Try .env.txt first, fallback to .env
@@ -20,13 +23,11 @@ def load_api_keys():
     return api_key, api_secret
 
 def fetch_ohlc_data(exchange, symbol, timeframe='1m', limit=144):
-    """Fetch OHLCV data for a symbol using CCXT. Returns DataFrame or None."""
+    """Fetch OHLCV data for a symbol using CCXT. Returns Candles or None."""
     try:
         data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
         if data and len(data) > 0:
-            df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
+            return Candles.from_ohlcv(data)
         else:
             print(f"[WARNING] No OHLCV data for {symbol}")
             return None
@@ -101,23 +102,19 @@ def sell_order(exchange, symbol, amount, percentage=100):
         return None
 
 def save_trading_history(history):
-    """Save trading history to trading_history.json."""
+    """Persist changes to the trading history (appended to the trade journal)."""
     try:
-        with open('trading_history.json', 'w') as f:
-            json.dump(history, f, default=str)
+        trade_journal.save(history)
     except Exception as e:
         print(f"[ERROR] Failed to save trading history: {e}")
 
 def load_trading_history():
-    """Load trading history from trading_history.json, or return default structure."""
+    """Load trading history from trading_history.json and its journal, or return default structure."""
     try:
-        with open('trading_history.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {'trades': [], 'last_24h_losses': 0, 'cooldown_until': None}
+        return trade_journal.load()
     except Exception as e:
         print(f"[ERROR] Failed to load trading history: {e}")
-        return {'trades': [], 'last_24h_losses': 0, 'cooldown_until': None}
+        return default_history()
 
 def calculate_atr(df, period=14):
     """Calculate Average True Range (ATR) for a DataFrame."""
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import threading
+import websockets
+
+
+def load_messages(path):
+    """Load recorded Kraken v2 messages from a JSON Lines file."""
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayServer:
+    """
+    Local stand-in for Kraken's v2 WebSocket API.
+    Acknowledges subscribe requests the way Kraken does (one ack per symbol) and then replays
+    the recorded channel messages that match the subscription, so MarketStream can be
+    exercised without network access.
+    """
+
+    def __init__(self, messages, host='127.0.0.1', port=0, delay=0.0, heartbeat=1.0):
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.heartbeat = heartbeat
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, ws):
+        subscriptions = set()
+        replay_task = None
+        beat_task = asyncio.ensure_future(self._heartbeats(ws))
+        try:
+            async for raw in ws:
+                req = json.loads(raw)
+                if req.get('method') != 'subscribe':
+                    continue
+                params = req.get('params', {})
+                channel = params.get('channel')
+                for symbol in params.get('symbol', []):
+                    subscriptions.add((channel, symbol))
+                    result = {'channel': channel, 'symbol': symbol}
+                    if 'interval' in params:
+                        result['interval'] = params['interval']
+                    await ws.send(json.dumps({'method': 'subscribe', 'result': result, 'success': True}))
+                if replay_task is None:
+                    replay_task = asyncio.ensure_future(self._replay(ws, subscriptions))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            beat_task.cancel()
+            if replay_task:
+                replay_task.cancel()
+
+    async def _replay(self, ws, subscriptions):
+        # Give the client a moment to finish sending its subscription batches.
+        await asyncio.sleep(0.05)
+        for msg in self.messages:
+            channel = msg.get('channel')
+            data = [d for d in msg.get('data', []) if (channel, d.get('symbol')) in subscriptions]
+            if not data:
+                continue
+            await ws.send(json.dumps(dict(msg, data=data)))
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+    async def _heartbeats(self, ws):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            await ws.send(json.dumps({'channel': 'heartbeat'}))
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        async def serve():
+            self._server = await websockets.serve(self._handler, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._server.wait_closed()
+
+        self._loop.run_until_complete(serve())
+
+    def start(self):
+        """Start serving on a background thread and return the server URL."""
+        self._thread = threading.Thread(target=self._thread_main, name='ws-replay', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        return self.url
+
+    def stop(self):
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+async def record(url, symbols, path, seconds, interval=1):
+    """Record live ohlc/ticker/trade messages for `symbols` into a JSON Lines file for later replay."""
+    async with websockets.connect(url, max_size=None) as ws:
+        for params in (
+            {'channel': 'ohlc', 'symbol': symbols, 'interval': interval},
+            {'channel': 'ticker', 'symbol': symbols},
+            {'channel': 'trade', 'symbol': symbols},
+        ):
+            await ws.send(json.dumps({'method': 'subscribe', 'params': params}))
+        loop = asyncio.get_running_loop()
+        end = loop.time() + seconds
+        with open(path, 'w') as f:
+            while loop.time() < end:
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=max(0.1, end - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                msg = json.loads(raw)
+                if msg.get('channel') in ('ohlc', 'ticker', 'trade'):
+                    f.write(json.dumps(msg) + '\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record or replay Kraken WebSocket market data")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record')
+    rec.add_argument('path')
+    rec.add_argument('--symbols', default='BTC/USD,ETH/USD,SOL/USD')
+    rec.add_argument('--seconds', type=int, default=60)
+    rec.add_argument('--url', default='wss://ws.kraken.com/v2')
+    srv = sub.add_parser('serve')
+    srv.add_argument('path')
+    srv.add_argument('--port', type=int, default=8765)
+    srv.add_argument('--delay', type=float, default=0.0)
+    args = parser.parse_args()
+    if args.command == 'record':
+        asyncio.run(record(args.url, args.symbols.split(','), args.path, args.seconds))
+    else:
+        server = ReplayServer(load_messages(args.path), port=args.port, delay=args.delay)
+        print(f"[REPLAY] Serving {len(server.messages)} messages on {server.start()}")
+        try:
+            server._thread.join()
+        except KeyboardInterrupt:
+            server.stop()